@@ -1,9 +1,10 @@
 import paho.mqtt
-print("Loaded paho-mqtt version:", paho.mqtt.__version__)
 
 import json
+import logging
 import os
 import ssl 
+import sys
 from contextlib import asynccontextmanager
 from typing import Dict, Any
 
@@ -13,9 +14,18 @@ from paho.mqtt import client as mqtt_client
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+# Shared structured logging (streamlit_app/app_logging.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'streamlit_app'))
+from app_logging import configure_logging, get_logger, log_event, request_context, timed
+
 # --- 1. Load Configuration and Secrets ---
 load_dotenv()
 
+# Mirror records to stderr as well: the service usually runs under uvicorn/systemd.
+configure_logging(console=True)
+logger = get_logger("ingestion")
+log_event(logger, "SERVICE_INIT", paho_mqtt_version=paho.mqtt.__version__)
+
 # Supabase Configuration
 SUPABASE_URL: str = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_KEY: str = os.getenv("SUPABASE_SERVICE_KEY")
@@ -38,29 +48,34 @@ mqttc: mqtt_client.Client | None = None
 def on_connect(client, userdata, flags, rc):
     """Callback function for when the client connects to the MQTT broker."""
     if rc == 0:
-        print(f"MQTT Connected successfully. Subscribing to topic: {MQTT_TOPIC}")
+        log_event(logger, "MQTT_CONNECTED", topic=MQTT_TOPIC)
         client.subscribe(MQTT_TOPIC)
     elif rc == 5:
         # rc=5 means Connection Refused, unauthorized (wrong username/password)
-        print("Failed to connect, return code 5: Authentication failed (check MQTT_USER/PASSWORD)")
+        log_event(logger, "MQTT_CONNECT_FAILED", level=logging.ERROR, rc=rc,
+                  reason="Authentication failed (check MQTT_USER/PASSWORD)")
     else:
-        print(f"Failed to connect, return code {rc}")
+        log_event(logger, "MQTT_CONNECT_FAILED", level=logging.ERROR, rc=rc)
 
 def on_message(client, userdata, msg):
     """
     Callback function when a message is received on the subscribed topic.
     This logic assumes the JSON structure matches the fields defined in the payload dictionary.
     """
-    global supabase
+    with request_context():
+        _handle_message(msg)
+
+
+def _handle_message(msg):
     if not supabase:
-        print("Error: Supabase client not initialized.")
+        log_event(logger, "SUPABASE_NOT_INITIALIZED", level=logging.ERROR)
         return
 
     try:
         # 1. Parse the incoming JSON payload from the ESP32
         data: Dict[str, Any] = json.loads(msg.payload.decode('utf-8'))
         # NOTE: If data coming from ESP32 is NULL, it will still insert, but Supabase might reject
-        print(f"Received data: {data}")
+        log_event(logger, "MQTT_MESSAGE", topic=msg.topic, data=data)
 
         # 2. Structure the data for Supabase insertion 
         # NOTE: Ensure these keys match the columns in your Supabase 'sensor_readings' table
@@ -73,18 +88,19 @@ def on_message(client, userdata, msg):
         }
         
         # 3. Insert data into the 'sensor_readings' table
-        response = supabase.table('Sensor readings').insert(payload).execute()
+        with timed(logger, "SUPABASE_INSERT") as insert_log:
+            response = supabase.table('Sensor readings').insert(payload).execute()
+            if response.data:
+                insert_log["record_id"] = response.data[0]['id']
         
         # Check for insertion errors
-        if response.data:
-            print(f"Successfully inserted record: {response.data[0]['id']}")
-        elif response.error:
-             print(f"Supabase error: {response.error}")
+        if not response.data and getattr(response, "error", None):
+            log_event(logger, "SUPABASE_INSERT_FAILED", level=logging.ERROR, error=str(response.error))
 
     except json.JSONDecodeError:
-        print(f"Error decoding JSON payload: {msg.payload}")
-    except Exception as e:
-        print(f"An unexpected error occurred during insertion: {e}")
+        log_event(logger, "MQTT_BAD_PAYLOAD", level=logging.WARNING, payload=repr(msg.payload))
+    except Exception:
+        logger.exception("Unexpected error during insertion", extra={"event": "INGESTION_ERROR"})
 
 
 # --- 3. FastAPI Lifespan (Startup/Shutdown) ---
@@ -97,7 +113,7 @@ async def lifespan(app: FastAPI):
     global supabase, mqttc
     
     # --- Startup Logic ---
-    print("--- FastAPI Startup ---")
+    log_event(logger, "SERVICE_STARTUP")
     
     # Initialize Supabase Client
     supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
@@ -122,7 +138,7 @@ async def lifespan(app: FastAPI):
     mqttc.tls_set(certfile=None, keyfile=None, cert_reqs=ssl.CERT_REQUIRED, tls_version=ssl.PROTOCOL_TLS, ciphers=None)
     
     # DIAGNOSTIC PRINT: Check the loaded broker URL 
-    print(f"Attempting to connect to: wss://{MQTT_BROKER}:{MQTT_PORT}/mqtt")
+    log_event(logger, "MQTT_CONNECTING", url=f"wss://{MQTT_BROKER}:{MQTT_PORT}/mqtt")
     
     # Connect and start the background thread loop
     try:
@@ -134,12 +150,12 @@ async def lifespan(app: FastAPI):
         )
         mqttc.loop_start()  # Starts a new thread to handle network traffic
     except Exception as e:
-        print(f"Could not connect to MQTT broker: {e}")
+        log_event(logger, "MQTT_CONNECT_FAILED", level=logging.ERROR, error=str(e))
 
     yield
     
     # --- Shutdown Logic ---
-    print("--- FastAPI Shutdown ---")
+    log_event(logger, "SERVICE_SHUTDOWN")
     if mqttc:
         mqttc.loop_stop()
         mqttc.disconnect()
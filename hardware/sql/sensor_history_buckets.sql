@@ -0,0 +1,64 @@
+-- Time-bucketed sensor history for the Streamlit dashboard.
+--
+-- Called through Supabase RPC by streamlit_app/iot_data.py:
+--   supabase.rpc("sensor_history_buckets",
+--                {"start_ts": ..., "end_ts": ..., "bucket_seconds": 3600, "p_device": None}).execute()
+--
+-- Buckets are aligned to the Unix epoch, like pandas' Series.dt.floor, so the
+-- local store in iot_data.py returns the same bucket boundaries and columns.
+--
+-- This version matches the "Sensor readings" table hardware/data_ingestion.py
+-- writes (temperature, humidity, water_level_raw, rain_status, servo_angle):
+-- water_level is the average of water_level_raw, and the sensors ingestion does
+-- not record come back as nulls. The table has no device column, so only
+-- p_device = null (IOT_DEVICE_COLUMN unset) returns rows.
+--
+-- For a table with a device_id column and soil_moisture, water_level,
+-- wind_speed, rainfall and pressure columns, run sensor_history_buckets_device.sql
+-- instead and set IOT_DEVICE_COLUMN=device_id.
+--
+-- Run this once in the Supabase SQL editor.
+
+create index if not exists sensor_readings_created_at_idx
+    on public."Sensor readings" (created_at);
+
+-- Earlier version, without p_device
+drop function if exists public.sensor_history_buckets(timestamptz, timestamptz, integer);
+
+create or replace function public.sensor_history_buckets(
+    start_ts timestamptz,
+    end_ts timestamptz,
+    bucket_seconds integer,
+    p_device text default null
+)
+returns table (
+    bucket_start timestamptz,
+    readings bigint,
+    temperature double precision,
+    humidity double precision,
+    soil_moisture double precision,
+    water_level double precision,
+    wind_speed double precision,
+    rainfall double precision,
+    pressure double precision
+)
+language sql
+stable
+as $$
+    select
+        to_timestamp(floor(extract(epoch from created_at) / bucket_seconds) * bucket_seconds) as bucket_start,
+        count(*) as readings,
+        avg(temperature)::double precision as temperature,
+        avg(humidity)::double precision as humidity,
+        null::double precision as soil_moisture,
+        avg(water_level_raw)::double precision as water_level,
+        null::double precision as wind_speed,
+        null::double precision as rainfall,
+        null::double precision as pressure
+    from public."Sensor readings"
+    where created_at >= start_ts
+      and created_at < end_ts
+      and p_device is null
+    group by 1
+    order by 1;
+$$;
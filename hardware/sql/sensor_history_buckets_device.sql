@@ -0,0 +1,54 @@
+-- Time-bucketed sensor history, per device (opt-in).
+--
+-- The same sensor_history_buckets function as sensor_history_buckets.sql, for
+-- a "Sensor readings" table that has a device_id column and soil_moisture,
+-- water_level, wind_speed, rainfall and pressure columns of its own. Run it
+-- instead of sensor_history_buckets.sql (it replaces that function) and set
+-- IOT_DEVICE_COLUMN=device_id for the dashboard: p_device then limits the
+-- buckets to one device (null: every row).
+--
+-- Run this once in the Supabase SQL editor.
+
+create index if not exists sensor_readings_created_at_idx
+    on public."Sensor readings" (created_at);
+
+-- Earlier version, without p_device
+drop function if exists public.sensor_history_buckets(timestamptz, timestamptz, integer);
+
+create or replace function public.sensor_history_buckets(
+    start_ts timestamptz,
+    end_ts timestamptz,
+    bucket_seconds integer,
+    p_device text default null
+)
+returns table (
+    bucket_start timestamptz,
+    readings bigint,
+    temperature double precision,
+    humidity double precision,
+    soil_moisture double precision,
+    water_level double precision,
+    wind_speed double precision,
+    rainfall double precision,
+    pressure double precision
+)
+language sql
+stable
+as $$
+    select
+        to_timestamp(floor(extract(epoch from created_at) / bucket_seconds) * bucket_seconds) as bucket_start,
+        count(*) as readings,
+        avg(temperature)::double precision as temperature,
+        avg(humidity)::double precision as humidity,
+        avg(soil_moisture)::double precision as soil_moisture,
+        avg(water_level)::double precision as water_level,
+        avg(wind_speed)::double precision as wind_speed,
+        avg(rainfall)::double precision as rainfall,
+        avg(pressure)::double precision as pressure
+    from public."Sensor readings"
+    where created_at >= start_ts
+      and created_at < end_ts
+      and (p_device is null or device_id::text = p_device)
+    group by 1
+    order by 1;
+$$;
@@ -19,7 +19,8 @@ MLFLOW_TRACKING_URI = f"file://{PROJECT_ROOT}/mlruns"
 EXPERIMENTS = {
     'crop_recommendation': 'Crop-Recommendation-Model',
     'irrigation_optimization': 'Irrigation-Optimization-Model',
-    'smart_irrigation_classifier': 'Smart-Irrigation-Classifier-Model'
+    'smart_irrigation_classifier': 'Smart-Irrigation-Classifier-Model',
+    'soil_classification': 'Soil-Classification-Model'
 }
 
 def setup_mlflow(experiment_name: str):
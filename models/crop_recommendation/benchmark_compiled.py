@@ -0,0 +1,96 @@
+"""
+Benchmark: scikit-learn forest vs CompiledForest for the crop model
+===================================================================
+Scores the same inputs with the pickled ``RandomForestClassifier`` and its
+:func:`compiled_forest.compile_forest` version, checks that the
+probabilities are identical, and reports:
+
+- single-row ``predict_proba`` latency (median and p95 over ``--rows``
+  calls), both for the one-row DataFrame the crop page builds and for a
+  plain float32 row;
+- per-row cost of one ``--batch``-row call.
+
+Inputs are drawn uniformly from the ranges of the app's input widgets.
+
+Usage::
+
+    python models/crop_recommendation/benchmark_compiled.py
+    python models/crop_recommendation/benchmark_compiled.py --rows 5000 --batch 10000 path/to/model.pkl
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL = os.path.join(HERE, "crop_model.pkl")
+
+# (low, high) per feature, in the crop model's column order; soil_type_encoded is a small category code
+FEATURE_RANGES = [(0, 140), (5, 145), (5, 205), (8, 44), (14, 100), (3.5, 9.9), (20, 300), (0, 4)]
+
+
+def _inputs(model, n, seed=0):
+    rng = np.random.default_rng(seed)
+    low, high = np.array(FEATURE_RANGES[:model.n_features_in_]).T
+    X = rng.uniform(low, high, size=(n, model.n_features_in_))
+    names = getattr(model, "feature_names_in_", None)
+    if names is None:
+        return X
+    import pandas as pd
+
+    return pd.DataFrame(X, columns=names)
+
+
+def _latency_us(fn, rows):
+    fn()  # first call pays one-off initialisation
+    latencies = []
+    for _ in range(rows):
+        started = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - started) * 1e6)
+    return np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("model", nargs="?", default=DEFAULT_MODEL, help="joblib pickle (default: crop_model.pkl)")
+    parser.add_argument("--rows", type=int, default=2000, help="single-row predictions per variant")
+    parser.add_argument("--batch", type=int, default=1000, help="rows in the batch call")
+    args = parser.parse_args()
+
+    import joblib
+
+    sys.path.insert(0, HERE)
+    from compiled_forest import compile_forest
+
+    sklearn_model = joblib.load(args.model)
+    started = time.perf_counter()
+    compiled = compile_forest(sklearn_model)
+    print(f"compiled {compiled.n_estimators} trees ({len(compiled.value)} nodes, depth {compiled.max_depth}) "
+          f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    batch = _inputs(sklearn_model, args.batch)
+    same = np.array_equal(sklearn_model.predict_proba(batch), compiled.predict_proba(batch))
+    print(f"identical predict_proba on {args.batch} rows: {same}")
+
+    frame_row = batch.iloc[:1] if hasattr(batch, "iloc") else batch[:1]
+    array_row = np.asarray(frame_row, dtype=np.float32)
+    print(f"{'variant':<28} {'p50 µs':>10} {'p95 µs':>10}")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # sklearn warns about rows without feature names
+        for name, model in (("sklearn", sklearn_model), ("compiled", compiled)):
+            for kind, row in (("DataFrame row", frame_row), ("float32 row", array_row)):
+                p50, p95 = _latency_us(lambda: model.predict_proba(row), args.rows)
+                print(f"{name + ' ' + kind:<28} {p50:>10.1f} {p95:>10.1f}")
+            started = time.perf_counter()
+            model.predict_proba(batch)
+            per_row = (time.perf_counter() - started) * 1e6 / args.batch
+            print(f"{name + ' batch, per row':<28} {per_row:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
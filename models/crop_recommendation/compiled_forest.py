@@ -0,0 +1,177 @@
+"""
+Array-backed crop model for low-latency scoring
+===============================================
+scikit-learn's ``RandomForestClassifier.predict_proba`` validates its input,
+converts it, and dispatches every tree through joblib on each call. That is
+fine for batches, but the app scores exactly one row per request.
+
+:func:`compile_forest` flattens the fitted forest into a few contiguous
+NumPy arrays covering all trees. Each node ``n`` has two slots, ``2n`` (the
+branch for ``x > threshold``) and ``2n + 1`` (``x <= threshold``), so one
+tree level is a single lookup per array:
+
+- ``feature`` / ``threshold``: the split of the node owning each slot;
+- ``children``: the slot of the child each branch leads to (a leaf's
+  branches lead back to itself, so finished trees stay put);
+- ``value``: class probabilities of each node, as stored by scikit-learn;
+- ``missing_left``: whether NaN takes the ``<=`` branch at the node owning
+  each slot (scikit-learn's ``missing_go_to_left``; NaN fails ``<=``, so
+  otherwise it takes the ``>`` branch). Only consulted for inputs with NaN.
+
+:class:`CompiledForest` walks all trees in lockstep, one level per NumPy
+step for the whole batch, and averages the leaf probabilities the same way
+``predict_proba`` does, so outputs are identical to the sklearn model.
+Because it holds nothing but arrays, a pickled ``CompiledForest`` can be
+memory-mapped and shared between processes (see ``shared_model.py``).
+
+The app compiles ``crop_model.pkl`` when it loads it (see
+``streamlit_app/model_store.py``); ``benchmark_compiled.py`` compares the
+two on single rows and batches.
+"""
+
+import numpy as np
+
+CHUNK_ROWS = 512
+
+
+class CompiledForest:
+    """Flattened tree ensemble with the ``predict``/``predict_proba`` API the app uses."""
+
+    missing_left = None
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth, classes,
+                 n_features_in, feature_names_in=None, missing_left=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.missing_left = missing_left
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+        self.n_features_in_ = int(n_features_in)
+        if feature_names_in is not None:
+            self.feature_names_in_ = feature_names_in
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    def _matrix(self, X):
+        # Same input dtype as sklearn's trees, so every split compares the same numbers
+        if hasattr(X, "columns"):
+            names = getattr(self, "feature_names_in_", None)
+            if names is not None and list(X.columns) != list(names):
+                X = X[list(names)]
+            X = X.to_numpy(dtype=np.float32)
+        else:
+            X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, but the model expects {self.n_features_in_}")
+        return X
+
+    def apply(self, X):
+        """Leaf node index reached in every tree, shape (n_samples, n_estimators)."""
+        return self._leaves(self._matrix(X))
+
+    def _leaves(self, X):
+        n_samples, n_features = X.shape
+        missing_left = self.missing_left if self.missing_left is not None and np.isnan(X).any() else None
+        if n_samples == 1:
+            # The app's case: one flat row, no per-row offsets to add at every level
+            return (self._walk(X[0], 2 * self.roots, missing_left=missing_left) // 2)[None, :]
+        slots = np.broadcast_to(2 * self.roots, (n_samples, len(self.roots)))
+        row_start = np.arange(0, n_samples * n_features, n_features)[:, None]
+        return self._walk(X.ravel(), slots, row_start, missing_left) // 2
+
+    def _walk(self, flat, slots, row_start=None, missing_left=None):
+        for _ in range(self.max_depth):
+            index = self.feature.take(slots)
+            if row_start is not None:
+                index += row_start
+            x = flat.take(index)
+            go_left = x <= self.threshold.take(slots)
+            if missing_left is not None:
+                go_left |= np.isnan(x) & missing_left.take(slots)
+            slots = self.children.take(slots + go_left)
+        return slots
+
+    def _proba(self, X):
+        leaves = self._leaves(X)
+        if len(X) <= 32:
+            proba = self.value.take(leaves, axis=0).sum(axis=1)
+        else:
+            # One (rows, classes) gather per tree instead of a (rows, trees, classes) temporary
+            proba = np.zeros((len(X), self.value.shape[1]))
+            for tree in range(leaves.shape[1]):
+                proba += self.value.take(leaves[:, tree], axis=0)
+        # Summed tree by tree then divided, in the order sklearn accumulates them
+        return proba / len(self.roots)
+
+    def predict_proba(self, X):
+        X = self._matrix(X)
+        if len(X) <= CHUNK_ROWS:
+            return self._proba(X)
+        # Chunks keep the per-level working arrays in cache
+        return np.concatenate([self._proba(X[i:i + CHUNK_ROWS]) for i in range(0, len(X), CHUNK_ROWS)])
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+def compile_forest(model):
+    """Flatten a fitted single-output ``RandomForestClassifier``/``ExtraTreesClassifier``."""
+    from sklearn.ensemble._forest import ForestClassifier
+
+    if not isinstance(model, ForestClassifier):
+        raise TypeError(f"Expected a fitted forest classifier, got {type(model).__name__}")
+    if model.n_outputs_ != 1:
+        raise ValueError("Multi-output forests are not supported")
+
+    n_classes = int(model.n_classes_)
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+
+    feature = np.empty(2 * offsets[-1], dtype=np.intp)
+    threshold = np.empty(2 * offsets[-1], dtype=np.float64)
+    children = np.empty(2 * offsets[-1], dtype=np.intp)
+    value = np.empty((offsets[-1], n_classes), dtype=np.float64)
+    missing_left = np.zeros(2 * offsets[-1], dtype=bool)
+    for tree, start, stop in zip(trees, offsets[:-1], offsets[1:]):
+        own_slot = 2 * np.arange(start, stop)
+        is_leaf = tree.children_left == -1
+        feature[2 * start:2 * stop] = np.repeat(np.where(is_leaf, 0, tree.feature), 2)
+        threshold[2 * start:2 * stop] = np.repeat(np.where(is_leaf, np.inf, tree.threshold), 2)
+        children[2 * start:2 * stop:2] = np.where(is_leaf, own_slot, 2 * (tree.children_right + start))
+        children[2 * start + 1:2 * stop:2] = np.where(is_leaf, own_slot, 2 * (tree.children_left + start))
+        value[start:stop] = tree.value[:, 0, :n_classes]
+        if hasattr(tree, "missing_go_to_left"):
+            # sklearn >= 1.3; earlier trees can't route NaN at all
+            missing_left[2 * start:2 * stop] = np.repeat((tree.missing_go_to_left != 0) & ~is_leaf, 2)
+
+    return CompiledForest(
+        feature=feature,
+        threshold=threshold,
+        children=children,
+        value=value,
+        roots=offsets[:-1].astype(np.intp),
+        max_depth=max(tree.max_depth for tree in trees),
+        classes=np.asarray(model.classes_),
+        n_features_in=model.n_features_in_,
+        feature_names_in=getattr(model, "feature_names_in_", None),
+        missing_left=missing_left if missing_left.any() else None,
+    )
+
+
+def compile_if_possible(model):
+    """The compiled forest for a forest classifier; any other model is returned unchanged."""
+    try:
+        return compile_forest(model)
+    except (TypeError, ValueError):
+        return model
+
+
+# Shared copies (shared_model.py) made before NaN routing lack missing_left
+compile_if_possible.FORMAT_VERSION = 2
@@ -0,0 +1,125 @@
+"""
+Per-process memory report: private vs memory-mapped crop model
+==============================================================
+Starts ``--workers`` processes per mode, each loading the model:
+
+- ``private``: ``joblib.load`` of the pickle, a private copy per process;
+- ``shared``: :func:`shared_model.load_shared`, memory-mapped from the
+  shared cache;
+- ``compiled``: the flattened forest from ``compiled_forest.py``,
+  memory-mapped from the shared cache (what the app loads).
+
+While all workers of a mode hold the model, it reports for each process:
+
+- RSS before and after loading (what ``top`` shows, shared pages included);
+- USS: memory only that process holds, i.e. what each extra worker costs;
+- PSS: RSS with shared pages split between the processes mapping them.
+
+The "total" line is the sum of PSS, the physical memory the workers take
+together. USS/PSS need Linux (``/proc/<pid>/smaps``).
+
+Usage::
+
+    python models/crop_recommendation/rss_report.py
+    python models/crop_recommendation/rss_report.py --workers 8 path/to/model.pkl
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL = os.path.join(HERE, "crop_model.pkl")
+MODES = ("private", "shared", "compiled")
+
+
+def _mb(n):
+    return round(n / 2**20, 1)
+
+
+def _worker(mode, pkl_path):
+    import warnings
+
+    import joblib
+    import numpy as np
+    import psutil
+
+    warnings.simplefilter("ignore")  # sklearn warns about the unnamed probe row
+
+    sys.path.insert(0, HERE)
+    from compiled_forest import compile_if_possible
+    from shared_model import load_shared
+
+    before = psutil.Process().memory_info().rss
+    if mode == "private":
+        model = joblib.load(pkl_path)
+    else:
+        model = load_shared(pkl_path, convert=compile_if_possible if mode == "compiled" else None)
+    width = getattr(model, "n_features_in_", None)
+    if width:
+        # Touch the model as a request would, so lazily-read pages count too
+        model.predict(np.zeros((1, width)))
+    print(json.dumps({"rss_before": before}), flush=True)
+    sys.stdin.readline()  # hold the model until the parent has measured every worker
+
+
+def _measure_mode(mode, pkl_path, workers):
+    import psutil
+
+    procs = [
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), "--worker", mode, pkl_path],
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    rows = []
+    try:
+        for proc in procs:
+            line = proc.stdout.readline()
+            if not line:
+                raise RuntimeError(f"{mode} worker exited before loading the model")
+            rows.append(json.loads(line))
+        # Measured only once every worker holds the model, so shared pages are split across all of them
+        for proc, row in zip(procs, rows):
+            info = psutil.Process(proc.pid).memory_full_info()
+            row.update(pid=proc.pid, rss=info.rss, uss=info.uss, pss=getattr(info, "pss", 0))
+    finally:
+        for proc in procs:
+            if proc.poll() is None:
+                proc.stdin.close()
+            proc.wait()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("model", nargs="?", default=DEFAULT_MODEL, help="joblib pickle (default: crop_model.pkl)")
+    parser.add_argument("--workers", type=int, default=4, help="processes per mode")
+    parser.add_argument("--worker", nargs=2, metavar=("MODE", "PICKLE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(*args.worker)
+        return
+
+    # Build the shared copy up front so the first shared worker doesn't pay for (or measure) the conversion
+    sys.path.insert(0, HERE)
+    from compiled_forest import compile_if_possible
+    from shared_model import prepare_shared
+
+    prepare_shared(args.model)
+    prepare_shared(args.model, convert=compile_if_possible)
+
+    print(f"{'mode':<8} {'pid':>7} {'RSS before':>11} {'RSS after':>10} {'USS MB':>8} {'PSS MB':>8}")
+    for mode in MODES:
+        rows = _measure_mode(mode, args.model, args.workers)
+        for r in rows:
+            print(f"{mode:<8} {r['pid']:>7} {_mb(r['rss_before']):>11} {_mb(r['rss']):>10} "
+                  f"{_mb(r['uss']):>8} {_mb(r['pss']):>8}")
+        print(f"{mode:<8} {'total':>7} {'':>11} {_mb(sum(r['rss'] for r in rows)):>10} "
+              f"{_mb(sum(r['uss'] for r in rows)):>8} {_mb(sum(r['pss'] for r in rows)):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Memory-mapped crop model shared between processes
+=================================================
+``crop_model.pkl`` is stored compressed, so every process that loads it
+(each Streamlit worker, the ingestion/inference services) decompresses its
+own private copy. :func:`load_shared` instead keeps one uncompressed copy
+per model version in a shared cache directory and loads it with
+``joblib.load(..., mmap_mode='r')``: NumPy arrays in the model are mapped
+read-only from that file, so N processes share the same physical pages
+through the OS page cache.
+
+The cache file is named after the SHA-256 of the source pickle, so a
+retrained model gets a new file and never overwrites one another process
+still has mapped. The cache directory is ``AGRITECH_MODEL_CACHE``
+(default: ``<tmp>/agritech-model-cache``); it must be on a local
+filesystem shared by the processes.
+
+Note that scikit-learn copies each tree's node arrays into its own buffers
+when a ``DecisionTree`` is unpickled, so a plain ``RandomForest`` gets
+little from the memory map. The flattened forest from ``compiled_forest.py``
+is nothing but arrays and is shared in full; ``rss_report.py`` compares the
+two for a given model.
+"""
+
+import glob
+import hashlib
+import os
+import tempfile
+
+import joblib
+
+CACHE_DIR = os.getenv("AGRITECH_MODEL_CACHE") or os.path.join(tempfile.gettempdir(), "agritech-model-cache")
+
+
+def _digest(path, chunk_size=1 << 20):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()[:16]
+
+
+def _suffix(convert):
+    # A converter's FORMAT_VERSION changes when copies it made earlier must not be reused
+    if convert is None:
+        return ".joblib"
+    version = getattr(convert, "FORMAT_VERSION", None)
+    return f".{convert.__name__}{f'-v{version}' if version else ''}.joblib"
+
+
+def shared_copy_path(pkl_path, cache_dir=None, convert=None):
+    """Path of the uncompressed copy of ``pkl_path`` (after ``convert``, if given) in the shared cache."""
+    stem = os.path.splitext(os.path.basename(pkl_path))[0]
+    return os.path.join(cache_dir or CACHE_DIR, f"{stem}-{_digest(pkl_path)}{_suffix(convert)}")
+
+
+def prepare_shared(pkl_path, cache_dir=None, convert=None):
+    """Write the uncompressed copy of ``pkl_path`` if it isn't cached yet; returns its path.
+
+    ``convert`` is applied to the loaded model before it is written, e.g.
+    ``compiled_forest.compile_if_possible`` to cache the flattened forest.
+
+    Safe to call from several processes at once: each writes a private temp
+    file and renames it into place, and the last rename wins with identical
+    content.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    target = shared_copy_path(pkl_path, cache_dir, convert)
+    if os.path.exists(target):
+        return target
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        # compress=0 keeps every array as a raw block joblib can memory-map
+        model = joblib.load(pkl_path)
+        joblib.dump(convert(model) if convert is not None else model, tmp, compress=0)
+        os.replace(tmp, target)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    # Older versions of the same model; processes that still map them keep their pages until they exit
+    stem = os.path.splitext(os.path.basename(pkl_path))[0]
+    for stale in glob.glob(os.path.join(cache_dir, f"{stem}-{'?' * 16}{_suffix(convert)}")):
+        if stale != target:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    return target
+
+
+def load_shared(pkl_path, cache_dir=None, convert=None):
+    """Load ``pkl_path`` through its memory-mapped copy in the shared cache."""
+    return joblib.load(prepare_shared(pkl_path, cache_dir, convert), mmap_mode="r")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write the shared uncompressed copies of model pickles")
+    parser.add_argument("pickles", nargs="+", help="joblib pickles, e.g. models/crop_recommendation/crop_model.pkl")
+    parser.add_argument("--cache-dir", default=None, help=f"cache directory (default: {CACHE_DIR})")
+    parser.add_argument("--compiled", action="store_true", help="cache the flattened forest, as the app loads it")
+    args = parser.parse_args()
+    convert = None
+    if args.compiled:
+        from compiled_forest import compile_if_possible as convert
+    for pkl in args.pickles:
+        print(f"✅ {pkl} -> {prepare_shared(pkl, args.cache_dir, convert)}")
@@ -0,0 +1,99 @@
+"""
+Benchmark: joblib pickle vs native .cbm for the CatBoost irrigation models
+==========================================================================
+Each (model, format) pair is measured in a fresh interpreter so load time
+and resident memory are not skewed by what an earlier measurement loaded:
+
+- load time: ``joblib.load`` vs ``load_native``;
+- single-row predict latency (median and p95 over ``--rows`` calls) with
+  the row shapes the app sends;
+- RSS after loading, minus the RSS of the interpreter with catboost imported.
+
+Usage::
+
+    python models/irrigation_optimization/benchmark_native.py
+    python models/irrigation_optimization/benchmark_native.py --rows 5000 catboost_classifier.pkl
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODELS = ["catboost_classifier.pkl", "catboost_irrigation_model.pkl"]
+
+
+def _rss_mb():
+    import psutil
+
+    return psutil.Process().memory_info().rss / 2**20
+
+
+def _measure(fmt, pkl_path, rows):
+    import catboost  # noqa: F401  (baseline RSS includes the library itself)
+
+    sys.path.insert(0, HERE)
+    from catboost_native import load_native
+
+    baseline = _rss_mb()
+    started = time.perf_counter()
+    if fmt == "pickle":
+        import joblib
+
+        model = joblib.load(pkl_path)
+    else:
+        model = load_native(pkl_path)
+    load_ms = (time.perf_counter() - started) * 1000
+    rss = _rss_mb() - baseline
+
+    width = len(model.feature_names_)
+    row = np.random.default_rng(0).random((1, width)).astype(np.float32)
+    model.predict(row)  # first call pays one-off initialisation; measured separately by the warm-up
+    latencies = []
+    for _ in range(rows):
+        started = time.perf_counter()
+        model.predict(row)
+        latencies.append((time.perf_counter() - started) * 1e6)
+    return {
+        "format": fmt,
+        "load_ms": round(load_ms, 2),
+        "rss_mb": round(rss, 1),
+        "predict_us_p50": round(float(np.percentile(latencies, 50)), 1),
+        "predict_us_p95": round(float(np.percentile(latencies, 95)), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("models", nargs="*", default=DEFAULT_MODELS, help="pickles (relative to this folder)")
+    parser.add_argument("--rows", type=int, default=2000, help="single-row predictions per format")
+    parser.add_argument("--worker", nargs=2, metavar=("FORMAT", "PICKLE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(_measure(args.worker[0], args.worker[1], args.rows)))
+        return
+
+    print(f"{'model':<34} {'format':<7} {'load ms':>9} {'RSS MB':>8} {'p50 µs':>8} {'p95 µs':>8}")
+    for name in args.models:
+        pkl_path = name if os.path.isabs(name) else os.path.join(HERE, name)
+        for fmt in ("pickle", "cbm"):
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--rows", str(args.rows), "--worker", fmt, pkl_path],
+                capture_output=True, text=True,
+            )
+            if out.returncode != 0:
+                print(f"{name:<34} {fmt:<7} failed: {out.stderr.strip().splitlines()[-1]}")
+                continue
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{name:<34} {fmt:<7} {r['load_ms']:>9} {r['rss_mb']:>8} "
+                  f"{r['predict_us_p50']:>8} {r['predict_us_p95']:>8}")
+
+
+if __name__ == "__main__":
+    main()
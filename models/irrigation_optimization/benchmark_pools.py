@@ -0,0 +1,86 @@
+"""
+Benchmark: DataFrame fits vs cached quantized pools for CatBoost training
+=========================================================================
+Repeats the training pattern of ``train_classifier.py`` (the same split
+fitted ``--fits`` times) on synthetic data of the irrigation dataset's
+shape, and reports the wall time of:
+
+- ``DataFrame``: every fit re-quantizes the DataFrame (the old scripts);
+- ``pool, cold``: :func:`catboost_pools.quantized_pools` builds and saves
+  the pool, then every fit loads it;
+- ``pool, cached``: a re-run, where the pool is already on disk.
+
+It also checks that the models are identical. Quantization is a fixed cost
+per fit, so the saving is largest for many short fits on wide data (the
+Optuna trials); use ``--iterations`` to match the fits being tuned.
+
+Usage::
+
+    python models/irrigation_optimization/benchmark_pools.py
+    python models/irrigation_optimization/benchmark_pools.py --rows 200000 --fits 12 --iterations 300
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _data(rows, features, seed=0):
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.random((rows, features)), columns=[f"feature_{i}" for i in range(features)])
+    y = X["feature_0"] + X["feature_1"] * rng.random(rows) > 0.8
+    return X, y
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=160_000, help="training rows")
+    parser.add_argument("--features", type=int, default=23, help="feature columns")
+    parser.add_argument("--fits", type=int, default=12, help="fits per run (initial + 10 trials + final)")
+    parser.add_argument("--iterations", type=int, default=50, help="boosting iterations per fit")
+    parser.add_argument("--border-count", type=int, default=128)
+    args = parser.parse_args()
+
+    from catboost import CatBoostClassifier
+
+    sys.path.insert(0, HERE)
+    from catboost_pools import quantized_pools, training_params
+
+    X, y = _data(args.rows, args.features)
+    params = dict(iterations=args.iterations, depth=6, verbose=False, random_seed=42,
+                  allow_writing_files=False, **training_params())
+    print(f"{args.fits} fits x {args.iterations} iterations on {args.rows} x {args.features}, "
+          f"threads={params['thread_count']}")
+
+    def run(fit_one):
+        started = time.perf_counter()
+        model = None
+        for _ in range(args.fits):
+            model = fit_one()
+        return time.perf_counter() - started, model
+
+    baseline, expected = run(lambda: CatBoostClassifier(border_count=args.border_count, **params).fit(X, y))
+    print(f"{'DataFrame':<14} {baseline:>8.2f} s")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label in ("pool, cold", "pool, cached"):
+            def fit_one():
+                train, _ = quantized_pools(X, y, border_count=args.border_count, cache_dir=cache_dir)
+                return CatBoostClassifier(class_names=[False, True], **params).fit(train)
+
+            # Only the first call of the cold run builds the pool; the others find it on disk
+            seconds, model = run(fit_one)
+            same = np.array_equal(model.predict_proba(X[:1000]), expected.predict_proba(X[:1000]))
+            print(f"{label:<14} {seconds:>8.2f} s  {baseline / seconds:>5.2f}x  identical={same}")
+
+
+if __name__ == "__main__":
+    main()
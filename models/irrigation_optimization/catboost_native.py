@@ -0,0 +1,124 @@
+"""
+Native CatBoost model files (.cbm) for the irrigation models
+============================================================
+The training scripts save each CatBoost model twice: the joblib pickle used
+so far and CatBoost's own binary format (``<stem>.cbm``) with a small JSON
+feature schema next to it (``<stem>.schema.json``). The ``.cbm`` file is read
+by CatBoost's C++ loader, does not depend on the Python/pickle versions it
+was written with, and loads much faster than unpickling.
+
+:func:`load_native` returns a :class:`NativeCatBoostModel`, which keeps the
+``predict``/``predict_proba`` interface the app uses but sends one
+contiguous float32 matrix in schema order, scored on a single thread, which
+is the fast path for the single-row requests the dashboard makes.
+
+Convert existing pickles (writes ``.cbm`` and ``.schema.json`` next to them)::
+
+    python models/irrigation_optimization/catboost_native.py \\
+        models/irrigation_optimization/catboost_classifier.pkl \\
+        models/irrigation_optimization/catboost_irrigation_model.pkl
+"""
+
+import json
+import os
+
+import numpy as np
+
+SCHEMA_SUFFIX = ".schema.json"
+
+
+def native_path(path):
+    """``.cbm`` path that sits next to ``path`` (a ``.pkl`` or the ``.cbm`` itself)."""
+    return os.path.splitext(path)[0] + ".cbm"
+
+
+def schema_path(path):
+    return os.path.splitext(path)[0] + SCHEMA_SUFFIX
+
+
+def export_native(model, path, feature_names=None):
+    """Save ``model`` as ``<stem>.cbm`` plus its feature schema; returns the ``.cbm`` path."""
+    import catboost
+
+    cbm_path = native_path(path)
+    model.save_model(cbm_path, format="cbm")
+
+    is_classifier = isinstance(model, catboost.CatBoostClassifier)
+    schema = {
+        "model_type": "classifier" if is_classifier else "regressor",
+        "feature_names": list(feature_names if feature_names is not None else (model.feature_names_ or [])),
+        "cat_feature_indices": [int(i) for i in model.get_cat_feature_indices()],
+        "catboost_version": catboost.__version__,
+    }
+    if is_classifier:
+        schema["class_names"] = np.asarray(model.classes_).tolist()
+    with open(schema_path(cbm_path), "w", encoding="utf-8") as f:
+        json.dump(schema, f, indent=2)
+    return cbm_path
+
+
+class NativeCatBoostModel:
+    """A model loaded from ``.cbm`` with the pickled estimator's predict API."""
+
+    def __init__(self, model, schema):
+        self.model = model
+        self.schema = schema
+        self.feature_names = schema.get("feature_names") or []
+        self._numeric = not schema.get("cat_feature_indices")
+
+    def _matrix(self, X):
+        if hasattr(X, "columns") and self.feature_names:
+            X = X[self.feature_names]
+        if not self._numeric:
+            return X
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if self.feature_names and X.shape[1] != len(self.feature_names):
+            raise ValueError(f"Expected {len(self.feature_names)} features, got {X.shape[1]}")
+        return X
+
+    def predict(self, X):
+        return self.model.predict(self._matrix(X), thread_count=1)
+
+    def predict_proba(self, X):
+        return self.model.predict_proba(self._matrix(X), thread_count=1)
+
+    def __getattr__(self, name):
+        # classes_, feature_names_, get_feature_importance, ...
+        if name.startswith("__") or name in ("model", "schema"):
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+
+def load_native(path):
+    """Load ``<stem>.cbm`` and its schema; raises if they don't describe the same features."""
+    from catboost import CatBoostClassifier, CatBoostRegressor
+
+    cbm_path = native_path(path)
+    with open(schema_path(cbm_path), encoding="utf-8") as f:
+        schema = json.load(f)
+
+    model = CatBoostClassifier() if schema.get("model_type") == "classifier" else CatBoostRegressor()
+    model.load_model(cbm_path, format="cbm")
+    stored = list(model.feature_names_ or [])
+    if schema.get("feature_names") and stored and stored != schema["feature_names"]:
+        raise ValueError(f"Feature schema {schema_path(cbm_path)} does not match {cbm_path}")
+    return NativeCatBoostModel(model, schema)
+
+
+def convert(pkl_path, feature_names=None):
+    """Write the ``.cbm`` + schema for an existing joblib pickle; returns the ``.cbm`` path."""
+    import joblib
+
+    return export_native(joblib.load(pkl_path), pkl_path, feature_names)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export CatBoost pickles to native .cbm files")
+    parser.add_argument("pickles", nargs="+", help="joblib-pickled CatBoost models")
+    args = parser.parse_args()
+    for pkl in args.pickles:
+        print(f"✅ {pkl} -> {convert(pkl)}")
@@ -0,0 +1,125 @@
+"""
+Quantized CatBoost pools shared by the irrigation training scripts
+==================================================================
+Fitting CatBoost on a pandas DataFrame re-computes the feature borders and
+re-bins every column on each ``fit``. ``train_classifier.py`` fits the same
+training split a dozen times (initial model, Optuna trials, final model),
+and re-running either script repeats it all again.
+
+:func:`quantized_pools` bins the training split once with fixed borders,
+bins the evaluation split with the *same* borders, and saves both under
+``<AGRITECH_MODEL_CACHE>/pools/<digest>/``, where the digest covers the data,
+the quantization settings and the CatBoost version. Later fits in the same
+run, and later runs on unchanged data, load the binned pools from disk
+instead of quantizing again. Models trained on them are identical to
+models trained on the DataFrames with the same ``border_count``.
+
+Training resources are explicit rather than "whatever the machine has":
+
+- ``CATBOOST_THREAD_COUNT``: threads per fit (default ``-1``, all cores);
+- ``CATBOOST_RAM_LIMIT``: CatBoost's ``used_ram_limit``, e.g. ``4gb``
+  (default: no limit).
+
+Pass :func:`training_params` to every CatBoost estimator.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+MODEL_CACHE_DIR = os.getenv("AGRITECH_MODEL_CACHE") or os.path.join(tempfile.gettempdir(), "agritech-model-cache")
+CACHE_DIR = os.path.join(MODEL_CACHE_DIR, "pools")
+
+TRAINING_THREADS = int(os.getenv("CATBOOST_THREAD_COUNT", -1))
+TRAINING_RAM_LIMIT = os.getenv("CATBOOST_RAM_LIMIT") or None
+
+TRAIN_POOL = "train.quantized"
+EVAL_POOL = "eval.quantized"
+BORDERS = "borders.tsv"
+
+
+def training_params():
+    """``thread_count``/``used_ram_limit`` for CatBoost estimators, from the environment."""
+    params = {"thread_count": TRAINING_THREADS}
+    if TRAINING_RAM_LIMIT:
+        params["used_ram_limit"] = TRAINING_RAM_LIMIT
+    return params
+
+
+def _digest(X_train, y_train, X_eval, y_eval, border_count):
+    import catboost
+    import pandas as pd
+
+    sha = hashlib.sha256(f"catboost={catboost.__version__};border_count={border_count}".encode())
+    for part in (X_train, y_train, X_eval, y_eval):
+        if part is None:
+            sha.update(b"\0none")
+            continue
+        if isinstance(part, pd.DataFrame):
+            sha.update("\0".join(map(str, part.columns)).encode())
+        sha.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+    return sha.hexdigest()[:16]
+
+
+def _pool(X, y):
+    from catboost import Pool
+
+    return Pool(X, np.asarray(y, dtype=np.float64), thread_count=TRAINING_THREADS)
+
+
+def _build(directory, X_train, y_train, X_eval, y_eval, border_count):
+    train = _pool(X_train, y_train)
+    train.quantize(border_count=border_count, used_ram_limit=TRAINING_RAM_LIMIT)
+    train.save(os.path.join(directory, TRAIN_POOL))
+    if X_eval is not None:
+        # Same borders as the training split, so the eval metrics see the bins the model was fit on
+        borders = os.path.join(directory, BORDERS)
+        train.save_quantization_borders(borders)
+        evaluation = _pool(X_eval, y_eval)
+        evaluation.quantize(input_borders=borders, used_ram_limit=TRAINING_RAM_LIMIT)
+        evaluation.save(os.path.join(directory, EVAL_POOL))
+
+
+def cache_pools(X_train, y_train, X_eval=None, y_eval=None, border_count=128, cache_dir=None):
+    """Directory holding the pools quantized with ``border_count`` borders, built once per data and settings."""
+    cache_dir = cache_dir or CACHE_DIR
+    directory = os.path.join(cache_dir, _digest(X_train, y_train, X_eval, y_eval, border_count))
+    if os.path.isdir(directory):
+        return directory
+
+    os.makedirs(cache_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix="build-", dir=cache_dir)
+    try:
+        _build(staging, X_train, y_train, X_eval, y_eval, border_count)
+        try:
+            os.rename(staging, directory)
+        except OSError:
+            if not os.path.isdir(directory):
+                raise
+            # Another run stored the same pools first
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return directory
+
+
+def load_pools(directory):
+    """``(train_pool, eval_pool)`` saved by :func:`cache_pools`; ``eval_pool`` is None if it has none."""
+    from catboost import Pool
+
+    train = Pool("quantized://" + os.path.join(directory, TRAIN_POOL))
+    eval_path = os.path.join(directory, EVAL_POOL)
+    evaluation = Pool("quantized://" + eval_path) if os.path.exists(eval_path) else None
+    return train, evaluation
+
+
+def quantized_pools(X_train, y_train, X_eval=None, y_eval=None, border_count=128, cache_dir=None):
+    """
+    ``(train_pool, eval_pool)`` quantized with ``border_count`` borders, built once per data and settings.
+
+    ``eval_pool`` is None without ``X_eval``. Labels are stored as numbers: pass
+    ``class_names`` to classifiers to keep the original labels (e.g. ``[False, True]``).
+    """
+    return load_pools(cache_pools(X_train, y_train, X_eval, y_eval, border_count, cache_dir))
@@ -0,0 +1,176 @@
+"""
+Parallel, resumable Optuna search for the irrigation classifier
+===============================================================
+The hyperparameter search of ``train_classifier.py`` runs as a named Optuna
+study kept in local storage, so it can be spread over several worker
+processes and picked up again after an interruption:
+
+- ``OPTUNA_STUDY``: study name (default ``smart_irrigation_classifier``).
+  Running the script again with the same name resumes the study: finished
+  trials are kept and only the missing ones run;
+- ``OPTUNA_STORAGE``: a journal file (default ``optuna_journal.log`` next to
+  this file), or a database URL such as ``sqlite:///optuna.db``. The journal
+  file is the safer choice with many workers, as SQLite locks the whole
+  database on every write;
+- ``OPTUNA_TRIALS``: finished (complete or pruned) trials the study should
+  reach (default 10);
+- ``OPTUNA_WORKERS``: worker processes (default: one per core). Unless
+  ``CATBOOST_THREAD_COUNT`` is set, the cores are split evenly between them.
+
+Workers read the training and validation split from the quantized pools
+cached by :mod:`catboost_pools`, so they don't reload the dataset. Each
+trial fits against the validation pool, stops ``EARLY_STOPPING_ROUNDS``
+iterations after the best validation accuracy, and reports that accuracy
+every ``REPORT_EVERY`` iterations so the study's median pruner can stop
+trials that are clearly behind the others.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+STUDY_NAME = os.getenv("OPTUNA_STUDY", "smart_irrigation_classifier")
+STORAGE = os.getenv("OPTUNA_STORAGE") or os.path.join(HERE, "optuna_journal.log")
+N_TRIALS = int(os.getenv("OPTUNA_TRIALS", 10))
+WORKERS = int(os.getenv("OPTUNA_WORKERS", 0)) or os.cpu_count() or 1
+
+EVAL_METRIC = "Accuracy"
+EARLY_STOPPING_ROUNDS = 50
+REPORT_EVERY = 25
+
+
+def open_storage(storage):
+    """Optuna storage for ``storage``: a database URL as is, anything else as a journal file."""
+    if "://" in storage:
+        return storage
+    from optuna.storages import JournalStorage
+    from optuna.storages.journal import JournalFileBackend
+
+    return JournalStorage(JournalFileBackend(storage))
+
+
+def load_study(study_name=STUDY_NAME, storage=STORAGE):
+    """Create ``study_name`` in ``storage``, or load it with its trials so far."""
+    import optuna
+
+    return optuna.create_study(
+        study_name=study_name,
+        storage=open_storage(storage),
+        direction="maximize",
+        load_if_exists=True,
+        pruner=optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=4 * REPORT_EVERY),
+    )
+
+
+def finished_trials(study):
+    import optuna
+
+    return len(study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,
+                                                        optuna.trial.TrialState.PRUNED)))
+
+
+def suggest_params(trial):
+    return {
+        'iterations': trial.suggest_int('iterations', 300, 1000),
+        'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.1, log=True),
+        'depth': trial.suggest_int('depth', 4, 10),
+        'l2_leaf_reg': trial.suggest_float('l2_leaf_reg', 1, 10),
+        'random_strength': trial.suggest_float('random_strength', 0.5, 2.0),
+        'bagging_temperature': trial.suggest_float('bagging_temperature', 0.5, 1.0),
+    }
+
+
+class _PruningCallback:
+    """CatBoost ``after_iteration`` hook reporting validation accuracy to the trial."""
+
+    def __init__(self, trial):
+        self.trial = trial
+        self.pruned = False
+
+    def after_iteration(self, info):
+        if (info.iteration + 1) % REPORT_EVERY:
+            return True
+        self.trial.report(info.metrics["validation"][EVAL_METRIC][-1], step=info.iteration + 1)
+        self.pruned = self.trial.should_prune()
+        return not self.pruned
+
+
+def objective(trial, pool_dir):
+    import optuna
+    from catboost import CatBoostClassifier
+
+    sys.path.insert(0, HERE)
+    from catboost_pools import load_pools, training_params
+
+    train_pool, eval_pool = load_pools(pool_dir)
+    pruning = _PruningCallback(trial)
+    model = CatBoostClassifier(**suggest_params(trial), eval_metric=EVAL_METRIC, verbose=False, random_seed=42,
+                               allow_writing_files=False, **training_params())
+    model.fit(train_pool, eval_set=eval_pool, early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+              use_best_model=True, callbacks=[pruning])
+    if pruning.pruned:
+        raise optuna.TrialPruned()
+    # The model is cut back to its best iteration; the final fit reuses that length
+    trial.set_user_attr("best_iteration", int(model.get_best_iteration()))
+    return model.get_best_score()["validation"][EVAL_METRIC]
+
+
+def _work(study_name, storage, pool_dir, n_trials):
+    import optuna
+
+    study = load_study(study_name, storage)
+    if finished_trials(study) >= n_trials:
+        return
+    study.optimize(
+        lambda trial: objective(trial, pool_dir),
+        callbacks=[optuna.study.MaxTrialsCallback(n_trials, states=(optuna.trial.TrialState.COMPLETE,
+                                                                    optuna.trial.TrialState.PRUNED))],
+    )
+
+
+def search(pool_dir, study_name=STUDY_NAME, storage=STORAGE, n_trials=N_TRIALS, workers=WORKERS):
+    """
+    Run ``study_name`` until it has ``n_trials`` finished trials, on ``workers`` processes.
+
+    ``pool_dir`` is a :func:`catboost_pools.cache_pools` directory with a
+    validation pool. Returns the study, including trials from earlier runs.
+    """
+    load_study(study_name, storage)  # created once here, not raced by the workers
+    workers = max(1, min(workers, n_trials))
+    if workers == 1:
+        _work(study_name, storage, pool_dir, n_trials)
+        return load_study(study_name, storage)
+
+    env = dict(os.environ)
+    env.setdefault("CATBOOST_THREAD_COUNT", str(max(1, (os.cpu_count() or 1) // workers)))
+    command = [sys.executable, os.path.abspath(__file__), "--worker", "--study", study_name,
+               "--storage", storage, "--trials", str(n_trials), pool_dir]
+    processes = [subprocess.Popen(command, env=env) for _ in range(workers)]
+    failed = sum(p.wait() != 0 for p in processes)
+    if failed:
+        raise RuntimeError(f"{failed} of {workers} Optuna workers failed")
+    return load_study(study_name, storage)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("pool_dir", help="catboost_pools cache directory with train and eval pools")
+    parser.add_argument("--study", default=STUDY_NAME)
+    parser.add_argument("--storage", default=STORAGE)
+    parser.add_argument("--trials", type=int, default=N_TRIALS)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _work(args.study, args.storage, args.pool_dir, args.trials)
+        return
+    study = search(args.pool_dir, args.study, args.storage, args.trials, args.workers)
+    print(f"{finished_trials(study)} finished trials; best accuracy {study.best_value:.4f} with {study.best_params}")
+
+
+if __name__ == "__main__":
+    main()
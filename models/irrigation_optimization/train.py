@@ -19,6 +19,8 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../mlflow_tools'))
 from mlflow_config import setup_mlflow, log_dataset_info
+from models.irrigation_optimization.catboost_native import export_native
+from models.irrigation_optimization.catboost_pools import quantized_pools, training_params
 
 # ===============================
 # 📂 LOAD DATA
@@ -77,6 +79,11 @@ X_train, X_test, y_train, y_test = train_test_split(
     X, y, test_size=0.2, random_state=42
 )
 
+# Quantized once with fixed borders (CatBoost's default 254) and cached on disk; the test
+# pool reuses the training borders so it can serve as eval_set
+BORDER_COUNT = 254
+train_pool, test_pool = quantized_pools(X_train, y_train, X_test, y_test, border_count=BORDER_COUNT)
+
 # Setup MLflow
 setup_mlflow('irrigation_optimization')
 
@@ -90,6 +97,7 @@ with mlflow.start_run(run_name="CatBoost_Irrigation_Optimization"):
     mlflow.log_param("depth", 8)
     mlflow.log_param("loss_function", "RMSE")
     mlflow.log_param("eval_metric", "R2")
+    mlflow.log_param("border_count", BORDER_COUNT)
     mlflow.log_param("test_size", 0.2)
     mlflow.log_param("random_seed", 42)
     mlflow.log_param("num_features", len(features))
@@ -110,16 +118,20 @@ with mlflow.start_run(run_name="CatBoost_Irrigation_Optimization"):
         loss_function='RMSE',
         eval_metric='R2',
         random_seed=42,
-        verbose=200
+        verbose=200,
+        **training_params()
     )
     
-    model.fit(X_train, y_train, eval_set=(X_test, y_test), use_best_model=True)
+    model.fit(train_pool, eval_set=test_pool, use_best_model=True)
     
     # ===============================
     # 💾 SAVE MODEL
     # ===============================
     joblib.dump(model, 'catboost_irrigation_model.pkl')
     print("✅ Model saved successfully as 'catboost_irrigation_model.pkl'")
+    # Native CatBoost copy + feature schema, preferred by the app when present
+    export_native(model, 'catboost_irrigation_model.pkl', features)
+    print("✅ Native model saved as 'catboost_irrigation_model.cbm'")
     
     # ===============================
     # 📊 EVALUATION
@@ -198,6 +210,8 @@ with mlflow.start_run(run_name="CatBoost_Irrigation_Optimization"):
     
     # Log local model artifact
     mlflow.log_artifact("catboost_irrigation_model.pkl")
+    mlflow.log_artifact("catboost_irrigation_model.cbm")
+    mlflow.log_artifact("catboost_irrigation_model.schema.json")
     
     print("\n✅ Training completed successfully!")
     print(f"🔗 MLflow Run ID: {mlflow.active_run().info.run_id}")
@@ -5,7 +5,6 @@ import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report, precision_score, recall_score, f1_score
 from catboost import CatBoostClassifier
-import optuna
 import joblib
 import mlflow
 import mlflow.catboost
@@ -17,6 +16,10 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../mlflow_tools'))
 from mlflow_config import setup_mlflow, log_dataset_info
+from models.irrigation_optimization.catboost_native import export_native
+from models.irrigation_optimization.catboost_pools import cache_pools, load_pools, training_params
+from models.irrigation_optimization.optuna_search import (N_TRIALS, STORAGE, STUDY_NAME, WORKERS,
+                                                         load_study, search)
 
 # ===============================
 # 📂 LOAD YOUR DATA
@@ -76,6 +79,20 @@ X = X.fillna(X.mean())
 X_train, X_test, y_train, y_test = train_test_split(
     X, y, test_size=0.2, random_state=42
 )
+# Hold out a validation set from the training split for the Optuna trials (early stopping,
+# pruning, number of iterations); the test split is only used to evaluate the final model
+X_fit, X_val, y_fit, y_val = train_test_split(
+    X_train, y_train, test_size=0.2, random_state=42
+)
+
+# Quantize each split once (fixed borders, cached on disk) and reuse it for every fit below:
+# the Optuna trials fit on X_fit with X_val binned with the same borders, the initial and
+# final models on the whole training split
+BORDER_COUNT = 128
+search_pool_dir = cache_pools(X_fit, y_fit, X_val, y_val, border_count=BORDER_COUNT)
+train_pool, _ = load_pools(cache_pools(X_train, y_train, border_count=BORDER_COUNT))
+# The pool stores labels as numbers; class_names keeps predictions as the original labels
+class_names = sorted(y_train.unique())
 
 # ===============================
 # 🐱 INITIAL CATBOOST MODEL
@@ -89,12 +106,13 @@ cat = CatBoostClassifier(
     l2_leaf_reg=5,
     random_strength=1.5,
     bagging_temperature=0.8,
-    border_count=128,
     verbose=False,
-    random_seed=42
+    random_seed=42,
+    class_names=class_names,
+    **training_params()
 )
 
-cat.fit(X_train, y_train)
+cat.fit(train_pool)
 y_pred_cat = cat.predict(X_test)
 
 print(f"Initial Accuracy: {accuracy_score(y_test, y_pred_cat):.4f}")
@@ -109,37 +127,22 @@ print("\n🔹 Starting Optuna optimization...")
 # Setup MLflow
 setup_mlflow('smart_irrigation_classifier')
 
-def objective(trial):
+# Trials run in parallel worker processes against a named study in local storage;
+# re-running with the same OPTUNA_STUDY resumes it (see optuna_search.py)
+print(f"Study '{STUDY_NAME}' in {STORAGE}: {N_TRIALS} trials on {WORKERS} workers")
+trials_before = len(load_study(STUDY_NAME, STORAGE).trials)
+study = search(search_pool_dir, STUDY_NAME, STORAGE, N_TRIALS, WORKERS)
+
+# One nested MLflow run per trial of this session
+for trial in study.trials[trials_before:]:
     with mlflow.start_run(run_name=f"Optuna_Trial_{trial.number}", nested=True):
-        params = {
-            'iterations': trial.suggest_int('iterations', 300, 1000),
-            'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.1, log=True),
-            'depth': trial.suggest_int('depth', 4, 10),
-            'l2_leaf_reg': trial.suggest_float('l2_leaf_reg', 1, 10),
-            'random_strength': trial.suggest_float('random_strength', 0.5, 2.0),
-            'bagging_temperature': trial.suggest_float('bagging_temperature', 0.5, 1.0),
-            'border_count': trial.suggest_int('border_count', 32, 128),
-            'verbose': False,
-            'random_seed': 42
-        }
-        
-        # Log parameters
-        for key, value in params.items():
+        for key, value in trial.params.items():
             mlflow.log_param(key, value)
-
-        model = CatBoostClassifier(**params)
-        model.fit(X_train, y_train)
-        preds = model.predict(X_test)
-        acc = accuracy_score(y_test, preds)
-        
-        # Log metrics
-        mlflow.log_metric("accuracy", acc)
+        mlflow.log_param('border_count', BORDER_COUNT)
+        mlflow.log_param('state', trial.state.name)
+        if trial.value is not None:
+            mlflow.log_metric("accuracy", trial.value)
         mlflow.log_metric("trial_number", trial.number)
-        
-        return acc
-
-study = optuna.create_study(direction='maximize')
-study.optimize(objective, n_trials=10)
 
 print("\n🏆 Best Parameters:", study.best_params)
 print(f"🎯 Best Accuracy: {study.best_value:.4f}")
@@ -148,6 +151,9 @@ print(f"🎯 Best Accuracy: {study.best_value:.4f}")
 # 🚀 TRAIN FINAL MODEL WITH BEST PARAMS
 # ===============================
 best_params = study.best_params
+# The best trial stopped early at its best validation iteration; train the same length,
+# on the whole training split
+best_params['iterations'] = study.best_trial.user_attrs['best_iteration'] + 1
 best_params['verbose'] = False
 best_params['random_seed'] = 42
 
@@ -159,6 +165,8 @@ with mlflow.start_run(run_name="Final_Best_Model"):
     # Log dataset info
     log_dataset_info(merged_df, "irrigation_classifier_dataset")
     mlflow.log_param("train_samples", X_train.shape[0])
+    mlflow.log_param("search_train_samples", X_fit.shape[0])
+    mlflow.log_param("search_validation_samples", X_val.shape[0])
     mlflow.log_param("test_samples", X_test.shape[0])
     mlflow.log_param("num_features", len(important_features))
     mlflow.log_param("features", important_features)
@@ -166,9 +174,10 @@ with mlflow.start_run(run_name="Final_Best_Model"):
     # Log best parameters
     for key, value in best_params.items():
         mlflow.log_param(f"best_{key}", value)
+    mlflow.log_param("border_count", BORDER_COUNT)
     
-    best_cat = CatBoostClassifier(**best_params)
-    best_cat.fit(X_train, y_train)
+    best_cat = CatBoostClassifier(**best_params, class_names=class_names, **training_params())
+    best_cat.fit(train_pool)
     
     # ===============================
     # 📊 EVALUATE FINAL MODEL
@@ -224,6 +233,10 @@ with mlflow.start_run(run_name="Final_Best_Model"):
     # Save trained model
     joblib.dump(best_cat, "catboost_model.pkl")
     mlflow.log_artifact("catboost_model.pkl")
+    # Native CatBoost copy + feature schema, preferred by the app when present
+    export_native(best_cat, "catboost_model.pkl", important_features)
+    mlflow.log_artifact("catboost_model.cbm")
+    mlflow.log_artifact("catboost_model.schema.json")
     
     # Log model with signature
     signature = infer_signature(X_train, best_cat.predict(X_train))
@@ -0,0 +1,85 @@
+"""
+Benchmark: frozen-backbone training on images vs on cached embeddings
+=====================================================================
+Times the first (frozen MobileNetV2) phase of ``train_soil_model.py`` on
+the soil images three ways, with the same input pipeline, head and epochs:
+
+- ``images``: the full model fitted on :func:`soil_dataset.make_dataset`
+  batches, which recomputes the backbone for every image on every epoch;
+- ``embeddings, cold``: :func:`embedding_cache.cached_embeddings` runs the
+  backbone once per (image, epoch variant), then the head is fitted;
+- ``embeddings, cached``: a re-run, with the embeddings already on disk.
+
+Usage::
+
+    python models/soil_classification/benchmark_head.py
+    python models/soil_classification/benchmark_head.py --epochs 5 --weights none
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA = os.path.join(HERE, "..", "..", "data", "soil_images", "train")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("data", nargs="?", default=DEFAULT_DATA, help="image folder, one subfolder per class")
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--weights", default="imagenet", help="'imagenet' or 'none' (random, same compute)")
+    args = parser.parse_args()
+
+    from tensorflow import keras
+    from tensorflow.keras import layers
+
+    sys.path.insert(0, HERE)
+    from embedding_cache import EMBEDDING_DIM, EmbeddingSequence, cached_embeddings, pooled_encoder
+    from soil_dataset import augmentation, list_images, make_dataset
+
+    class_names, (train_paths, train_labels), (val_paths, val_labels) = list_images(args.data)
+    num_classes = len(class_names)
+    train = make_dataset(train_paths, train_labels, num_classes, args.batch, augment=augmentation(42), shuffle=True)
+    val = make_dataset(val_paths, val_labels, num_classes, args.batch)
+
+    backbone = keras.applications.MobileNetV2(input_shape=(224, 224, 3), include_top=False,
+                                              weights=None if args.weights == "none" else args.weights)
+    backbone.trainable = False
+    head_layers = [layers.BatchNormalization(), layers.Dropout(0.5), layers.Dense(256, activation='relu'),
+                   layers.BatchNormalization(), layers.Dropout(0.3), layers.Dense(128, activation='relu'),
+                   layers.Dropout(0.2), layers.Dense(num_classes, activation='softmax')]
+    model = keras.Sequential([layers.Input(shape=(224, 224, 3)), backbone, layers.GlobalAveragePooling2D(),
+                              *head_layers])
+    head = keras.Sequential([layers.Input(shape=(EMBEDDING_DIM,)), *head_layers])
+    for m in (model, head):
+        m.compile(optimizer=keras.optimizers.Adam(1e-4), loss='categorical_crossentropy', metrics=['accuracy'])
+
+    started = time.perf_counter()
+    model.fit(train, validation_data=val, epochs=args.epochs, verbose=0)
+    baseline = time.perf_counter() - started
+    images = len(train_paths) * args.epochs
+    print(f"{len(train_paths)} training images x {args.epochs} epochs")
+    print(f"{'images':<20} {baseline:>8.1f} s  {images / baseline:>8.1f} images/s")
+
+    encoder = pooled_encoder(backbone)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label in ("embeddings, cold", "embeddings, cached"):
+            started = time.perf_counter()
+            train_embeddings = cached_embeddings(encoder, train_paths, augmentation, variants=args.epochs,
+                                                 cache_dir=cache_dir)
+            val_embeddings = cached_embeddings(encoder, val_paths, cache_dir=cache_dir)
+            embedded = time.perf_counter() - started
+            head.fit(EmbeddingSequence(train_embeddings, train_labels, args.batch, num_classes),
+                     validation_data=(val_embeddings[0], keras.utils.to_categorical(val_labels, num_classes)),
+                     epochs=args.epochs, verbose=0)
+            seconds = time.perf_counter() - started
+            print(f"{label:<20} {seconds:>8.1f} s  {images / seconds:>8.1f} images/s  "
+                  f"(embedding {embedded:.1f} s)  {baseline / seconds:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
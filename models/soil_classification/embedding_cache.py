@@ -0,0 +1,135 @@
+"""
+Cached backbone embeddings for training the soil model's head
+=============================================================
+While MobileNetV2 is frozen, the classifier head only ever sees the
+backbone's pooled 1,280-d output, yet fitting the full model recomputes
+that output for every image on every epoch. :func:`cached_embeddings` runs
+the frozen backbone once per (image, augmentation seed) instead and stores
+the pooled embeddings as a ``(variants, images, 1280)`` float32 ``.npy``
+that is read back memory-mapped; :class:`EmbeddingSequence` then trains
+the head on those arrays, serving variant ``epoch % variants`` each epoch.
+
+Images are decoded by :mod:`soil_dataset`, and variant ``v`` is augmented
+by the layers ``augment(seed + v)`` returns, run over the images in order,
+so a variant is the same every time it is built. Embeddings are stored
+under ``<AGRITECH_MODEL_CACHE>/embeddings/<digest>.npy``, where the digest
+covers the image files, the augmentation settings, the number of variants
+and the backbone's weights: re-running the training script on unchanged
+data skips the backbone entirely until the fine-tuning phase.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import uuid
+
+import numpy as np
+from tensorflow import keras
+
+from soil_dataset import image_batches
+
+MODEL_CACHE_DIR = os.getenv("AGRITECH_MODEL_CACHE") or os.path.join(tempfile.gettempdir(), "agritech-model-cache")
+CACHE_DIR = os.path.join(MODEL_CACHE_DIR, "embeddings")
+
+EMBEDDING_DIM = 1280
+BATCH_SIZE = 32
+
+
+def pooled_encoder(backbone):
+    """``backbone`` followed by global average pooling: image batch -> ``(batch, channels)``."""
+    return keras.Sequential([
+        keras.layers.Input(shape=backbone.input_shape[1:]),
+        backbone,
+        keras.layers.GlobalAveragePooling2D(),
+    ])
+
+
+def _without_names(config):
+    # Layer names are numbered per process ("random_flip_3"), so they can't be part of the key
+    if isinstance(config, dict):
+        return {k: _without_names(v) for k, v in config.items() if k != "name"}
+    if isinstance(config, list):
+        return [_without_names(v) for v in config]
+    return config
+
+
+def _digest(encoder, paths, augment, variants, seed):
+    sha = hashlib.sha256(f"keras={keras.__version__};variants={variants};seed={seed}".encode())
+    sha.update(repr(encoder.input_shape).encode())
+    if augment is not None:
+        sha.update(json.dumps(_without_names(augment(seed).get_config()), sort_keys=True, default=str).encode())
+    for path in paths:
+        stat = os.stat(path)
+        sha.update(f"{os.path.abspath(path)}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode())
+    for weights in encoder.get_weights():
+        sha.update(np.ascontiguousarray(weights).tobytes())
+    return sha.hexdigest()[:16]
+
+
+def compute_embeddings(encoder, paths, out, augment=None, seed=42, batch_size=BATCH_SIZE):
+    """
+    Fill ``out[variant, image]`` with the embedding of every image in ``paths``.
+
+    Each image is decoded once. With ``augment`` (``seed -> Keras layer``),
+    variant ``v`` is the output of ``augment(seed + v)`` over the images in
+    order, ``batch_size`` at a time; without it, the images are used as is.
+    """
+    augmenters = [augment(seed + variant) for variant in range(out.shape[0])] if augment is not None else None
+    start = 0
+    for images in image_batches(paths, batch_size, encoder.input_shape[1:3]):
+        for variant in range(out.shape[0]):
+            batch = augmenters[variant](images, training=True) if augmenters else images
+            out[variant, start:start + len(images)] = encoder.predict_on_batch(batch)
+        start += len(images)
+
+
+def cached_embeddings(encoder, paths, augment=None, variants=1, seed=42, cache_dir=None):
+    """
+    ``(variants, len(paths), dim)`` embeddings of ``paths``, memory-mapped read-only.
+
+    Computed with :func:`compute_embeddings` the first time and loaded from
+    the cache afterwards.
+    """
+    paths = [str(path) for path in paths]
+    cache_dir = cache_dir or CACHE_DIR
+    path = os.path.join(cache_dir, _digest(encoder, paths, augment, variants, seed) + ".npy")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32,
+                                            shape=(variants, len(paths), encoder.output_shape[-1]))
+            compute_embeddings(encoder, paths, out, augment, seed)
+            out.flush()
+            del out
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    return np.load(path, mmap_mode="r")
+
+
+class EmbeddingSequence(keras.utils.Sequence):
+    """Shuffled ``(embedding, one-hot label)`` batches, one augmentation variant per epoch."""
+
+    def __init__(self, embeddings, labels, batch_size, num_classes, seed=42):
+        super().__init__()
+        self.embeddings = embeddings
+        self.labels = keras.utils.to_categorical(labels, num_classes)
+        self.batch_size = batch_size
+        self.epoch = 0
+        self._rng = np.random.default_rng(seed)
+        self._order = self._rng.permutation(embeddings.shape[1])
+
+    def __len__(self):
+        return -(-self.embeddings.shape[1] // self.batch_size)
+
+    def __getitem__(self, index):
+        rows = np.sort(self._order[index * self.batch_size:(index + 1) * self.batch_size])
+        variant = self.embeddings[self.epoch % self.embeddings.shape[0]]
+        return np.asarray(variant[rows]), self.labels[rows]
+
+    def on_epoch_end(self):
+        self.epoch += 1
+        self._order = self._rng.permutation(self.embeddings.shape[1])
@@ -0,0 +1,112 @@
+"""
+tf.data input pipeline for the soil image classifier
+====================================================
+Replaces ``ImageDataGenerator.flow_from_directory``, which decodes, resizes
+and augments every JPEG on one Python thread on every epoch:
+
+- :func:`list_images` lists the class folders once and makes the same
+  per-class train/validation split as ``flow_from_directory`` with
+  ``validation_split`` (the first fraction of each class's sorted files is
+  the validation set);
+- :func:`make_dataset` decodes and resizes in parallel (``AUTOTUNE``),
+  caches the resized 224x224 tensors (in memory, or in a file), shuffles,
+  batches, augments in-graph with the Keras preprocessing layers from
+  :func:`augmentation`, and prefetches.
+
+Images are resized with Lanczos filtering and scaled to [0, 1], as the
+app does before predicting (``streamlit_app/predictions.py``).
+"""
+
+import os
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+
+IMG_SIZE = (224, 224)
+AUTOTUNE = tf.data.AUTOTUNE
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif")
+
+
+def list_images(data_dir, validation_split=0.2):
+    """
+    ``(class_names, (train_paths, train_labels), (val_paths, val_labels))`` for ``data_dir``.
+
+    ``data_dir`` has one subfolder per class (images in nested folders count
+    too); classes are sorted by name and labelled 0..n-1, like
+    ``flow_from_directory``.
+    """
+    class_names = sorted(entry.name for entry in os.scandir(data_dir) if entry.is_dir())
+    train, val = ([], []), ([], [])
+    for label, name in enumerate(class_names):
+        # Subfolders included, in flow_from_directory's order
+        files = [os.path.join(root, f)
+                 for root, _, filenames in sorted(os.walk(os.path.join(data_dir, name)), key=lambda w: w[0])
+                 for f in sorted(filenames) if f.lower().endswith(IMAGE_EXTENSIONS)]
+        split = int(validation_split * len(files))
+        for i, path in enumerate(files):
+            paths, labels = val if i < split else train
+            paths.append(path)
+            labels.append(label)
+    return (class_names,
+            (train[0], np.array(train[1], dtype=np.int32)),
+            (val[0], np.array(val[1], dtype=np.int32)))
+
+
+def decode_image(path, image_size=IMG_SIZE):
+    """JPEG/PNG file -> ``(height, width, 3)`` float32 in [0, 1]."""
+    image = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+    image = tf.image.resize(image, image_size, method="lanczos3", antialias=True)
+    return tf.clip_by_value(image, 0.0, 255.0) / 255.0
+
+
+def augmentation(seed=None):
+    """
+    In-graph equivalent of the training script's ``ImageDataGenerator`` settings.
+
+    Rotation up to 40 degrees, shifts and zoom up to 20% and both flips, with
+    edges filled with the nearest pixel. ``shear_range=0.2`` there is an angle
+    in degrees, too small to matter, so there is no shear layer.
+    """
+    return keras.Sequential([
+        keras.layers.RandomRotation(40 / 360, fill_mode="nearest", seed=seed),
+        keras.layers.RandomTranslation(0.2, 0.2, fill_mode="nearest", seed=seed),
+        keras.layers.RandomZoom((-0.2, 0.2), (-0.2, 0.2), fill_mode="nearest", seed=seed),
+        keras.layers.RandomFlip("horizontal_and_vertical", seed=seed),
+    ], name="augmentation")
+
+
+def image_batches(paths, batch_size, image_size=IMG_SIZE):
+    """Decoded images of ``paths``, in order, ``batch_size`` at a time."""
+    def decode(path):
+        return decode_image(path, image_size)
+
+    return tf.data.Dataset.from_tensor_slices(list(paths)).map(decode, num_parallel_calls=AUTOTUNE) \
+        .batch(batch_size).prefetch(AUTOTUNE)
+
+
+def make_dataset(paths, labels, num_classes, batch_size, image_size=IMG_SIZE, augment=None, shuffle=False,
+                 cache="", seed=42):
+    """
+    ``(images, one-hot labels)`` batches for ``model.fit``/``evaluate``.
+
+    ``cache`` is ``""`` to keep the resized images in memory after the first
+    epoch, a file path to cache them on disk, or None not to cache.
+    ``augment`` is a Keras layer applied to each training batch.
+    """
+    def decode(path, label):
+        return decode_image(path, image_size), tf.one_hot(label, num_classes)
+
+    def augment_batch(images, label):
+        return augment(images, training=True), label
+
+    dataset = tf.data.Dataset.from_tensor_slices((list(paths), np.asarray(labels, dtype=np.int32)))
+    dataset = dataset.map(decode, num_parallel_calls=AUTOTUNE)
+    if cache is not None:
+        dataset = dataset.cache(cache)
+    if shuffle:
+        dataset = dataset.shuffle(len(paths), seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size)
+    if augment is not None:
+        dataset = dataset.map(augment_batch, num_parallel_calls=AUTOTUNE)
+    return dataset.prefetch(AUTOTUNE)
@@ -0,0 +1,288 @@
+"""
+Resolution / width-multiplier sweep for the soil CNN
+====================================================
+``train_soil_model.py`` trains a full-width MobileNetV2 at 224x224, which
+is probably far more than three soil classes need. This script trains the
+same model for every combination of input resolution (``--resolutions``,
+96..224) and MobileNetV2 width multiplier (``--alphas``, 0.35..1.0). For
+each variant it records:
+
+- ``val_accuracy`` / ``val_loss`` of the complete model on the validation split;
+- ``latency_ms``: median single-image CPU inference time;
+- ``size_mb``: size of the saved ``.h5`` (weights only), and the parameter count.
+
+Each variant trains its head on cached embeddings of the frozen backbone
+(:mod:`embedding_cache`), as the training script's first phase does, and
+``--fine-tune-epochs`` optionally adds the script's fine-tuning phase.
+Every variant is a nested MLflow run under one ``Resolution_Width_Sweep``
+run of the ``Soil-Classification-Model`` experiment. The report lists the
+variants on the Pareto frontier (no other variant is at least as accurate,
+fast and small, and better in one of these), and the smallest one that
+reaches ``--min-accuracy``. Train that variant for the app with::
+
+    SOIL_IMG_SIZE=<resolution> SOIL_ALPHA=<alpha> python models/soil_classification/train_soil_model.py
+
+The app resizes images to whatever input size the saved model has.
+
+Usage::
+
+    python models/soil_classification/sweep_soil_model.py
+    python models/soil_classification/sweep_soil_model.py --resolutions 96 160 --alphas 0.35 1.0 --epochs 5
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA = os.path.join(HERE, "..", "..", "data", "soil_images", "train")
+DEFAULT_OUT = os.path.join(HERE, "sweep")
+
+# Sizes and widths MobileNetV2 has ImageNet weights for
+RESOLUTIONS = (96, 128, 160, 192, 224)
+ALPHAS = (0.35, 0.5, 0.75, 1.0)
+
+BATCH_SIZE = 8
+EPOCHS = 20
+LEARNING_RATE = 0.0001
+LATENCY_RUNS = 50
+
+COLUMNS = ["resolution", "alpha", "val_accuracy", "val_loss", "latency_ms", "size_mb", "params", "pareto"]
+
+
+def build_variant(resolution, alpha, num_classes, weights="imagenet"):
+    """``(model, base_model, head)`` for one variant; the architecture of ``train_soil_model.py``."""
+    from tensorflow import keras
+    from tensorflow.keras import layers
+
+    base_model = keras.applications.MobileNetV2(input_shape=(resolution, resolution, 3), alpha=alpha,
+                                                include_top=False, weights=weights)
+    base_model.trainable = False
+    head_layers = [
+        layers.BatchNormalization(),
+        layers.Dropout(0.5),
+        layers.Dense(256, activation='relu'),
+        layers.BatchNormalization(),
+        layers.Dropout(0.3),
+        layers.Dense(128, activation='relu'),
+        layers.Dropout(0.2),
+        layers.Dense(num_classes, activation='softmax', name='predictions')
+    ]
+    model = keras.Sequential([layers.Input(shape=(resolution, resolution, 3)), base_model,
+                              layers.GlobalAveragePooling2D(), *head_layers])
+    head = keras.Sequential([layers.Input(shape=(base_model.output_shape[-1],)), *head_layers])
+    return model, base_model, head
+
+
+def cpu_latency_ms(model, runs=LATENCY_RUNS, warmup=5):
+    """Median time of ``runs`` single-image forward passes on the CPU, in milliseconds."""
+    import tensorflow as tf
+
+    with tf.device("/CPU:0"):
+        infer = tf.function(lambda x: model(x, training=False))
+        image = tf.random.uniform((1, *model.input_shape[1:]))
+        for _ in range(warmup):
+            infer(image)
+        times = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            infer(image).numpy()
+            times.append(time.perf_counter() - started)
+    return float(np.median(times) * 1000)
+
+
+def pareto_frontier(rows):
+    """
+    The rows no other row dominates, by size.
+
+    A row dominates another if its ``val_accuracy`` is at least as high and
+    its ``latency_ms`` and ``size_mb`` at least as low, and one is strictly better.
+    """
+    def dominates(a, b):
+        at_least = (a["val_accuracy"] >= b["val_accuracy"] and a["latency_ms"] <= b["latency_ms"]
+                    and a["size_mb"] <= b["size_mb"])
+        better = (a["val_accuracy"] > b["val_accuracy"] or a["latency_ms"] < b["latency_ms"]
+                  or a["size_mb"] < b["size_mb"])
+        return at_least and better
+
+    frontier = [row for row in rows if not any(dominates(other, row) for other in rows)]
+    return sorted(frontier, key=lambda row: (row["size_mb"], row["latency_ms"]))
+
+
+def smallest_meeting(rows, min_accuracy):
+    """The smallest row (then fastest) with ``val_accuracy >= min_accuracy``, or None."""
+    meeting = [row for row in rows if row["val_accuracy"] >= min_accuracy]
+    return min(meeting, key=lambda row: (row["size_mb"], row["latency_ms"]), default=None)
+
+
+def format_report(rows, min_accuracy):
+    """Markdown report: every variant (frontier marked), then the frontier and the recommendation."""
+    def table(selected):
+        lines = ["| resolution | alpha | val accuracy | latency (ms) | size (MB) | params | Pareto |",
+                 "|---:|---:|---:|---:|---:|---:|:---:|"]
+        for row in selected:
+            lines.append(f"| {row['resolution']} | {row['alpha']} | {row['val_accuracy']:.2%} | "
+                         f"{row['latency_ms']:.1f} | {row['size_mb']:.2f} | {row['params']:,} | "
+                         f"{'✓' if row['pareto'] else ''} |")
+        return lines
+
+    ordered = sorted(rows, key=lambda row: (row["alpha"], row["resolution"]))
+    lines = ["# Soil CNN: resolution / width sweep", "", "## All variants", ""] + table(ordered)
+    lines += ["", "## Pareto frontier (by size)", ""] + table(pareto_frontier(rows))
+    best = smallest_meeting(rows, min_accuracy)
+    lines += ["", f"## Smallest variant with validation accuracy >= {min_accuracy:.0%}", ""]
+    if best is None:
+        lines.append("None of the variants reaches it.")
+    else:
+        lines += [f"alpha {best['alpha']} at {best['resolution']}x{best['resolution']}: "
+                  f"{best['val_accuracy']:.2%}, {best['latency_ms']:.1f} ms, {best['size_mb']:.2f} MB. Train it with:",
+                  "", "```bash",
+                  f"SOIL_IMG_SIZE={best['resolution']} SOIL_ALPHA={best['alpha']} "
+                  "python models/soil_classification/train_soil_model.py",
+                  "```"]
+    return "\n".join(lines) + "\n"
+
+
+def train_variant(resolution, alpha, data, epochs=EPOCHS, fine_tune_epochs=0, weights="imagenet",
+                  model_path=None):
+    """
+    Train and measure one variant; returns its row (without ``pareto``).
+
+    ``data`` is :func:`soil_dataset.list_images` output. The model is saved
+    to ``model_path`` (a temporary file if None) to measure its size.
+    """
+    from tensorflow import keras
+
+    from embedding_cache import EmbeddingSequence, cached_embeddings, pooled_encoder
+    from soil_dataset import augmentation, make_dataset
+
+    class_names, (train_paths, train_labels), (val_paths, val_labels) = data
+    num_classes = len(class_names)
+    image_size = (resolution, resolution)
+    keras.utils.set_random_seed(42)
+    model, base_model, head = build_variant(resolution, alpha, num_classes, weights)
+
+    # Phase 1: the head on cached embeddings of the frozen backbone
+    encoder = pooled_encoder(base_model)
+    train_embeddings = cached_embeddings(encoder, train_paths, augmentation, variants=epochs)
+    val_embeddings = cached_embeddings(encoder, val_paths)
+    head.compile(optimizer=keras.optimizers.Adam(learning_rate=LEARNING_RATE),
+                 loss='categorical_crossentropy', metrics=['accuracy'])
+    head.fit(EmbeddingSequence(train_embeddings, train_labels, BATCH_SIZE, num_classes),
+             validation_data=(np.asarray(val_embeddings[0]), keras.utils.to_categorical(val_labels, num_classes)),
+             epochs=epochs, verbose=0,
+             callbacks=[keras.callbacks.EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True)])
+
+    validation_dataset = make_dataset(val_paths, val_labels, num_classes, BATCH_SIZE, image_size=image_size)
+    if fine_tune_epochs:
+        # Phase 2: the last 20 backbone layers, as in train_soil_model.py
+        base_model.trainable = True
+        for layer in base_model.layers[:-20]:
+            layer.trainable = False
+        model.compile(optimizer=keras.optimizers.Adam(learning_rate=LEARNING_RATE / 10),
+                      loss='categorical_crossentropy', metrics=['accuracy'])
+        train_dataset = make_dataset(train_paths, train_labels, num_classes, BATCH_SIZE, image_size=image_size,
+                                     augment=augmentation(seed=42), shuffle=True)
+        model.fit(train_dataset, validation_data=validation_dataset, epochs=fine_tune_epochs, verbose=0,
+                  callbacks=[keras.callbacks.EarlyStopping(monitor='val_loss', patience=10,
+                                                           restore_best_weights=True)])
+    else:
+        model.compile(loss='categorical_crossentropy', metrics=['accuracy'])
+    val_loss, val_accuracy = model.evaluate(validation_dataset, verbose=0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = model_path or os.path.join(tmp, "model.h5")
+        # Without the optimizer state, as the app loads it (compile=False)
+        model.save(path, include_optimizer=False)
+        size_mb = os.path.getsize(path) / 1e6
+    return {
+        "resolution": resolution,
+        "alpha": alpha,
+        "val_accuracy": float(val_accuracy),
+        "val_loss": float(val_loss),
+        "latency_ms": cpu_latency_ms(model),
+        "size_mb": size_mb,
+        "params": int(model.count_params()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("data", nargs="?", default=DEFAULT_DATA, help="image folder, one subfolder per class")
+    parser.add_argument("--resolutions", type=int, nargs="+", default=list(RESOLUTIONS))
+    parser.add_argument("--alphas", type=float, nargs="+", default=list(ALPHAS))
+    parser.add_argument("--epochs", type=int, default=EPOCHS, help="head epochs (embedding variants)")
+    parser.add_argument("--fine-tune-epochs", type=int, default=0)
+    parser.add_argument("--min-accuracy", type=float, default=0.9, help="accuracy bar for the recommendation")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="directory for the report and, with --keep-models, "
+                                                          "the models")
+    parser.add_argument("--keep-models", action="store_true", help="keep every variant's .h5 and log it to MLflow")
+    parser.add_argument("--weights", default="imagenet", help="'imagenet' or 'none' (random, same compute)")
+    args = parser.parse_args()
+
+    import mlflow
+
+    sys.path.insert(0, HERE)
+    sys.path.append(os.path.join(HERE, '..', '..', 'mlflow'))
+    from mlflow_config import setup_mlflow
+    from soil_dataset import list_images
+
+    weights = None if args.weights == "none" else args.weights
+    data = list_images(args.data, validation_split=0.2)
+    os.makedirs(args.out, exist_ok=True)
+    setup_mlflow('soil_classification')
+
+    rows, run_ids = [], []
+    with mlflow.start_run(run_name="Resolution_Width_Sweep"):
+        mlflow.log_params({"resolutions": args.resolutions, "alphas": args.alphas, "epochs": args.epochs,
+                           "fine_tune_epochs": args.fine_tune_epochs, "weights": args.weights,
+                           "train_samples": len(data[1][0]), "validation_samples": len(data[2][0])})
+        for alpha in args.alphas:
+            for resolution in args.resolutions:
+                name = f"MobileNetV2_a{alpha}_r{resolution}"
+                model_path = os.path.join(args.out, name + ".h5") if args.keep_models else None
+                with mlflow.start_run(run_name=name, nested=True) as run:
+                    row = train_variant(resolution, alpha, data, args.epochs, args.fine_tune_epochs, weights,
+                                        model_path)
+                    mlflow.log_params({"resolution": resolution, "alpha": alpha})
+                    mlflow.log_metrics({key: row[key] for key in COLUMNS[2:-1]})
+                    if model_path:
+                        mlflow.log_artifact(model_path)
+                rows.append(row)
+                run_ids.append(run.info.run_id)
+                print(f"{name:<24} acc {row['val_accuracy']:6.2%}  {row['latency_ms']:7.1f} ms  "
+                      f"{row['size_mb']:6.2f} MB")
+
+        frontier = pareto_frontier(rows)
+        client = mlflow.tracking.MlflowClient()
+        for row, run_id in zip(rows, run_ids):
+            row["pareto"] = row in frontier
+            client.set_tag(run_id, "pareto", str(row["pareto"]).lower())
+
+        csv_path = os.path.join(args.out, "sweep_report.csv")
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        report = format_report(rows, args.min_accuracy)
+        report_path = os.path.join(args.out, "sweep_report.md")
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(report)
+        mlflow.log_artifact(csv_path)
+        mlflow.log_artifact(report_path)
+        best = smallest_meeting(rows, args.min_accuracy)
+        if best is not None:
+            mlflow.log_params({"recommended_resolution": best["resolution"], "recommended_alpha": best["alpha"]})
+
+    print()
+    print(report)
+    print(f"📝 Report saved to: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,17 +10,21 @@ import numpy as np
 import tensorflow as tf
 from tensorflow import keras
 from tensorflow.keras import layers
-from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from sklearn.model_selection import train_test_split
 import matplotlib.pyplot as plt
 from pathlib import Path
 
+from embedding_cache import EmbeddingSequence, cached_embeddings, pooled_encoder
+from soil_dataset import augmentation, list_images, make_dataset
+
 # Set seeds for reproducibility
 np.random.seed(42)
 tf.random.set_seed(42)
 
 # Configuration
-IMG_SIZE = (224, 224)
+# Input resolution and MobileNetV2 width multiplier; sweep_soil_model.py compares the options
+IMG_SIZE = (int(os.getenv("SOIL_IMG_SIZE", 224)),) * 2
+ALPHA = float(os.getenv("SOIL_ALPHA", 1.0))
 BATCH_SIZE = 8  # Small batch size due to limited data
 EPOCHS = 20  # Reduced for faster training
 LEARNING_RATE = 0.0001
@@ -37,64 +41,38 @@ print("="*60)
 print(f"\n📁 Training data: {TRAIN_DATA_DIR}")
 print(f"💾 Model will be saved to: {MODEL_SAVE_PATH}")
 print(f"🖼️  Image size: {IMG_SIZE}")
+print(f"📏 MobileNetV2 alpha: {ALPHA}")
 print(f"📦 Batch size: {BATCH_SIZE}")
 print(f"🔄 Epochs: {EPOCHS}")
 
 # Create model save directory
 MODEL_SAVE_DIR.mkdir(parents=True, exist_ok=True)
 
-# Data augmentation for training (to handle small dataset)
-train_datagen = ImageDataGenerator(
-    rescale=1./255,
-    rotation_range=40,
-    width_shift_range=0.2,
-    height_shift_range=0.2,
-    shear_range=0.2,
-    zoom_range=0.2,
-    horizontal_flip=True,
-    vertical_flip=True,
-    fill_mode='nearest',
-    validation_split=0.2  # 20% for validation
-)
-
-# Load training data
+# Load training and validation data: the same per-class split flow_from_directory made, read
+# through a tf.data pipeline (parallel decode, cached resized images, in-graph augmentation)
 print("\n📊 Loading training data...")
-train_generator = train_datagen.flow_from_directory(
-    TRAIN_DATA_DIR,
-    target_size=IMG_SIZE,
-    batch_size=BATCH_SIZE,
-    class_mode='categorical',
-    subset='training',
-    shuffle=True,
-    seed=42
+class_names, (train_paths, train_labels), (val_paths, val_labels) = list_images(
+    TRAIN_DATA_DIR, validation_split=0.2  # 20% for validation
 )
-
-# Load validation data
-validation_generator = train_datagen.flow_from_directory(
-    TRAIN_DATA_DIR,
-    target_size=IMG_SIZE,
-    batch_size=BATCH_SIZE,
-    class_mode='categorical',
-    subset='validation',
-    shuffle=False,
-    seed=42
-)
-
-# Get class information
-class_names = list(train_generator.class_indices.keys())
 num_classes = len(class_names)
 
+# Data augmentation for training (to handle small dataset)
+train_dataset = make_dataset(train_paths, train_labels, num_classes, BATCH_SIZE, image_size=IMG_SIZE,
+                             augment=augmentation(seed=42), shuffle=True)
+validation_dataset = make_dataset(val_paths, val_labels, num_classes, BATCH_SIZE, image_size=IMG_SIZE)
+
 print(f"\n✅ Data loaded successfully!")
 print(f"📋 Classes found: {class_names}")
 print(f"🔢 Number of classes: {num_classes}")
-print(f"📈 Training samples: {train_generator.samples}")
-print(f"📉 Validation samples: {validation_generator.samples}")
+print(f"📈 Training samples: {len(train_paths)}")
+print(f"📉 Validation samples: {len(val_paths)}")
 
 # Build the CNN model (MobileNetV2-based transfer learning)
 print("\n🏗️  Building model architecture...")
 
 base_model = keras.applications.MobileNetV2(
     input_shape=(*IMG_SIZE, 3),
+    alpha=ALPHA,
     include_top=False,
     weights='imagenet'
 )
@@ -102,6 +80,18 @@ base_model = keras.applications.MobileNetV2(
 # Freeze base model layers initially
 base_model.trainable = False
 
+# Custom top layers, shared by the complete model and the head trained on cached embeddings
+head_layers = [
+    layers.BatchNormalization(),
+    layers.Dropout(0.5),
+    layers.Dense(256, activation='relu'),
+    layers.BatchNormalization(),
+    layers.Dropout(0.3),
+    layers.Dense(128, activation='relu'),
+    layers.Dropout(0.2),
+    layers.Dense(num_classes, activation='softmax', name='predictions')
+]
+
 # Build the complete model
 model = keras.Sequential([
     # Preprocessing
@@ -112,27 +102,63 @@ model = keras.Sequential([
     
     # Custom top layers
     layers.GlobalAveragePooling2D(),
-    layers.BatchNormalization(),
-    layers.Dropout(0.5),
-    layers.Dense(256, activation='relu'),
-    layers.BatchNormalization(),
-    layers.Dropout(0.3),
-    layers.Dense(128, activation='relu'),
-    layers.Dropout(0.2),
-    layers.Dense(num_classes, activation='softmax', name='predictions')
+    *head_layers
 ])
+head = keras.Sequential([layers.Input(shape=(base_model.output_shape[-1],)), *head_layers])
 
-# Compile model
-model.compile(
+print("\n📐 Model architecture:")
+model.summary()
+
+# ===============================
+# Phase 1: train the head on cached embeddings of the frozen backbone
+# ===============================
+# The frozen backbone gives the same output for the same input, so it runs once per
+# (image, augmentation seed): one augmented copy of every training image per epoch.
+# Validation images are embedded once, without augmentation.
+print("\n🧮 Computing (or loading cached) MobileNetV2 embeddings...")
+encoder = pooled_encoder(base_model)
+train_embeddings = cached_embeddings(encoder, train_paths, augmentation, variants=EPOCHS)
+val_embeddings = cached_embeddings(encoder, val_paths)
+print(f"📦 Embeddings: train {train_embeddings.shape}, validation {val_embeddings.shape}")
+
+head.compile(
     optimizer=keras.optimizers.Adam(learning_rate=LEARNING_RATE),
     loss='categorical_crossentropy',
     metrics=['accuracy', keras.metrics.Precision(), keras.metrics.Recall()]
 )
 
-print("\n📐 Model architecture:")
-model.summary()
+head_callbacks = [
+    keras.callbacks.EarlyStopping(
+        monitor='val_loss',
+        patience=10,
+        restore_best_weights=True,
+        verbose=1
+    ),
+    keras.callbacks.ReduceLROnPlateau(
+        monitor='val_loss',
+        factor=0.5,
+        patience=5,
+        min_lr=1e-7,
+        verbose=1
+    )
+]
 
-# Callbacks
+# Train the head
+print("\n🚀 Starting training...")
+print("="*60)
+
+history = head.fit(
+    EmbeddingSequence(train_embeddings, train_labels, BATCH_SIZE, num_classes),
+    validation_data=(
+        np.asarray(val_embeddings[0]),
+        keras.utils.to_categorical(val_labels, num_classes)
+    ),
+    epochs=EPOCHS,
+    callbacks=head_callbacks,
+    verbose=1
+)
+
+# Callbacks for the fine-tuning phase
 callbacks = [
     keras.callbacks.EarlyStopping(
         monitor='val_loss',
@@ -155,18 +181,6 @@ callbacks = [
     )
 ]
 
-# Train the model
-print("\n🚀 Starting training...")
-print("="*60)
-
-history = model.fit(
-    train_generator,
-    validation_data=validation_generator,
-    epochs=EPOCHS,
-    callbacks=callbacks,
-    verbose=1
-)
-
 # Fine-tuning phase: Unfreeze some layers
 print("\n🔧 Fine-tuning: Unfreezing top layers of base model...")
 base_model.trainable = True
@@ -185,8 +199,8 @@ model.compile(
 # Continue training
 print("\n🚀 Continuing training with fine-tuning...")
 history_fine = model.fit(
-    train_generator,
-    validation_data=validation_generator,
+    train_dataset,
+    validation_data=validation_dataset,
     epochs=10,  # Reduced for faster training
     callbacks=callbacks,
     verbose=1
@@ -198,7 +212,7 @@ model.save(MODEL_SAVE_PATH)
 
 # Evaluate on validation set
 print("\n📊 Final Evaluation on Validation Set:")
-val_loss, val_accuracy, val_precision, val_recall = model.evaluate(validation_generator)
+val_loss, val_accuracy, val_precision, val_recall = model.evaluate(validation_dataset)
 print(f"  Loss: {val_loss:.4f}")
 print(f"  Accuracy: {val_accuracy*100:.2f}%")
 print(f"  Precision: {val_precision*100:.2f}%")
@@ -0,0 +1,238 @@
+"""
+Structured logging for the AgriTech app and the IoT ingestion service
+=====================================================================
+One process-wide logging setup that writes JSON-lines records through a
+queue-based asynchronous handler into a size-rotated file, so emitting a
+log line never blocks a Streamlit rerun or an MQTT callback on file I/O.
+
+Every record carries the current request id (see ``request_context``) and,
+for timed blocks, a ``duration_ms`` field. High-volume events can be
+sampled with ``AGRITECH_LOG_SAMPLE_RATES`` (e.g. ``"MQTT_MESSAGE=0.1"``).
+
+Environment variables:
+    AGRITECH_LOG_PATH          Log file (default: <repo>/logs/agritech.jsonl)
+    AGRITECH_LOG_LEVEL         Minimum level (default: INFO)
+    AGRITECH_LOG_MAX_BYTES     Rotate after this many bytes (default: 5 MB)
+    AGRITECH_LOG_BACKUPS       Rotated files to keep (default: 5)
+    AGRITECH_LOG_SAMPLE_RATES  Comma-separated EVENT=rate pairs in [0, 1]
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_LOG_PATH = os.path.join(REPO_ROOT, "logs", "agritech.jsonl")
+
+_request_id = contextvars.ContextVar("agritech_request_id", default=None)
+_listener = None
+
+# Attributes present on every LogRecord; anything else was passed via `extra`.
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Render a record as a single JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": getattr(record, "event", None) or record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and key not in entry:
+                entry[key] = value
+        if record.exc_info and "exc" not in entry:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the traceback as a field instead of folding it into the message."""
+
+    def prepare(self, record):
+        if record.exc_info and not getattr(record, "exc", None):
+            record.exc = logging.Formatter().formatException(record.exc_info)
+        return super().prepare(record)
+
+
+class RequestContextFilter(logging.Filter):
+    """Attach the active request id to every record."""
+
+    def filter(self, record):
+        if getattr(record, "request_id", None) is None:
+            record.request_id = _request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of records for configured high-volume events.
+
+    Warnings and errors are never dropped.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = dict(rates or {})
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(getattr(record, "event", None))
+        if rate is None or rate >= 1.0:
+            return True
+        return random.random() < rate
+
+
+def _parse_sample_rates(spec):
+    rates = {}
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        event, _, rate = item.partition("=")
+        try:
+            rates[event.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+def configure_logging(log_path=None, level=None, max_bytes=None, backup_count=None,
+                      sample_rates=None, console=False):
+    """Install the queue handler on the ``agritech`` logger (idempotent).
+
+    Args:
+        log_path: JSON-lines file to write (rotated by size)
+        level: Minimum level name or number
+        max_bytes: Rotate when the file grows past this size
+        backup_count: Number of rotated files to keep
+        sample_rates: Mapping of event name -> keep probability
+        console: Also mirror records to stderr (useful for services)
+
+    Returns:
+        The configured ``agritech`` root logger.
+    """
+    global _listener
+
+    root = logging.getLogger("agritech")
+    if _listener is not None:
+        return root
+
+    log_path = log_path or os.getenv("AGRITECH_LOG_PATH", DEFAULT_LOG_PATH)
+    level = level or os.getenv("AGRITECH_LOG_LEVEL", "INFO")
+    max_bytes = int(max_bytes or os.getenv("AGRITECH_LOG_MAX_BYTES", 5 * 1024 * 1024))
+    backup_count = int(backup_count if backup_count is not None else os.getenv("AGRITECH_LOG_BACKUPS", 5))
+    if sample_rates is None:
+        sample_rates = _parse_sample_rates(os.getenv("AGRITECH_LOG_SAMPLE_RATES"))
+
+    formatter = JsonLinesFormatter()
+    handlers = []
+    try:
+        os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    except OSError:
+        # Read-only deployments (e.g. Streamlit Cloud) fall back to stderr.
+        console = True
+    if console:
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(formatter)
+        handlers.append(stream_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    # Resolve the request id on the caller's thread, before the record is queued.
+    queue_handler.addFilter(RequestContextFilter())
+    queue_handler.addFilter(SamplingFilter(sample_rates))
+
+    root.setLevel(level)
+    root.addHandler(queue_handler)
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return root
+
+
+def shutdown_logging():
+    """Flush pending records and stop the background writer."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        root = logging.getLogger("agritech")
+        for handler in list(root.handlers):
+            if isinstance(handler, logging.handlers.QueueHandler):
+                root.removeHandler(handler)
+
+
+def get_logger(name):
+    """Return a child of the ``agritech`` logger, configuring it on first use."""
+    configure_logging()
+    return logging.getLogger(f"agritech.{name}")
+
+
+def new_request_id():
+    return uuid.uuid4().hex[:12]
+
+
+def set_request_id(request_id=None):
+    """Bind a request id for the rest of the current thread/context.
+
+    Meant for script-style callers such as a Streamlit rerun, where one run
+    of the script is one request. Returns the bound id.
+    """
+    request_id = request_id or new_request_id()
+    _request_id.set(request_id)
+    return request_id
+
+
+@contextmanager
+def request_context(request_id=None):
+    """Bind a request id to all records logged inside the block."""
+    token = _request_id.set(request_id or new_request_id())
+    try:
+        yield _request_id.get()
+    finally:
+        _request_id.reset(token)
+
+
+def log_event(logger, event, level=logging.INFO, **fields):
+    """Log a named event with structured fields."""
+    logger.log(level, event, extra={"event": event, **fields})
+
+
+@contextmanager
+def timed(logger, event, **fields):
+    """Log ``event`` with ``duration_ms`` once the block finishes.
+
+    The yielded dict can be filled with result fields inside the block.
+    """
+    result = {}
+    start = time.perf_counter()
+    try:
+        yield result
+    except Exception as e:
+        fields.update(result)
+        log_event(logger, event, level=logging.ERROR,
+                  duration_ms=round((time.perf_counter() - start) * 1000, 3),
+                  error=f"{type(e).__name__}: {e}", **fields)
+        raise
+    fields.update(result)
+    log_event(logger, event, duration_ms=round((time.perf_counter() - start) * 1000, 3), **fields)
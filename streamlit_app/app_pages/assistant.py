@@ -0,0 +1,209 @@
+"""
+Assistant page: Gemini agricultural assistant
+=============================================
+Uses the current inputs as context; no model is loaded.
+"""
+
+import logging
+
+import streamlit as st
+
+from app_logging import get_logger, log_event, timed
+from gemini_client import GeminiStream, call_gemini_chat
+from inputs import render_input_panel
+from response_cache import response_cache
+
+logger = get_logger("app")
+
+# Create two columns layout with improved spacing
+col1, col2 = st.columns([1, 1], gap="large")
+
+with col1:
+    inputs = render_input_panel()
+
+with col2:
+    st.markdown("""
+    <div class="glass-card animate-slide-in">
+        <div class="glass-card-header">
+            <span class="glass-card-icon">🎯</span>
+            <div>
+                <h3 class="glass-card-title">AI-Powered Recommendations</h3>
+                <p class="glass-card-subtitle">Enterprise-grade crop and irrigation intelligence</p>
+            </div>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Developer debug toggle: show raw inputs/outputs on the page
+    show_debug = st.checkbox("🔧 Debug Mode", value=False, key="show_debug", help="Show technical details and raw model outputs")
+
+    @st.fragment
+    def gemini_panel(N, P, K, temp, hum, ph, rain, soil_moisture, wind_speed, pressure, show_debug):
+        # Gemini AI Section
+        st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+        st.markdown("""
+        <div class="custom-card">
+            <h3>🤖 AI Assistant (Gemini)</h3>
+            <p style="color: #6c757d;">Get expert agricultural advice and personalized recommendations</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+        gemini_prompt = st.text_area(
+            "💬 Ask me anything about crops, irrigation, or farming",
+            placeholder="Example: What's the best way to irrigate rice during a heat wave?",
+            key="gemini_prompt",
+            height=100
+        )
+
+        context_snippet = (
+            f"Current soil inputs -> N:{N}, P:{P}, K:{K}, Temp:{temp}°C, Humidity:{hum}%, pH:{ph}, Rainfall:{rain}mm, "
+            f"Soil moisture:{soil_moisture}, Wind:{wind_speed}km/h, Pressure:{pressure}kPa"
+        )
+        # Same values as the snippet, bucketed by the response cache so near-identical readings share answers.
+        context_values = {
+            'N': N, 'P': P, 'K': K, 'temperature': temp, 'humidity': hum, 'ph': ph, 'rainfall': rain,
+            'soil_moisture': soil_moisture, 'wind_speed': wind_speed, 'pressure': pressure,
+        }
+
+        stream_gemini = st.checkbox(
+            "⚡ Stream response",
+            value=True,
+            key="gemini_stream_mode",
+            help="Show the answer as it is generated instead of waiting for the full response"
+        )
+
+        system_instruction = (
+            "You are AgriTech Assistant (Gemini) that explains crop and irrigation guidance in concise, practical English. "
+            "Use the provided soil context when relevant and keep responses under 200 words."
+        )
+
+        if st.button("✨ Ask Gemini", type="primary", key="gemini_button"):
+            clean_prompt = gemini_prompt.strip()
+            cached = response_cache.get(clean_prompt, context_values) if clean_prompt else None
+            if not clean_prompt:
+                st.warning("⚠️ Please type a question first.")
+            elif cached is not None:
+                st.session_state.pop('gemini_stream', None)
+                cached_result, cache_match = cached
+                log_event(logger, "GEMINI_CACHE_HIT", prompt=clean_prompt, match=cache_match,
+                          model=cached_result.get("model_used"))
+                st.success("✅ Response from Gemini")
+                st.markdown(cached_result.get("text", ""))
+                caption = "⚡ Cached answer" if cache_match == "exact" else "⚡ Cached answer to a similar question"
+                if cached_result.get("model_used"):
+                    caption += f" • Gemini model: {cached_result['model_used']}"
+                st.caption(caption)
+            elif stream_gemini:
+                try:
+                    log_event(logger, "GEMINI_PROMPT", prompt=clean_prompt, stream=True)
+                    st.session_state['gemini_stream'] = GeminiStream(
+                        clean_prompt,
+                        context=context_snippet,
+                        system_instruction=system_instruction
+                    )
+                    st.session_state['gemini_stream'].cache_key = (clean_prompt, context_values)
+                except Exception as e:
+                    st.error(f"❌ Gemini API error: {str(e)}")
+                    st.info("Please verify your API key and internet connection, then try again.")
+                    log_event(logger, "GEMINI_ERROR", level=logging.ERROR, error=str(e))
+            else:
+                st.session_state.pop('gemini_stream', None)
+                with st.spinner("Contacting Gemini..."):
+                    try:
+                        log_event(logger, "GEMINI_PROMPT", prompt=clean_prompt)
+
+                        with timed(logger, "GEMINI_CALL") as gemini_log:
+                            gemini_result = call_gemini_chat(
+                                clean_prompt,
+                                context=context_snippet,
+                                system_instruction=system_instruction
+                            )
+                            if isinstance(gemini_result, dict):
+                                gemini_log["model"] = gemini_result.get("model_used")
+
+                        if isinstance(gemini_result, dict):
+                            gemini_response = gemini_result.get("text", "")
+                            gemini_notice = gemini_result.get("notice")
+                            gemini_model_used = gemini_result.get("model_used")
+                            gemini_attempts = gemini_result.get("attempts")
+                        else:
+                            gemini_response = gemini_result
+                            gemini_notice = None
+                            gemini_model_used = None
+                            gemini_attempts = None
+
+                        st.success("✅ Response from Gemini")
+                        st.markdown(gemini_response)
+
+                        if gemini_notice:
+                            st.info(gemini_notice)
+                        if gemini_model_used:
+                            st.caption(f"Gemini model: {gemini_model_used}")
+                        if show_debug and gemini_attempts:
+                            st.markdown("**Debug — Gemini attempts**")
+                            st.write(gemini_attempts)
+
+                        log_event(logger, "GEMINI_RESPONSE", model=gemini_model_used, notice=gemini_notice,
+                                  attempts=gemini_attempts, text=gemini_response)
+                        if gemini_model_used:
+                            response_cache.put(clean_prompt, context_values,
+                                               {"text": gemini_response, "model_used": gemini_model_used})
+
+                    except Exception as e:
+                        st.error(f"❌ Gemini API error: {str(e)}")
+                        st.info("Please verify your API key and internet connection, then try again.")
+                        st.caption("Troubleshooting: set GEMINI_API_KEY in .env, pin GEMINI_MODEL=gemini-1.5-flash, and restart Streamlit after edits.")
+                        log_event(logger, "GEMINI_ERROR", level=logging.ERROR, error=str(e))
+
+        def render_gemini_stream():
+            """Render the streamed answer; polled by the fragment while the worker runs."""
+            stream = st.session_state.get('gemini_stream')
+            if stream is None:
+                return
+
+            if stream.error:
+                st.error(f"❌ Gemini API error: {stream.error}")
+                st.info("Please verify your API key and internet connection, then try again.")
+                st.caption("Troubleshooting: set GEMINI_API_KEY in .env, pin GEMINI_MODEL=gemini-1.5-flash, and restart Streamlit after edits.")
+            elif stream.done:
+                st.success("✅ Response from Gemini")
+                st.markdown(stream.text)
+            else:
+                st.markdown((stream.text or "⏳ Waiting for first tokens...") + " ▌")
+
+            latency_parts = []
+            if stream.time_to_first_token is not None:
+                latency_parts.append(f"first token {stream.time_to_first_token:.2f}s")
+            if stream.total_latency is not None:
+                latency_parts.append(f"total {stream.total_latency:.2f}s")
+            if stream.model_used:
+                latency_parts.append(f"Gemini model: {stream.model_used}")
+            if latency_parts:
+                st.caption(" • ".join(latency_parts))
+            if stream.done and stream.notice:
+                st.info(stream.notice)
+            if show_debug and stream.attempts:
+                st.markdown("**Debug — Gemini attempts**")
+                st.write(stream.attempts)
+
+            if stream.done and not getattr(stream, 'logged', False):
+                stream.logged = True
+                log_event(logger, "GEMINI_RESPONSE", level=logging.ERROR if stream.error else logging.INFO,
+                          model=stream.model_used, notice=stream.notice, attempts=stream.attempts,
+                          ttft_ms=round(stream.time_to_first_token * 1000, 1) if stream.time_to_first_token is not None else None,
+                          duration_ms=round(stream.total_latency * 1000, 1), text=stream.text, error=stream.error)
+                if not stream.error and stream.text and getattr(stream, 'cache_key', None):
+                    response_cache.put(*stream.cache_key, {"text": stream.text, "model_used": stream.model_used})
+                if st.session_state.get('gemini_stream_polling'):
+                    # Full rerun once, so the fragment is re-registered without the poll timer.
+                    st.session_state['gemini_stream_polling'] = False
+                    st.rerun()
+
+        # Only this fragment reruns while tokens arrive; the rest of the page stays interactive.
+        active_stream = st.session_state.get('gemini_stream')
+        polling = active_stream is not None and not active_stream.done
+        st.session_state['gemini_stream_polling'] = polling
+        st.fragment(render_gemini_stream, run_every=0.3 if polling else None)()
+
+    gemini_panel(inputs['N'], inputs['P'], inputs['K'], inputs['temp'], inputs['hum'], inputs['ph'],
+                 inputs['rain'], inputs['soil_moisture'], inputs['wind_speed'], inputs['pressure'], show_debug)
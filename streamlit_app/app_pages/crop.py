@@ -0,0 +1,168 @@
+"""
+Crop page: crop recommendation from soil nutrients and climate
+===============================================================
+Loads only the crop model and the soil type encoder.
+"""
+
+import pandas as pd
+import streamlit as st
+
+from app_logging import get_logger, log_event, timed
+from inputs import memoized_prediction, render_input_panel
+from model_store import MODEL_STATUS, check_system_status, load_crop_model, load_soil_type_encoder, start_loading
+
+logger = get_logger("app")
+
+# Start the loads on the loader pool; they overlap with rendering the inputs (and the IoT fetch)
+start_loading('crop_model', 'soil_type_encoder')
+status_area = st.container()
+
+# Create two columns layout with improved spacing
+col1, col2 = st.columns([1, 1], gap="large")
+
+with col1:
+    inputs = render_input_panel()
+
+with status_area:
+    crop_model = load_crop_model()
+    soil_type_encoder = load_soil_type_encoder()
+
+    # Check system status with styled output
+    st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+    check_system_status(['crop_model'])
+    st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+
+with col2:
+    st.markdown("""
+    <div class="glass-card animate-slide-in">
+        <div class="glass-card-header">
+            <span class="glass-card-icon">🎯</span>
+            <div>
+                <h3 class="glass-card-title">AI-Powered Recommendations</h3>
+                <p class="glass-card-subtitle">Enterprise-grade crop and irrigation intelligence</p>
+            </div>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Developer debug toggle: show raw inputs/outputs on the page
+    show_debug = st.checkbox("🔧 Debug Mode", value=False, key="show_debug", help="Show technical details and raw model outputs")
+
+    @st.fragment
+    def crop_recommendation_panel(N, P, K, temp, hum, ph, rain, soil_type, show_debug):
+        # === CROP RECOMMENDATION SECTION ===
+        st.markdown('<div class="premium-divider"></div>', unsafe_allow_html=True)
+        st.markdown("### 🌱 Crop Recommendation")
+
+        if st.button("🚀 Get Crop Recommendation", type="primary", use_container_width=True, key="crop_recommendation"):
+            # Check if crop model is loaded
+            if not MODEL_STATUS.get('crop_model') or crop_model is None:
+                st.error("❌ **CROP MODEL NOT LOADED**: Cannot provide recommendations")
+                st.info("🔄 Please ensure crop_model.pkl is available in models/crop_recommendation/")
+            else:
+                try:
+                    # Encode soil type using the encoder
+                    if soil_type_encoder is not None:
+                        try:
+                            soil_type_encoded = soil_type_encoder.transform([soil_type])[0]
+                        except:
+                            # If soil type not in encoder, use default (0)
+                            soil_type_encoded = 0
+                    else:
+                        soil_type_encoded = 0
+            
+                    # Create DataFrame with proper column names including soil_type_encoded
+                    feature_names = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall', 'soil_type_encoded']
+                    input_data = pd.DataFrame([[N, P, K, temp, hum, ph, rain, soil_type_encoded]], columns=feature_names)
+
+                    def run_crop_model():
+                        # Debug: log inputs to help trace behavior and optionally show on the page
+                        crop_inputs_dict = input_data.to_dict(orient='records')[0]
+                        log_event(logger, "CROP_INPUTS", inputs=crop_inputs_dict)
+
+                        # Make prediction using crop_model
+                        prediction = None
+                        confidence = None
+                        error = None
+
+                        with timed(logger, "CROP_OUTPUT") as crop_log:
+                            try:
+                                prediction = crop_model.predict(input_data)[0]
+                                try:
+                                    confidence = crop_model.predict_proba(input_data).max()
+                                except Exception:
+                                    confidence = None
+                            except Exception as pred_error:
+                                error = str(pred_error)
+                                prediction = 'unknown'
+                                confidence = None
+                            crop_log.update(pred=str(prediction), conf=float(confidence) if confidence is not None else None)
+                        return prediction, confidence, error
+
+                    # Only rerun the model when one of its inputs changed since the last result
+                    prediction, confidence, pred_error = memoized_prediction(
+                        'crop_model', (N, P, K, temp, hum, ph, rain, soil_type), run_crop_model
+                    )
+                    if pred_error:
+                        st.error(f"❌ **PREDICTION FAILED**: {pred_error}")
+
+                    if show_debug:
+                        st.markdown("**Debug — crop model inputs**")
+                        st.write(input_data)
+                        st.markdown("**Debug — crop model outputs**")
+                        st.write({"prediction": str(prediction), "confidence": float(confidence) if confidence is not None else None})
+
+                    # Display results only if prediction was successful
+                    if prediction != 'unknown':
+                        # Professional result card
+                        conf_value = confidence if confidence is not None else 0.0
+                        confidence_class = "confidence-high" if conf_value >= 0.8 else ("confidence-medium" if conf_value >= 0.6 else "confidence-low")
+                
+                        st.markdown(f"""
+                        <div class="result-card">
+                            <div class="result-header">
+                                <div class="result-icon">🌾</div>
+                                <div>
+                                    <div class="result-title">Recommended Crop</div>
+                                    <span class="confidence-badge {confidence_class}">Confidence: {conf_value*100:.1f}%</span>
+                                </div>
+                            </div>
+                            <div class="result-value">{prediction.title()}</div>
+                        </div>
+                        """, unsafe_allow_html=True)
+                
+                        # Add crop information
+                        crop_info = {
+                            'rice': '🍚 Rice - High water requirement, suitable for humid conditions',
+                            'maize': '🌽 Maize - Moderate water requirement, good for moderate climate',
+                            'chickpea': '🫘 Chickpea - Low water requirement, drought tolerant',
+                            'kidneybeans': '🫘 Kidney Beans - Nitrogen-fixing legume',
+                            'pigeonpeas': '🫛 Pigeon Peas - Drought resistant pulse crop',
+                            'mothbeans': '🫘 Moth Beans - Heat and drought tolerant',
+                            'mungbean': '🫛 Mung Bean - Quick growing pulse crop',
+                            'blackgram': '🫘 Black Gram - Protein-rich pulse crop',
+                            'lentil': '🟤 Lentil - Cool season pulse crop',
+                            'pomegranate': '🍎 Pomegranate - Antioxidant-rich fruit',
+                            'banana': '🍌 Banana - Tropical fruit, high potassium needs',
+                            'mango': '🥭 Mango - King of fruits, tropical climate',
+                            'grapes': '🍇 Grapes - Mediterranean climate preferred',
+                            'watermelon': '🍉 Watermelon - High water requirement in summer',
+                            'muskmelon': '🍈 Muskmelon - Warm season crop',
+                            'apple': '🍎 Apple - Temperate climate fruit',
+                            'orange': '🍊 Orange - Citrus fruit, warm climate',
+                            'papaya': '🥭 Papaya - Tropical fruit, year-round growing',
+                            'coconut': '🥥 Coconut - Coastal tropical crop',
+                            'cotton': '🌿 Cotton - Cash crop, moderate water needs',
+                            'jute': '🌿 Jute - Fiber crop, high humidity required',
+                            'coffee': '☕ Coffee - Shade-grown, specific climate needs'
+                        }
+                
+                        if prediction.lower() in crop_info:
+                            st.info(crop_info[prediction.lower()])
+                    
+                except Exception as e:
+                    st.error(f"❌ **PREDICTION FAILED**: {str(e)}")
+                    st.info("🔄 **Returned Value**: 0 (Exception fail-safe)")
+
+    crop_recommendation_panel(inputs['N'], inputs['P'], inputs['K'], inputs['temp'], inputs['hum'],
+                              inputs['ph'], inputs['rain'], inputs['soil_type'], show_debug)
@@ -0,0 +1,236 @@
+"""
+IoT page: live sensor data and history
+======================================
+Imports only the Supabase/IoT helpers and the chart code, so opening this
+page never imports TensorFlow or loads the crop and irrigation models.
+"""
+
+import os
+import time
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from app_logging import get_logger, timed
+from iot_data import (LocalHistoryStore, choose_bucket_seconds, format_age, get_history_store,
+                      get_sensor_history)
+from model_store import available_soil_types
+from sensor_charts import data_version, sensor_figure
+
+logger = get_logger("app")
+
+# --- 📡 IoT Live Data Section - Premium Glass Design ---
+IOT_AUTO_REFRESH_SECONDS = float(os.getenv("IOT_AUTO_REFRESH_SECONDS", 10))
+
+
+def iot_panel():
+    """Live sensor panel, run as a fragment: refreshes and auto-refresh ticks rerun only this panel."""
+    # Supabase credentials (from .env or Streamlit secrets)
+    SUPABASE_URL = os.getenv("SUPABASE_URL") or (st.secrets.get("SUPABASE_URL") if hasattr(st, "secrets") else None)
+    SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY") or (st.secrets.get("SUPABASE_SERVICE_KEY") if hasattr(st, "secrets") else None)
+    
+    # Button row
+    btn_col1, btn_col2, btn_col3 = st.columns([1, 1, 2])
+    with btn_col1:
+        refresh_btn = st.button("🔄 Refresh Data", disabled=(not SUPABASE_URL or not SUPABASE_KEY), use_container_width=True)
+    with btn_col2:
+        demo_btn = st.button("🎲 Demo Data", use_container_width=True)
+
+    # The chosen source sticks across reruns so the panel keeps showing (and auto-refreshing) it
+    auto_refresh = st.session_state.get('iot_auto_refresh', False)
+    if refresh_btn or (auto_refresh and SUPABASE_URL and SUPABASE_KEY and 'iot_source' not in st.session_state):
+        st.session_state['iot_source'] = 'supabase'
+    elif demo_btn:
+        st.session_state['iot_source'] = 'demo'
+    iot_source = st.session_state.get('iot_source')
+    
+    # Demo data function
+    def generate_demo_data():
+        """Generate demo sensor data for testing"""
+        import numpy as np
+        from datetime import datetime, timedelta
+        
+        # Generate 50 time points over last 24 hours
+        now = datetime.now()
+        times = [now - timedelta(hours=24-i*0.5) for i in range(50)]
+        
+        # Generate realistic sensor data with some variation
+        np.random.seed(42)
+        data = {
+            'created_at': times,
+            'temperature': 26.97 + np.random.normal(0, 2, 50),
+            'humidity': 62.02 + np.random.normal(0, 5, 50),
+            'soil_moisture': 35 + np.random.normal(0, 8, 50),
+            'water_level': 50 + np.random.normal(0, 10, 50),
+            'wind_speed': 8 + np.random.normal(0, 3, 50),
+            'rainfall': np.random.exponential(2, 50)
+        }
+        
+        # Store demo soil type in session state
+        # Uses the soil type encoder's classes (a small sklearn pickle) or the defaults; no model is loaded here
+        if 'demo_soil_type' not in st.session_state:
+            st.session_state.demo_soil_type = np.random.choice(available_soil_types())
+        
+        return pd.DataFrame(data)
+
+    def render_sensor_data(df_sorted, version, source_label=""):
+        """Latest-reading metrics, one downsampled WebGL chart and the raw table for a time-sorted frame."""
+        latest_row = df_sorted.iloc[-1]
+        st.markdown('<div class="premium-divider"></div>', unsafe_allow_html=True)
+        st.markdown(f"#### 📊 Latest Sensor Readings{source_label}")
+        metrics = [
+            ("temperature", "🌡️", "Temperature", "°C"),
+            ("humidity", "💧", "Humidity", "%"),
+            ("soil_moisture", "🌱", "Soil Moisture", "%"),
+            ("water_level", "💦", "Water Level", ""),
+        ]
+        cols = st.columns(4)
+        for col, (column, icon, label, unit) in zip(cols, metrics):
+            if column not in df_sorted.columns:
+                continue
+            with col:
+                st.markdown(f"""
+                <div class="premium-metric">
+                    <span class="metric-icon">{icon}</span>
+                    <div class="metric-label">{label}</div>
+                    <div class="metric-value">{latest_row[column]:.1f}{unit}</div>
+                    <div class="metric-delta">Avg: {df_sorted[column].mean():.1f}{unit}</div>
+                </div>
+                """, unsafe_allow_html=True)
+
+        st.divider()
+
+        # Visualizations: all sensors in one shared-x figure, cached per data version
+        st.subheader("📈 Sensor Data Visualization")
+        fig = sensor_figure(df_sorted, version=version)
+        if fig is not None:
+            st.plotly_chart(fig, use_container_width=True)
+
+        # Data Table (collapsible)
+        with st.expander("📋 View Raw Data Table"):
+            st.dataframe(df_sorted.iloc[::-1], use_container_width=True)
+    
+    if SUPABASE_URL and SUPABASE_KEY:
+        if iot_source == 'supabase':
+            with st.spinner("Fetching sensor data..."):
+                try:
+                    # Delta sync: only rows newer than the shared frame's high-water mark are fetched.
+                    # Plain reruns (any widget change elsewhere) re-render the synced frame without a query.
+                    history = get_sensor_history()
+                    due = history.synced_at is None or (
+                        auto_refresh and time.time() - history.synced_at >= IOT_AUTO_REFRESH_SECONDS
+                    )
+                    added_rows = history.sync() if refresh_btn or due else 0
+                    df_sorted = history.frame
+                    if not df_sorted.empty:
+                        st.caption(f"Synced {added_rows} new readings • {len(df_sorted)} in view • "
+                                   f"last sync {format_age(time.time() - history.synced_at)} ago")
+                        
+                        # Store IoT data in sensor_defaults for inputs to use
+                        latest_row = df_sorted.iloc[-1]  # Most recent data
+                        st.session_state['sensor_defaults'] = {
+                            'temperature': float(latest_row.get('temperature', 26.97)),
+                            'humidity': float(latest_row.get('humidity', 62.02)),
+                            'soil_moisture': float(latest_row.get('soil_moisture', 35.0)),
+                            'wind_speed': float(latest_row.get('wind_speed', 8.0))
+                        }
+                        
+                        render_sensor_data(df_sorted, version=("supabase", history.version))
+                    else:
+                        st.info("No sensor data found in Supabase.")
+                except Exception as e:
+                    st.error(f"Error fetching data from Supabase: {e}")
+                    st.info("💡 Try using Demo Data instead")
+        elif iot_source is None:
+            st.info("👆 Click 'Refresh Data' to load IoT sensor readings from Supabase")
+    else:
+        st.warning("⚠️ Supabase credentials not found. Use Demo Data button instead.")
+    
+    # Handle demo data button (works regardless of Supabase credentials)
+    if iot_source == 'demo':
+        with st.spinner("Generating demo data..."):
+            try:
+                if demo_btn or 'iot_demo_data' not in st.session_state:
+                    st.session_state['iot_demo_data'] = generate_demo_data()
+                df = st.session_state['iot_demo_data']
+                df_sorted = df.sort_values("created_at")
+                
+                # Store demo data in sensor_defaults for inputs to use
+                latest_row = df.iloc[-1]
+                st.session_state['sensor_defaults'] = {
+                    'temperature': float(latest_row['temperature']),
+                    'humidity': float(latest_row['humidity']),
+                    'soil_moisture': float(latest_row['soil_moisture']),
+                    'wind_speed': float(latest_row['wind_speed'])
+                }
+                
+                st.success("✅ Demo data loaded successfully!")
+                
+                # Display selected demo soil type
+                if 'demo_soil_type' in st.session_state:
+                    st.info(f"🌍 **Demo Soil Type**: {st.session_state.demo_soil_type.title()} (This will be auto-filled in inputs below)")
+                
+                render_sensor_data(df_sorted, version=("demo", data_version(df_sorted)), source_label=" (Demo)")
+                    
+            except Exception as e:
+                st.error(f"❌ Error generating demo data: {e}")
+
+    # Long-range history: time-bucketed aggregates instead of raw rows
+    st.markdown('<div class="premium-divider"></div>', unsafe_allow_html=True)
+    st.markdown("#### 📅 Sensor History")
+    if st.checkbox("Show history for a date range", key="iot_history_enabled"):
+        from datetime import datetime, time as dt_time, timedelta, timezone
+
+        today = datetime.now(timezone.utc).date()
+        history_range = st.date_input(
+            "Date range (UTC)",
+            value=(today - timedelta(days=7), today),
+            max_value=today,
+            key="iot_history_range"
+        )
+        if isinstance(history_range, (tuple, list)) and len(history_range) == 2:
+            range_start = datetime.combine(history_range[0], dt_time.min, tzinfo=timezone.utc)
+            range_end = datetime.combine(history_range[1] + timedelta(days=1), dt_time.min, tzinfo=timezone.utc)
+            bucket_seconds = choose_bucket_seconds(range_start, range_end)
+            try:
+                store = get_history_store() if SUPABASE_URL and SUPABASE_KEY else LocalHistoryStore(generate_demo_data())
+                with timed(logger, "IOT_HISTORY_QUERY", bucket_seconds=bucket_seconds,
+                           days=(range_end - range_start).days) as history_log:
+                    buckets = store.bucketed(range_start, range_end, bucket_seconds)
+                    history_log["points"] = len(buckets)
+                if buckets.empty:
+                    st.info("No sensor readings in this date range.")
+                else:
+                    value_columns = [col for col in buckets.columns
+                                     if col not in ("bucket_start", "readings") and buckets[col].notna().any()]
+                    fig_history = px.line(buckets, x="bucket_start", y=value_columns,
+                                          title="Sensor averages over time",
+                                          labels={"bucket_start": "Time", "value": "Average", "variable": "Sensor"})
+                    fig_history.update_layout(hovermode='x unified', height=400)
+                    st.plotly_chart(fig_history, use_container_width=True)
+                    st.caption(f"{len(buckets)} points • {format_age(bucket_seconds)} buckets • "
+                               f"{int(buckets['readings'].sum())} readings")
+            except Exception as e:
+                st.error(f"Error loading sensor history: {e}")
+                st.info("💡 Run hardware/sql/sensor_history_buckets.sql in the Supabase SQL editor to enable history queries.")
+
+
+st.markdown("""
+<div class="glass-card">
+    <div class="glass-card-header">
+        <div>
+            <h3 class="glass-card-title">Real-time Environmental Monitoring</h3>
+            <p class="glass-card-subtitle">Fetch live IoT sensor data or load demo telemetry</p>
+        </div>
+    </div>
+</div>
+""", unsafe_allow_html=True)
+
+# Outside the fragment: toggling re-registers it with (or without) the refresh timer
+iot_auto_refresh = st.toggle(
+    "⏱️ Auto-refresh",
+    key="iot_auto_refresh",
+    help=f"Sync new sensor readings every {IOT_AUTO_REFRESH_SECONDS:g}s without rerunning the rest of the page"
+)
+st.fragment(iot_panel, run_every=IOT_AUTO_REFRESH_SECONDS if iot_auto_refresh else None)()
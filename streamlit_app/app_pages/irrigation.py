@@ -0,0 +1,220 @@
+"""
+Irrigation page: irrigation decision and optimal amount
+=======================================================
+Loads only the two CatBoost irrigation models.
+"""
+
+import streamlit as st
+
+from app_logging import get_logger, log_event, timed
+from inputs import memoized_prediction, render_input_panel
+from model_store import (MODEL_STATUS, check_system_status, load_irrigation_model, load_optimization_model,
+                         start_loading)
+from predictions import create_irrigation_features, create_optimization_features
+
+logger = get_logger("app")
+
+# Start the loads on the loader pool; they overlap with rendering the inputs (and the IoT fetch)
+start_loading('irrigation_model', 'optimization_model')
+status_area = st.container()
+
+# Create two columns layout with improved spacing
+col1, col2 = st.columns([1, 1], gap="large")
+
+with col1:
+    inputs = render_input_panel()
+
+with status_area:
+    irrigation_model = load_irrigation_model()
+    optimization_model = load_optimization_model()
+
+    # Check system status with styled output
+    st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+    system_operational = check_system_status(['irrigation_model', 'optimization_model'])
+    st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+
+with col2:
+    st.markdown("""
+    <div class="glass-card animate-slide-in">
+        <div class="glass-card-header">
+            <span class="glass-card-icon">🎯</span>
+            <div>
+                <h3 class="glass-card-title">AI-Powered Recommendations</h3>
+                <p class="glass-card-subtitle">Enterprise-grade crop and irrigation intelligence</p>
+            </div>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Developer debug toggle: show raw inputs/outputs on the page
+    show_debug = st.checkbox("🔧 Debug Mode", value=False, key="show_debug", help="Show technical details and raw model outputs")
+
+    @st.fragment
+    def irrigation_panel(N, P, K, temp, hum, ph, rain, soil_moisture, show_debug):
+        # === IRRIGATION DECISIONS SECTION ===
+        st.divider()
+        st.subheader("💧 Smart Irrigation Analysis")
+
+        # Unified Irrigation Check & Optimization
+        if st.button("🔍 Analyze Irrigation Needs", type="primary", use_container_width=True, key="irrigation_analysis"):
+            if not system_operational or not MODEL_STATUS['irrigation_model']:
+                st.error("❌ **FAIL-SAFE ACTIVATED**: Irrigation model unavailable")
+                st.info("🔄 **Returned Value**: 0 (Safe failure mode)")
+            else:
+                try:
+                    # STEP 1: Smart Irrigation Check
+                    st.markdown("### 📊 Step 1: Irrigation Decision")
+
+                    model_inputs = (soil_moisture, temp, hum, ph, N, P, K, rain)
+
+                    def run_irrigation_model():
+                        # Create features for irrigation model
+                        irrigation_features = create_irrigation_features(*model_inputs)
+                        log_event(logger, "IRR_INPUTS", soil_moisture=soil_moisture, temp=temp, hum=hum,
+                                  ph=ph, N=N, P=P, K=K, rain=rain)
+
+                        with timed(logger, "IRR_OUTPUT") as irr_log:
+                            pred = irrigation_model.predict(irrigation_features)[0]
+
+                            # Get prediction probability if available
+                            try:
+                                prob = irrigation_model.predict_proba(irrigation_features).max()
+                            except Exception:
+                                prob = None
+                            irr_log.update(pred=str(pred), conf=float(prob) if prob is not None else None)
+                        return irrigation_features, pred, prob
+
+                    # Only rerun the model when one of its inputs changed since the last result
+                    irrigation_features, pred, prob = memoized_prediction(
+                        'irrigation_model', model_inputs, run_irrigation_model
+                    )
+
+                    if show_debug:
+                        st.markdown("**Debug — irrigation model inputs**")
+                        st.write(irrigation_features.tolist())
+                        st.markdown("**Debug — irrigation model outputs**")
+                        st.write({"prediction": str(pred), "confidence": float(prob) if prob is not None else None})
+
+                    # Display irrigation decision
+                    irrigation_needed = (pred == 1 or pred == 'irrigate')
+
+                    # Professional irrigation decision card
+                    prob_value = prob if prob is not None else 0.0
+                    confidence_class = "confidence-high" if prob_value >= 0.8 else ("confidence-medium" if prob_value >= 0.6 else "confidence-low")
+
+                    if irrigation_needed:
+                        st.markdown(f"""
+                        <div class="result-card">
+                            <div class="result-header">
+                                <div class="result-icon">💧</div>
+                                <div>
+                                    <div class="result-title">Irrigation Decision</div>
+                                    <span class="confidence-badge {confidence_class}">Confidence: {prob_value*100:.1f}%</span>
+                                </div>
+                            </div>
+                            <div class="result-value">Irrigation Needed</div>
+                        </div>
+                        """, unsafe_allow_html=True)
+
+                        # STEP 2: Calculate Optimal Irrigation Amount (only if irrigation is needed)
+                        st.markdown("### ⚡ Step 2: Optimal Irrigation Amount")
+
+                        if not MODEL_STATUS['optimization_model']:
+                            st.warning("⚠️ **Optimization model unavailable** - Cannot calculate optimal amount")
+                        else:
+                            try:
+                                def run_optimization_model():
+                                    # Create features for optimization model
+                                    optimization_features = create_optimization_features(*model_inputs)
+
+                                    log_event(logger, "OPT_INPUTS", soil_moisture=soil_moisture, temp=temp, hum=hum,
+                                              ph=ph, N=N, P=P, K=K, rain=rain)
+
+                                    with timed(logger, "OPT_OUTPUT") as opt_log:
+                                        optimization_pred = optimization_model.predict(optimization_features)[0]
+                                        opt_log["pred"] = float(optimization_pred)
+                                    return optimization_features, optimization_pred
+
+                                optimization_features, optimization_pred = memoized_prediction(
+                                    'optimization_model', model_inputs, run_optimization_model
+                                )
+
+                                if show_debug:
+                                    st.markdown("**Debug — optimization model inputs**")
+                                    st.write(optimization_features.tolist())
+                                    st.markdown("**Debug — optimization model outputs**")
+                                    st.write({"prediction": float(optimization_pred)})
+
+                                # Validation check
+                                if optimization_pred < 0 or optimization_pred > 100:
+                                    st.error("❌ **INVALID OPTIMIZATION RESULT**")
+                                    st.info("🔄 **Returned Value**: 0 (Validation fail-safe)")
+                                else:
+                                    # Display optimal amount in styled card
+                                    st.markdown(f"""
+                                    <div class="result-card">
+                                        <div class="result-header">
+                                            <div class="result-icon">💦</div>
+                                            <div>
+                                                <div class="result-title">Optimal Irrigation Amount</div>
+                                            </div>
+                                        </div>
+                                        <div class="result-value">{optimization_pred:.2f} units</div>
+                                    </div>
+                                    """, unsafe_allow_html=True)
+
+                                    # Summary box with modern styling
+                                    st.markdown(f"""
+                                    <div class="success-box">
+                                        <h4 style="margin-top: 0; color: var(--secondary-green);">🎯 Irrigation Summary</h4>
+                                        <ul style="margin-bottom: 0;">
+                                            <li><strong>Decision:</strong> Irrigation Required ✅</li>
+                                            <li><strong>Optimal Amount:</strong> {optimization_pred:.2f} units</li>
+                                            <li><strong>Confidence:</strong> {prob_value*100:.1f}%</li>
+                                        </ul>
+                                    </div>
+                                    """, unsafe_allow_html=True)
+
+                            except Exception as e:
+                                st.error(f"❌ **OPTIMIZATION FAILED**: {str(e)}")
+                                st.info("🔄 **Returned Value**: 0 (Exception fail-safe)")
+                    else:
+                        # No irrigation needed card
+                        st.markdown(f"""
+                        <div class="result-card">
+                            <div class="result-header">
+                                <div class="result-icon">✋</div>
+                                <div>
+                                    <div class="result-title">Irrigation Decision</div>
+                                    <span class="confidence-badge {confidence_class}">Confidence: {prob_value*100:.1f}%</span>
+                                </div>
+                            </div>
+                            <div class="result-value">No Irrigation Needed</div>
+                        </div>
+                        """, unsafe_allow_html=True)
+
+                        # Info box
+                        st.markdown("""
+                        <div class="info-box">
+                            <p style="margin: 0;"><strong>✅ Soil conditions are adequate</strong> - No irrigation required at this time</p>
+                        </div>
+                        """, unsafe_allow_html=True)
+
+                        # Summary box
+                        st.markdown(f"""
+                        <div class="success-box">
+                            <h4 style="margin-top: 0; color: var(--secondary-green);">🎯 Irrigation Summary</h4>
+                            <ul style="margin-bottom: 0;">
+                                <li><strong>Decision:</strong> No Irrigation Required ✅</li>
+                                <li><strong>Recommended Amount:</strong> 0.00 units</li>
+                                <li><strong>Confidence:</strong> {prob_value*100:.1f}%</li>
+                            </ul>
+                        </div>
+                        """, unsafe_allow_html=True)
+
+                except Exception as e:
+                    st.error(f"❌ **IRRIGATION ANALYSIS FAILED**: {str(e)}")
+                    st.info("🔄 **Returned Value**: 0 (Exception fail-safe)")
+
+    irrigation_panel(inputs['N'], inputs['P'], inputs['K'], inputs['temp'], inputs['hum'],
+                     inputs['ph'], inputs['rain'], inputs['soil_moisture'], show_debug)
@@ -0,0 +1,92 @@
+"""
+Soil page: soil type classification from an uploaded image
+==========================================================
+TensorFlow is imported when this page first loads the classifier.
+"""
+
+import streamlit as st
+from PIL import Image
+
+from model_store import MODEL_STATUS, load_soil_model
+from predictions import predict_soil_type
+
+soil_model, soil_labels = load_soil_model()
+
+
+@st.fragment
+def soil_classification_panel():
+    # === SOIL TYPE CLASSIFICATION SECTION ===
+    st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+    st.markdown("""
+    <div class="custom-card">
+        <h3>🏞️ Soil Type Classification</h3>
+        <p style="color: #6c757d;">Upload an image to identify soil type using AI vision</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    uploaded_file = st.file_uploader("Choose a soil image...", type=["jpg", "jpeg", "png"], help="Upload a clear image of the soil surface")
+
+    if uploaded_file is not None:
+        # Display uploaded image
+        image = Image.open(uploaded_file)
+        col_img1, col_img2, col_img3 = st.columns([1, 2, 1])
+        with col_img2:
+            st.image(image, caption="Uploaded Soil Image", use_container_width=True)
+    
+        # Classify button
+        if st.button("🔍 Classify Soil Type", type="primary", use_container_width=True, key="classify_soil"):
+            if not MODEL_STATUS.get('soil_model') or soil_model is None:
+                st.error("❌ **SOIL CLASSIFIER NOT LOADED**: Cannot classify soil type")
+                st.info("🔄 Please ensure soil_model_savedmodel is available in models/ directory")
+            else:
+                with st.spinner("🔄 Analyzing soil image..."):
+                    # Get prediction with all probabilities
+                    result = predict_soil_type(image, soil_model, soil_labels)
+                
+                    if len(result) == 3:
+                        soil_type, confidence, error = result
+                        all_probs = None
+                    else:
+                        soil_type, confidence, error, all_probs = result
+                
+                    if error:
+                        st.error(f"❌ Classification failed: {error}")
+                    else:
+                        # Display result in a professional card
+                        confidence_class = "confidence-high" if confidence >= 0.8 else ("confidence-medium" if confidence >= 0.6 else "confidence-low")
+                        st.markdown(f"""
+                        <div class="result-card">
+                            <div class="result-header">
+                                <div class="result-icon">🌍</div>
+                                <div>
+                                    <div class="result-title">Soil Classification</div>
+                                    <span class="confidence-badge {confidence_class}">Confidence: {confidence*100:.1f}%</span>
+                                </div>
+                            </div>
+                            <div class="result-value">{soil_type}</div>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    
+                        # Soil type information
+                        soil_info = {
+                            'Alluvial': '🌊 **Alluvial Soil**: Rich in minerals and nutrients, formed by river deposits. Excellent for agriculture with good water retention.',
+                            'Black': '🖤 **Black Soil**: High in clay content, rich in calcium, iron, and magnesium. Ideal for cotton cultivation and retains moisture well.',
+                            'Clay': '🧱 **Clay Soil**: Heavy texture with very fine particles. Good water retention but poor drainage. Needs proper management for cultivation.',
+                            'Red': '🔴 **Red Soil**: Contains iron oxide giving it red color. Good for crops like groundnuts, potatoes, and pulses. Moderate fertility.'
+                        }
+                    
+                        if soil_type in soil_info:
+                            st.info(soil_info[soil_type])
+                    
+                        # Add interpretation help
+                        if confidence < 0.6:
+                            st.warning("⚠️ **Low Confidence**: The model is not very confident about this prediction. Consider taking a clearer photo with better lighting.")
+                        elif confidence < 0.8:
+                            st.info("ℹ️ **Medium Confidence**: The prediction is reasonably confident but could be improved with a better quality image.")
+                        else:
+                            st.success("💡 **High Confidence**: The model is very confident about this prediction!")
+                    
+                        st.success("💡 **Tip**: For best results, use clear, well-lit images showing the soil texture and color clearly.")
+
+
+soil_classification_panel()
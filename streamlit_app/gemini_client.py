@@ -0,0 +1,701 @@
+"""
+Gemini REST client for the AgriTech assistant
+=============================================
+Process-wide state shared by every Streamlit session:
+
+- a service-account token cache that only refreshes shortly before expiry,
+- one pooled ``requests.Session`` (keep-alive + connection reuse),
+- a TTL cache of the models available to the configured credentials.
+
+Together these take the OAuth round trip, the TCP/TLS handshake and the
+model-list fetch off the hot path of every assistant query.
+
+Model selection is sticky (the last model that answered is tried first),
+fallback candidates are raced as hedged requests, and a per-model circuit
+breaker skips models that keep failing.
+
+``GeminiStream`` streams an answer from ``:streamGenerateContent`` on a
+background thread so the page can render tokens as they arrive.
+"""
+
+import datetime
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+import streamlit as st
+from google.auth.transport.requests import Request
+from google.oauth2 import service_account
+from requests.adapters import HTTPAdapter
+
+from response_cache import NO_RESPONSE_TEXT
+
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+GEMINI_SCOPES = ['https://www.googleapis.com/auth/generative-language.retriever']
+DEFAULT_MODEL = "gemini-1.5-flash"
+
+# Refresh the cached access token this long before it actually expires.
+TOKEN_REFRESH_MARGIN = datetime.timedelta(minutes=5)
+# How long a successful / failed model-list lookup is reused.
+MODEL_LIST_TTL = float(os.getenv("GEMINI_MODEL_LIST_TTL", 600))
+MODEL_LIST_ERROR_TTL = 60.0
+
+# (connect, read) timeouts per attempt
+REQUEST_TIMEOUT = (5, 30)
+MODEL_LIST_TIMEOUT = 15
+
+PREFERRED_ORDER = [
+    "gemini-2.5-flash",
+    "gemini-1.5-flash",
+    "gemini-1.5-flash-8b",
+    "gemini-2.5-flash-lite-preview-06-17"
+]
+# Start the next fallback candidate if the previous one hasn't answered by then.
+HEDGE_DELAY = float(os.getenv("GEMINI_HEDGE_DELAY", 1.5))
+# Open a model's circuit after this many consecutive failures, for this long.
+BREAKER_THRESHOLD = int(os.getenv("GEMINI_BREAKER_THRESHOLD", 3))
+BREAKER_COOLDOWN = float(os.getenv("GEMINI_BREAKER_COOLDOWN", 120))
+
+
+class _TokenCache:
+    """Service-account credentials kept for the life of the process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._credentials = None
+        self._path = None
+
+    def get_token(self, credentials_path):
+        with self._lock:
+            if self._credentials is None or self._path != credentials_path:
+                self._credentials = service_account.Credentials.from_service_account_file(
+                    credentials_path, scopes=GEMINI_SCOPES
+                )
+                self._path = credentials_path
+            credentials = self._credentials
+            # google-auth keeps `expiry` as a naive UTC datetime
+            now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+            if not credentials.token or credentials.expiry is None or credentials.expiry - now < TOKEN_REFRESH_MARGIN:
+                credentials.refresh(Request(session=get_session()))
+            return credentials.token
+
+    def clear(self):
+        with self._lock:
+            self._credentials = None
+            self._path = None
+
+
+class _ModelListCache:
+    """TTL cache of model names that support ``generateContent``, per credential."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            ttl = MODEL_LIST_TTL if entry["names"] is not None else MODEL_LIST_ERROR_TTL
+            if time.monotonic() - entry["fetched_at"] > ttl:
+                del self._entries[key]
+                return None
+            return entry
+
+    def put(self, key, names=None, error=None):
+        with self._lock:
+            self._entries[key] = {"names": names, "error": error, "fetched_at": time.monotonic()}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class _CircuitBreaker:
+    """Per-model breaker: stop calling a model after repeated failures.
+
+    After ``threshold`` consecutive failures the circuit opens for
+    ``cooldown`` seconds; then a single trial request is let through
+    (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = {}
+        self._opened_at = {}
+
+    def allow(self, model):
+        with self._lock:
+            opened_at = self._opened_at.get(model)
+            if opened_at is None:
+                return True
+            if time.monotonic() - opened_at >= self.cooldown:
+                # Half-open: allow one trial, re-arm the timer for everyone else.
+                self._opened_at[model] = time.monotonic()
+                return True
+            return False
+
+    def record_success(self, model):
+        with self._lock:
+            self._failures.pop(model, None)
+            self._opened_at.pop(model, None)
+
+    def record_failure(self, model):
+        with self._lock:
+            count = self._failures.get(model, 0) + 1
+            self._failures[model] = count
+            if count >= self.threshold:
+                self._opened_at[model] = time.monotonic()
+
+    def state(self):
+        with self._lock:
+            return {model: ("open" if model in self._opened_at else "closed", count)
+                    for model, count in self._failures.items()}
+
+    def reset(self):
+        with self._lock:
+            self._failures.clear()
+            self._opened_at.clear()
+
+
+class _StickyModel:
+    """Remember the last model that answered, per configured GEMINI_MODEL."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models = {}
+
+    def get(self, configured):
+        with self._lock:
+            return self._models.get(configured)
+
+    def remember(self, model):
+        with self._lock:
+            self._models[configured_model()] = model
+
+    def forget(self, model):
+        with self._lock:
+            for configured, remembered in list(self._models.items()):
+                if remembered == model:
+                    del self._models[configured]
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+
+def _is_model_failure(status_code):
+    """Statuses that say "try another model" rather than "fix the request"."""
+    return status_code in (404, 429) or status_code >= 500
+
+
+_token_cache = _TokenCache()
+_model_list_cache = _ModelListCache()
+_sticky = _StickyModel()
+circuit_breaker = _CircuitBreaker()
+_hedge_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="gemini-hedge")
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide pooled HTTP session."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _service_account_path():
+    return os.getenv("GOOGLE_APPLICATION_CREDENTIALS") or os.path.join(
+        os.path.dirname(__file__), "service-account.json"
+    )
+
+
+def resolve_auth():
+    """Return ``(access_token, api_key)``; exactly one of them is set."""
+    access_token = None
+    api_key = None
+
+    # Try Service Account authentication first
+    service_account_path = _service_account_path()
+    if os.path.exists(service_account_path):
+        try:
+            access_token = _token_cache.get_token(service_account_path)
+        except Exception as e:
+            st.warning(f"Service Account auth failed, trying API key: {e}")
+
+    # Fall back to API key if Service Account not available
+    if not access_token:
+        api_key = os.getenv("GEMINI_API_KEY") or (st.secrets.get("GEMINI_API_KEY") if hasattr(st, "secrets") else None)
+        if not api_key:
+            raise ValueError("Neither GOOGLE_APPLICATION_CREDENTIALS nor GEMINI_API_KEY found. Please set one in .env or Streamlit secrets.")
+    return access_token, api_key
+
+
+def _auth_kwargs(access_token, api_key):
+    """Bearer token if available, otherwise the API key as a query parameter."""
+    if access_token:
+        return {"headers": {"Authorization": f"Bearer {access_token}"}}
+    return {"params": {"key": api_key}}
+
+
+def fetch_available_models(access_token, api_key):
+    """Return ``(names, error)`` for the current credentials, served from the TTL cache."""
+    cache_key = "service-account" if access_token else f"key:{api_key}"
+    cached = _model_list_cache.get(cache_key)
+    if cached is not None:
+        return cached["names"], cached["error"]
+
+    try:
+        resp = get_session().get(
+            f"{GEMINI_API_BASE}/models",
+            timeout=MODEL_LIST_TIMEOUT,
+            **_auth_kwargs(access_token, api_key)
+        )
+        if resp.ok:
+            data = resp.json()
+            names = set()
+            for model in data.get("models", []):
+                name = model.get("name")
+                if not name:
+                    continue
+                short_name = name.split("/")[-1]
+                methods = model.get("supportedGenerationMethods", []) or []
+                if "generateContent" in methods:
+                    names.add(short_name)
+            _model_list_cache.put(cache_key, names=names)
+            return names, None
+        _model_list_cache.put(cache_key, error=resp.text)
+        return None, resp.text
+    except requests.RequestException as fetch_err:
+        _model_list_cache.put(cache_key, error=str(fetch_err))
+        return None, str(fetch_err)
+
+
+def build_payload(prompt, context=None, system_instruction=None):
+    user_parts = [
+        {"text": prompt}
+    ]
+    if context:
+        user_parts.append({"text": f"\nContext:\n{context}"})
+
+    payload = {
+        "contents": [
+            {
+                "role": "user",
+                "parts": user_parts
+            }
+        ]
+    }
+
+    if system_instruction:
+        payload["system_instruction"] = {
+            "parts": [{"text": system_instruction}]
+        }
+    return payload
+
+
+def configured_model():
+    return (os.getenv("GEMINI_MODEL", DEFAULT_MODEL) or "").strip() or DEFAULT_MODEL
+
+
+def preferred_model():
+    """The last model that answered in this process, else GEMINI_MODEL."""
+    return _sticky.get(configured_model()) or configured_model()
+
+
+def call_gemini_chat(prompt, context=None, system_instruction=None):
+    """Call the Gemini REST API and return a dict with text + metadata."""
+    access_token, api_key = resolve_auth()
+    return generate_content(prompt, access_token, api_key, context, system_instruction)
+
+
+def generate_content(prompt, access_token, api_key, context=None, system_instruction=None, skip_models=()):
+    """Blocking ``generateContent`` call with model fallback.
+
+    The last model that answered is tried first. If it fails, the fallback
+    candidates are raced as hedged requests (a new one every
+    ``HEDGE_DELAY`` seconds) and the first success wins. Models whose circuit
+    breaker is open (or listed in ``skip_models`` because the caller already
+    saw them fail) are skipped. Does not touch Streamlit, so it can run on a
+    worker thread.
+    """
+    model_name = configured_model()
+    endpoint_override = os.getenv("GEMINI_REST_URL")
+
+    def _build_endpoint(model):
+        return f"{GEMINI_API_BASE}/models/{model}:generateContent"
+
+    auth = _auth_kwargs(access_token, api_key)
+    headers = {"Content-Type": "application/json", **auth.get("headers", {})}
+    payload = build_payload(prompt, context, system_instruction)
+
+    attempt_log = []
+    available_model_cache = {"names": None, "error": None}
+
+    def _make_request(url):
+        try:
+            return get_session().post(
+                url,
+                params=auth.get("params"),
+                headers=headers,
+                json=payload,
+                timeout=REQUEST_TIMEOUT
+            )
+        except requests.RequestException as req_err:
+            raise RuntimeError(f"Gemini request failed: {req_err}") from req_err
+
+    def _call_model(target_model, reason=None):
+        target_url = endpoint_override or _build_endpoint(target_model)
+        try:
+            response = _make_request(target_url)
+        except RuntimeError as req_err:
+            attempt_log.append({"model": target_model, "status": None, "ok": False,
+                                "reason": reason or "default", "error": str(req_err)})
+            circuit_breaker.record_failure(target_model)
+            raise
+        attempt_log.append({
+            "model": target_model,
+            "status": getattr(response, "status_code", None),
+            "ok": getattr(response, "ok", False),
+            "reason": reason or ("endpoint override" if endpoint_override else "default")
+        })
+        if response.ok:
+            circuit_breaker.record_success(target_model)
+        elif _is_model_failure(response.status_code):
+            circuit_breaker.record_failure(target_model)
+        return response
+
+    def _fetch_available_models():
+        names, error = fetch_available_models(access_token, api_key)
+        available_model_cache["names"] = names
+        available_model_cache["error"] = error
+        return names
+
+    if endpoint_override:
+        response = _call_model(model_name)
+        primary_model = model_name
+    else:
+        primary_model = preferred_model()
+        response = None
+        if primary_model not in skip_models and circuit_breaker.allow(primary_model):
+            reason = None if primary_model == model_name else "last working model"
+            try:
+                response = _call_model(primary_model, reason=reason)
+            except RuntimeError:
+                response = None
+    used_model = primary_model
+    fallback_notice = None
+    fallback_used = False
+
+    if not endpoint_override and (response is None or (not response.ok and _is_model_failure(response.status_code))):
+        if primary_model != model_name:
+            # The remembered model stopped working: forget it and start over.
+            _sticky.forget(primary_model)
+
+        fallback_notice_parts = []
+        fallback_chain = []
+
+        if primary_model != model_name:
+            fallback_chain.append((model_name, "Last working model unavailable"))
+
+        if model_name.endswith("-latest"):
+            trimmed = model_name.removesuffix("-latest")
+            if trimmed and trimmed != model_name:
+                fallback_chain.append((trimmed, "'-latest' alias unavailable"))
+
+        for candidate in PREFERRED_ORDER:
+            if candidate and candidate not in (model_name, primary_model):
+                fallback_chain.append((candidate, "Primary model unavailable"))
+
+        available_names = _fetch_available_models()
+
+        def _allowed(candidate):
+            if not available_names:
+                return True
+            return candidate in available_names
+
+        filtered_chain = [(model, reason) for model, reason in fallback_chain
+                          if _allowed(model) and model not in skip_models]
+
+        if available_names:
+            missing_models = [model for model, _ in fallback_chain if model not in available_names]
+            if missing_models:
+                fallback_notice_parts.append(
+                    "Models not in your account were skipped: " + ", ".join(missing_models)
+                )
+
+        open_circuits = [model for model, _ in filtered_chain if not circuit_breaker.allow(model)]
+        if open_circuits:
+            fallback_notice_parts.append(
+                "Temporarily skipping models that keep failing: " + ", ".join(open_circuits)
+            )
+        filtered_chain = [(model, reason) for model, reason in filtered_chain if model not in open_circuits]
+
+        winner, winner_response, last_response = _hedged_race(filtered_chain, _call_model)
+        if winner is not None:
+            fallback_notice_parts.append(
+                f"Primary model unavailable. Answered by '{winner}'. Update GEMINI_MODEL to pin a working model."
+            )
+            response = winner_response
+            used_model = winner
+            fallback_notice = " ".join(fallback_notice_parts)
+            fallback_used = True
+        elif last_response is not None:
+            response = last_response
+
+    if response is None:
+        attempt_summary = ", ".join(entry['model'] for entry in attempt_log) or "none"
+        raise RuntimeError(
+            "Gemini API error: no model could be reached "
+            f"(attempts: {attempt_summary}). Models that keep failing are paused for "
+            f"{int(circuit_breaker.cooldown)}s; check your connection and GEMINI_MODEL."
+        )
+
+    if not response.ok:
+        try:
+            err_payload = response.json()
+            err_detail = err_payload.get("error", {}).get("message") or err_payload.get("error", {}).get("status")
+        except ValueError:
+            err_detail = response.text
+
+        attempt_summary = ", ".join(
+            f"{entry['model']}→{entry.get('status')}" if entry.get('status') else entry['model']
+            for entry in attempt_log
+        )
+        if attempt_summary:
+            err_detail = f"{err_detail} (attempts: {attempt_summary})"
+
+        if available_model_cache["names"]:
+            sorted_names = ", ".join(sorted(available_model_cache["names"]))
+            err_detail = f"{err_detail} | Available models for key: {sorted_names}"
+        elif available_model_cache["error"]:
+            err_detail = f"{err_detail} | Unable to list models: {available_model_cache['error']}"
+
+        extra_hint = ""
+        if response.status_code == 404 and not endpoint_override:
+            if model_name.endswith("-latest") and not fallback_used:
+                extra_hint = " Tip: remove the '-latest' suffix or set GEMINI_REST_URL explicitly."
+            else:
+                extra_hint = " Ensure your GEMINI_MODEL matches an available model for your API key."
+        elif endpoint_override:
+            extra_hint = " Verify GEMINI_REST_URL is correct or unset it to allow automatic fallbacks."
+
+        raise RuntimeError(f"Gemini API error ({response.status_code}): {err_detail}{extra_hint}")
+
+    if not endpoint_override:
+        _sticky.remember(used_model)
+
+    data = response.json()
+
+    try:
+        text = data["candidates"][0]["content"]["parts"][0]["text"]
+    except (KeyError, IndexError, TypeError):
+        text = ""
+
+    if not text:
+        text = NO_RESPONSE_TEXT
+
+    return {
+        "text": text,
+        "model_used": used_model,
+        "notice": fallback_notice,
+        "attempts": attempt_log
+    }
+
+
+def _hedged_race(chain, call_model):
+    """Race the fallback candidates, starting one more every ``HEDGE_DELAY`` seconds.
+
+    Returns ``(winner, winner_response, last_failed_response)``.
+    """
+    if not chain:
+        return None, None, None
+
+    pending = {}
+    last_response = None
+    candidates = list(chain)
+
+    def _launch():
+        model, reason = candidates.pop(0)
+        pending[_hedge_pool.submit(call_model, model, reason)] = model
+
+    _launch()
+    while pending:
+        timeout = HEDGE_DELAY if candidates else None
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            model = pending.pop(future)
+            try:
+                response = future.result()
+            except RuntimeError:
+                continue
+            if response.ok:
+                # Stragglers keep running in the pool; their outcome still
+                # feeds the circuit breaker but is otherwise ignored.
+                return model, response, last_response
+            last_response = response
+            if not _is_model_failure(response.status_code):
+                # e.g. 400/401/403: the request itself is wrong, other models won't help.
+                return None, None, response
+        # Timed out or every finished candidate failed: hedge with the next one.
+        if candidates:
+            _launch()
+    return None, None, last_response
+
+
+def _chunk_text(chunk):
+    try:
+        parts = chunk["candidates"][0]["content"]["parts"]
+    except (KeyError, IndexError, TypeError):
+        return ""
+    return "".join(part.get("text", "") for part in parts if isinstance(part, dict))
+
+
+def iter_stream_text(response):
+    """Yield text fragments from a ``streamGenerateContent?alt=sse`` response."""
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        try:
+            chunk = json.loads(line[len("data:"):].strip())
+        except ValueError:
+            continue
+        text = _chunk_text(chunk)
+        if text:
+            yield text
+
+
+class GeminiStream:
+    """One assistant answer streamed on a background thread.
+
+    The Streamlit script polls ``text`` / ``done`` instead of blocking on the
+    request. Credentials are resolved on the caller's thread (it may need
+    ``st.secrets``); the worker itself never calls Streamlit.
+    """
+
+    def __init__(self, prompt, context=None, system_instruction=None):
+        self.prompt = prompt
+        self.text = ""
+        self.error = None
+        self.model_used = None
+        self.notice = None
+        self.attempts = []
+        self._failed_models = []
+        self.started_at = time.perf_counter()
+        self.first_token_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+
+        access_token, api_key = resolve_auth()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(access_token, api_key, context, system_instruction),
+            name="gemini-stream",
+            daemon=True,
+        )
+        self._thread.start()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def time_to_first_token(self):
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    @property
+    def total_latency(self):
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def _append(self, text):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.text += text
+
+    def _run(self, access_token, api_key, context, system_instruction):
+        try:
+            if not self._stream(access_token, api_key, context, system_instruction):
+                # Streaming from the preferred model failed before any token:
+                # fall back to the blocking call, which races the fallbacks.
+                result = generate_content(self.prompt, access_token, api_key, context, system_instruction,
+                                          skip_models=self._failed_models)
+                self.model_used = result["model_used"]
+                self.notice = result["notice"]
+                self.attempts.extend(result["attempts"])
+                self._append(result["text"])
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.finished_at = time.perf_counter()
+            self._done.set()
+
+    def _stream(self, access_token, api_key, context, system_instruction):
+        """Stream from the preferred model. Returns False if it should fall back."""
+        if os.getenv("GEMINI_REST_URL"):
+            return False
+        model_name = preferred_model()
+        if not circuit_breaker.allow(model_name):
+            return False
+        auth = _auth_kwargs(access_token, api_key)
+        params = {"alt": "sse", **auth.get("params", {})}
+        headers = {"Content-Type": "application/json", **auth.get("headers", {})}
+        try:
+            response = get_session().post(
+                f"{GEMINI_API_BASE}/models/{model_name}:streamGenerateContent",
+                params=params,
+                headers=headers,
+                json=build_payload(self.prompt, context, system_instruction),
+                stream=True,
+                timeout=REQUEST_TIMEOUT,
+            )
+        except requests.RequestException:
+            circuit_breaker.record_failure(model_name)
+            self._failed_models.append(model_name)
+            return False
+
+        with response:
+            self.attempts.append({
+                "model": model_name,
+                "status": response.status_code,
+                "ok": response.ok,
+                "reason": "stream",
+            })
+            if _is_model_failure(response.status_code):
+                circuit_breaker.record_failure(model_name)
+                self._failed_models.append(model_name)
+                return False
+            if not response.ok:
+                try:
+                    err_detail = response.json().get("error", {}).get("message")
+                except ValueError:
+                    err_detail = response.text
+                raise RuntimeError(f"Gemini API error ({response.status_code}): {err_detail}")
+            circuit_breaker.record_success(model_name)
+            _sticky.remember(model_name)
+            self.model_used = model_name
+            for text in iter_stream_text(response):
+                self._append(text)
+        if not self.text:
+            self._append(NO_RESPONSE_TEXT)
+        return True
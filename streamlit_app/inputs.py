@@ -0,0 +1,230 @@
+"""
+Input Parameters column shared by the Crop, Irrigation and Assistant pages
+=========================================================================
+Widget values live in ``st.session_state`` under the ``in_*`` keys so the
+same parameters follow the user from page to page. The parameters sit in one
+``st.form``: a full set of edits costs a single rerun, on Apply.
+
+Pages wrap their model calls in :func:`memoized_prediction`, keyed by the
+inputs that model uses, so applying the form only recomputes the models
+whose inputs actually changed.
+"""
+
+import pandas as pd
+import streamlit as st
+
+from iot_data import format_age, latest_reading_cache
+from model_store import available_soil_types, model_version
+
+# Previous hard-coded defaults, used when there is no IoT reading
+INPUT_DEFAULTS = {
+    'in_N': 101,
+    'in_P': 33,
+    'in_K': 33,
+    'in_temp': 23.0,
+    'in_hum': 82.0,
+    'in_ph': 6.91,
+    'in_rain': 142.86,
+    'in_soil_moisture': 35.0,
+    'in_wind_speed': 8.0,
+    'in_pressure': 101.3,
+}
+
+# Input key -> sensor reading key used for IoT auto-fill defaults
+SENSOR_KEYS = {
+    'in_temp': 'temperature',
+    'in_hum': 'humidity',
+    'in_soil_moisture': 'soil_moisture',
+    'in_wind_speed': 'wind_speed',
+    'in_pressure': 'pressure',
+}
+# Inputs locked to the live sensors while auto-fill is on
+AUTO_FILL_KEYS = ('in_temp', 'in_hum', 'in_soil_moisture')
+
+# Bounds of the widgets, so sensor values outside them don't raise
+_BOUNDS = {
+    'in_temp': (0.0, 50.0),
+    'in_hum': (0.0, 100.0),
+    'in_soil_moisture': (0.0, 100.0),
+    'in_wind_speed': (0.0, 50.0),
+    'in_pressure': (80.0, 110.0),
+}
+
+
+def fetch_latest_iot_reading(force=False):
+    """Return the latest sensor reading (table: 'Sensor readings') as a float dict, or None.
+
+    Served from the shared cache in ``iot_data`` that a background thread keeps
+    warm; ``force=True`` refetches from Supabase immediately.
+    Converts soil_moisture from 0-1 to 0-100 automatically if needed.
+    """
+    try:
+        if force:
+            return latest_reading_cache.refresh()
+        return latest_reading_cache.get()
+    except Exception:
+        return None
+
+
+def memoized_prediction(model_name, model_inputs, compute):
+    """Return ``compute()`` for ``model_name``, reusing the last result while ``model_inputs`` is unchanged.
+
+    A reloaded model (see ``model_store.check_for_updates``) counts as a change.
+    """
+    results = st.session_state.setdefault('prediction_results', {})
+    key = (model_version(model_name), model_inputs)
+    cached = results.get(model_name)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    result = compute()
+    results[model_name] = (key, result)
+    return result
+
+
+def _clamp(key, value):
+    low, high = _BOUNDS.get(key, (None, None))
+    if low is None:
+        return value
+    return min(max(float(value), low), high)
+
+
+def _init_state(sensor):
+    """Seed unset inputs and keep widget state alive on pages that don't render the inputs."""
+    for key, default in INPUT_DEFAULTS.items():
+        if key in st.session_state:
+            # Re-assigning stops Streamlit from dropping the value when another page is shown
+            st.session_state[key] = st.session_state[key]
+            continue
+        value = sensor.get(SENSOR_KEYS.get(key))
+        st.session_state[key] = _clamp(key, default if value is None else value)
+
+
+def render_input_panel():
+    """Render the Input Parameters column and return the current values as a dict."""
+    st.markdown("""
+    <div class="glass-card animate-slide-in">
+        <div class="glass-card-header">
+            <span class="glass-card-icon">📊</span>
+            <div>
+                <h3 class="glass-card-title">Input Parameters</h3>
+                <p class="glass-card-subtitle">Configure soil nutrients and environmental conditions</p>
+            </div>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Try to auto-fill inputs from the latest IoT reading (if available)
+    sensor_defaults = fetch_latest_iot_reading() or {}
+
+    # Option to auto-fill selected inputs from IoT and lock those widgets
+    st.session_state.setdefault('in_auto_fill', True)
+    st.session_state['in_auto_fill'] = st.session_state['in_auto_fill']
+    auto_fill = st.checkbox("🔁 Auto-fill from IoT Sensors", key="in_auto_fill", help="Automatically populate Temperature, Humidity, and Soil Moisture from live sensors")
+
+    # Staleness indicator for the cached reading
+    iot_status = latest_reading_cache.status()
+    if iot_status["has_reading"]:
+        freshness = "🟠 Stale" if iot_status["stale"] else "🟢 Live"
+        st.caption(
+            f"{freshness} IoT reading from {format_age(iot_status['reading_age'])} ago "
+            f"(checked {format_age(iot_status['checked_ago'])} ago)"
+        )
+        if iot_status["error"]:
+            st.caption(f"⚠️ Last refresh failed, showing the previous reading: {iot_status['error']}")
+
+    # Manual refresh button to fetch latest IoT values into session state
+    if st.button("🔄 Fetch IoT Now"):
+        new = fetch_latest_iot_reading(force=True)
+        if new:
+            st.session_state['sensor_defaults'] = new
+        else:
+            st.warning("No IoT data available or failed to fetch.")
+        st.rerun()
+
+    # Prefer session-cached sensor values if present (after manual refresh or demo data)
+    current_sensor = st.session_state.get('sensor_defaults') or sensor_defaults
+    _init_state(current_sensor)
+    if auto_fill:
+        for key in AUTO_FILL_KEYS:
+            value = current_sensor.get(SENSOR_KEYS[key])
+            if value is not None:
+                st.session_state[key] = _clamp(key, value)
+
+    # All parameters are committed together: editing them doesn't rerun the page until Apply is pressed
+    with st.form("input_parameters", border=False):
+        # Soil Nutrients Section
+        st.markdown("#### 🧪 Soil Nutrients (NPK)")
+        ncol1, ncol2, ncol3 = st.columns(3)
+        with ncol1:
+            N = st.number_input("Nitrogen (N)", min_value=0, max_value=200, key="in_N", help="Nitrogen content in soil (mg/kg)")
+        with ncol2:
+            P = st.number_input("Phosphorus (P)", min_value=0, max_value=200, key="in_P", help="Phosphorus content in soil (mg/kg)")
+        with ncol3:
+            K = st.number_input("Potassium (K)", min_value=0, max_value=200, key="in_K", help="Potassium content in soil (mg/kg)")
+
+        st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+
+        # Environmental Conditions Section
+        st.markdown("#### 🌤️ Environmental Conditions")
+
+        # Get demo soil type if available
+        soil_types = available_soil_types()
+        default_soil_type = st.session_state.get('demo_soil_type', soil_types[0])
+        if st.session_state.get('in_soil_type') not in soil_types:
+            st.session_state['in_soil_type'] = default_soil_type if default_soil_type in soil_types else soil_types[0]
+        st.session_state['in_soil_type'] = st.session_state['in_soil_type']
+
+        # Add Soil Type selector
+        soil_type = st.selectbox(
+            "🌍 Soil Type",
+            options=soil_types,
+            key="in_soil_type",
+            help="Select the type of soil in your field"
+        )
+
+        ecol1, ecol2 = st.columns(2)
+        with ecol1:
+            temp = st.number_input("🌡️ Temperature (°C)", min_value=0.0, max_value=50.0, key="in_temp", help="Average temperature", disabled=auto_fill)
+            ph = st.number_input("⚗️ Soil pH", min_value=0.0, max_value=14.0, key="in_ph", help="Soil pH level (0-14)")
+        with ecol2:
+            hum = st.number_input("💧 Humidity (%)", min_value=0.0, max_value=100.0, key="in_hum", help="Relative humidity", disabled=auto_fill)
+            rain = st.number_input("🌧️ Rainfall (mm)", min_value=0.0, max_value=300.0, key="in_rain", help="Annual rainfall")
+
+        st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+
+        # Irrigation Parameters Section
+        st.markdown("#### 💦 Irrigation Parameters")
+
+        icol1, icol2, icol3 = st.columns(3)
+        with icol1:
+            soil_moisture = st.number_input(
+                "💧 Soil Moisture (%)",
+                min_value=0.0,
+                max_value=100.0,
+                key="in_soil_moisture",
+                step=0.1,
+                help="Volumetric water content (0-100%)",
+                disabled=auto_fill,
+            )
+        with icol2:
+            wind_speed = st.number_input("🌬️ Wind Speed (km/h)", min_value=0.0, max_value=50.0, key="in_wind_speed", help="Wind speed")
+        with icol3:
+            pressure = st.number_input("🌡️ Pressure (kPa)", min_value=80.0, max_value=110.0, key="in_pressure", help="Atmospheric pressure")
+
+        st.form_submit_button("✅ Apply Parameters", type="primary", use_container_width=True)
+
+    # Input Summary Table
+    st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+    with st.expander("📋 View Input Summary", expanded=False):
+        summary_data = {
+            "Parameter": ["Soil Type", "Nitrogen", "Phosphorus", "Potassium", "Temperature", "Humidity", "pH", "Rainfall", "Soil Moisture", "Wind Speed", "Pressure"],
+            "Value": [f"{soil_type.title()}", f"{N} mg/kg", f"{P} mg/kg", f"{K} mg/kg", f"{temp}°C", f"{hum}%", f"{ph}", f"{rain} mm", f"{soil_moisture}%", f"{wind_speed} km/h", f"{pressure} kPa"],
+            "Status": ["✅" if auto_fill else "✏️"] * 11
+        }
+        st.dataframe(pd.DataFrame(summary_data), use_container_width=True, hide_index=True)
+
+    return {
+        'N': N, 'P': P, 'K': K, 'temp': temp, 'hum': hum, 'ph': ph, 'rain': rain,
+        'soil_type': soil_type, 'soil_moisture': soil_moisture, 'wind_speed': wind_speed,
+        'pressure': pressure, 'auto_fill': auto_fill,
+    }
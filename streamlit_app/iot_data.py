@@ -0,0 +1,455 @@
+"""
+IoT data access for the Streamlit dashboard
+===========================================
+Reads sensor data written by ``hardware/data_ingestion.py`` into the
+Supabase table "Sensor readings".
+
+The latest reading is served from a process-wide cache that a background
+thread keeps warm, so Streamlit reruns (every widget change) never wait on
+Supabase and the query rate does not grow with the number of sessions.
+
+Sensor history for the charts is synced incrementally: each refresh only
+asks for rows newer than the high-water mark of a shared, bounded frame.
+
+Longer ranges are served as time-bucketed averages, computed in Postgres by
+``hardware/sql/sensor_history_buckets.sql`` (or locally over a frame when
+Supabase is not configured), with the bucket width chosen so a range never
+returns more than ``IOT_HISTORY_MAX_POINTS`` points.
+
+Environment variables:
+    IOT_CACHE_TTL          Seconds a cached reading is served without a refetch (default: 30)
+    IOT_REFRESH_INTERVAL   Seconds between background refreshes (default: 15)
+    IOT_STALE_AFTER        Age in seconds after which a reading is flagged stale (default: 300)
+    IOT_HISTORY_MAX_ROWS   Rows kept per device in the history frame (default: 5000)
+    IOT_DEVICE_COLUMN      Column that identifies the device, if the table has one
+    IOT_HISTORY_MAX_POINTS Upper bound on points per bucketed history query (default: 500)
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+import streamlit as st
+
+from app_logging import get_logger, log_event
+
+logger = get_logger("iot")
+
+SENSOR_TABLE = "Sensor readings"
+
+CACHE_TTL = float(os.getenv("IOT_CACHE_TTL", 30))
+REFRESH_INTERVAL = float(os.getenv("IOT_REFRESH_INTERVAL", 15))
+STALE_AFTER = float(os.getenv("IOT_STALE_AFTER", 300))
+
+# Columns the history charts use; everything else stays in Supabase.
+HISTORY_COLUMNS = ["id", "created_at", "temperature", "humidity", "soil_moisture",
+                   "water_level", "wind_speed", "rainfall"]
+HISTORY_MAX_ROWS = int(os.getenv("IOT_HISTORY_MAX_ROWS", 5000))
+HISTORY_INITIAL_ROWS = 100
+HISTORY_PAGE_SIZE = 1000
+DEVICE_COLUMN = os.getenv("IOT_DEVICE_COLUMN") or None
+
+HISTORY_MAX_POINTS = int(os.getenv("IOT_HISTORY_MAX_POINTS", 500))
+BUCKET_RPC = "sensor_history_buckets"
+# Candidate bucket widths in seconds, smallest first: 1, 5, 15, 30 min, 1, 3, 6, 12 h, 1 day, 1 week.
+BUCKET_WIDTHS = [60, 300, 900, 1800, 3600, 3 * 3600, 6 * 3600, 12 * 3600, 86400, 7 * 86400]
+BUCKET_VALUE_COLUMNS = ["temperature", "humidity", "soil_moisture", "water_level",
+                        "wind_speed", "rainfall", "pressure"]
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def supabase_credentials():
+    """Return ``(url, key)`` from the environment or Streamlit secrets."""
+    def _secret(name):
+        try:
+            return st.secrets.get(name)
+        except Exception:
+            return None
+
+    url = os.getenv("SUPABASE_URL") or _secret("SUPABASE_URL")
+    key = os.getenv("SUPABASE_SERVICE_KEY") or _secret("SUPABASE_SERVICE_KEY")
+    return url, key
+
+
+def get_client():
+    """Return the shared Supabase client, or None when credentials are missing."""
+    global _client
+    url, key = supabase_credentials()
+    if not url or not key:
+        return None
+    with _client_lock:
+        if _client is None:
+            from supabase import create_client
+            _client = create_client(url, key)
+        return _client
+
+
+def parse_timestamp(value):
+    """Parse a Supabase ``created_at`` value into an aware UTC datetime."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def parse_latest_reading(rec):
+    """Convert a raw row into the float dict used for input defaults.
+
+    Converts soil_moisture from 0-1 to 0-100 automatically if needed.
+    """
+    def _f(key, default=None):
+        v = rec.get(key)
+        try:
+            return float(v) if v is not None else default
+        except Exception:
+            return default
+
+    result = {
+        'temperature': _f('temperature', None),
+        'humidity': _f('humidity', None),
+        'soil_moisture': _f('soil_moisture', None),
+        'wind_speed': _f('wind_speed', None),
+        'pressure': _f('pressure', None),
+        'rainfall': _f('rainfall', None),
+    }
+
+    # If soil_moisture looks normalized (0-1) convert to percent
+    sm = result.get('soil_moisture')
+    if sm is not None and sm <= 1.0:
+        result['soil_moisture'] = sm * 100.0
+
+    return result
+
+
+def fetch_latest_row():
+    """Fetch the newest raw row from Supabase, or None when there is none."""
+    client = get_client()
+    if client is None:
+        return None
+    response = client.table(SENSOR_TABLE).select("*").order("created_at", desc=True).limit(1).execute()
+    return response.data[0] if response.data else None
+
+
+class LatestReadingCache:
+    """Shared TTL cache of the latest sensor reading with a background refresher.
+
+    ``get()`` never blocks on the network once the cache is warm: a daemon
+    thread refetches every ``refresh_interval`` seconds, and only a cold or
+    expired cache (e.g. the refresher died) triggers a synchronous fetch.
+    A failed fetch keeps serving the last good reading; its age shows it.
+    """
+
+    def __init__(self, fetch_row=fetch_latest_row, ttl=CACHE_TTL, refresh_interval=REFRESH_INTERVAL):
+        self.fetch_row = fetch_row
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.reading = None
+        self.reading_time = None
+        self.fetched_at = None
+        self.error = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _is_fresh(self, max_age):
+        return self.fetched_at is not None and time.time() - self.fetched_at <= max_age
+
+    def refresh(self, max_age=None):
+        """Fetch and update the cache; returns the (possibly unchanged) reading.
+
+        With ``max_age``, skip the fetch if another thread refreshed within it
+        while this one waited (single-flight on a cold cache).
+        """
+        with self._refresh_lock:
+            if max_age is not None and self._is_fresh(max_age):
+                return self.reading
+            try:
+                row = self.fetch_row()
+            except Exception as exc:
+                with self._lock:
+                    self.error = str(exc)
+                    self.fetched_at = time.time()
+                log_event(logger, "IOT_REFRESH_FAILED", error=str(exc))
+                return self.reading
+            with self._lock:
+                self.error = None
+                self.fetched_at = time.time()
+                if row:
+                    self.reading = parse_latest_reading(row)
+                    self.reading_time = parse_timestamp(row.get('created_at'))
+            return self.reading
+
+    def get(self):
+        """Return the cached reading, fetching synchronously only if cold or expired."""
+        self.start()
+        if not self._is_fresh(self.ttl):
+            self.refresh(max_age=self.ttl)
+        return self.reading
+
+    def status(self):
+        """Snapshot for the staleness indicator."""
+        now = time.time()
+        with self._lock:
+            reading_age = None
+            if self.reading_time is not None:
+                reading_age = max(0.0, datetime.now(timezone.utc).timestamp() - self.reading_time.timestamp())
+            return {
+                "has_reading": self.reading is not None,
+                "reading_time": self.reading_time,
+                "reading_age": reading_age,
+                "checked_ago": None if self.fetched_at is None else now - self.fetched_at,
+                "stale": reading_age is None or reading_age > STALE_AFTER,
+                "error": self.error,
+            }
+
+    def start(self):
+        """Start the background refresher (idempotent)."""
+        if self.refresh_interval <= 0:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="iot-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.refresh_interval)
+
+
+def _empty_history(columns):
+    frame = pd.DataFrame({col: pd.Series(dtype="float32") for col in columns})
+    if "id" in frame:
+        frame["id"] = pd.Series(dtype=object)
+    frame["created_at"] = pd.Series(dtype="datetime64[ns, UTC]")
+    return frame
+
+
+def _typed_history(rows, columns):
+    """Build a frame with fixed dtypes: UTC timestamps, string ids (uuid), float32 readings."""
+    frame = pd.DataFrame.from_records(rows, columns=columns)
+    frame["created_at"] = pd.to_datetime(frame["created_at"], utc=True, format="ISO8601").astype("datetime64[ns, UTC]")
+    for col in columns:
+        if col == "id":
+            frame[col] = frame[col].astype(str).astype(object)
+        elif col != "created_at":
+            frame[col] = pd.to_numeric(frame[col], errors="coerce").astype("float32")
+    return frame
+
+
+class SensorHistory:
+    """Bounded, column-typed history frame kept in sync with Supabase by deltas.
+
+    The first ``sync()`` loads the newest ``initial_rows`` rows; later calls
+    only request rows at or after the newest ``created_at`` already held
+    (rows sharing that timestamp are de-duplicated by id), page through any
+    backlog, and trim the frame to ``max_rows``. ``frame`` is replaced, not
+    mutated, so readers can keep using a reference without locking;
+    ``version`` changes whenever rows are added.
+    """
+
+    def __init__(self, device_id=None, fetch_rows=None, columns=HISTORY_COLUMNS,
+                 max_rows=HISTORY_MAX_ROWS, initial_rows=HISTORY_INITIAL_ROWS, page_size=HISTORY_PAGE_SIZE):
+        self.device_id = device_id
+        self.fetch_rows = fetch_rows or self._fetch_rows
+        self.columns = list(columns)
+        self.max_rows = max_rows
+        self.initial_rows = initial_rows
+        self.page_size = page_size
+        self.frame = _empty_history(self.columns)
+        self.version = 0
+        self.synced_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def high_water_mark(self):
+        return None if self.frame.empty else self.frame["created_at"].iloc[-1]
+
+    def _fetch_rows(self, columns, since=None, limit=HISTORY_PAGE_SIZE):
+        """Query Supabase for ``columns``, oldest first when ``since`` is set, newest first otherwise."""
+        client = get_client()
+        if client is None:
+            return []
+        query = client.table(SENSOR_TABLE).select(",".join(columns))
+        if DEVICE_COLUMN and self.device_id is not None:
+            query = query.eq(DEVICE_COLUMN, self.device_id)
+        if since is None:
+            query = query.order("created_at", desc=True)
+        else:
+            query = query.gte("created_at", since.isoformat()).order("created_at", desc=False)
+        return query.limit(limit).execute().data or []
+
+    def _fetch(self, since, limit):
+        try:
+            return self.fetch_rows(self.columns, since=since, limit=limit)
+        except Exception as exc:
+            # Older tables lack some chart columns; fall back to "*" once and
+            # keep projecting the columns that actually exist from then on.
+            rows = self.fetch_rows(["*"], since=since, limit=limit)
+            present = [col for col in self.columns if not rows or col in rows[0]]
+            if present != self.columns:
+                log_event(logger, "IOT_HISTORY_COLUMNS", error=str(exc), columns=present)
+                self.columns = present
+                self.frame = self.frame[[col for col in present if col in self.frame]]
+            return rows
+
+    def sync(self):
+        """Fetch rows newer than the high-water mark; returns how many were added."""
+        with self._lock:
+            since = self.high_water_mark
+            if since is None:
+                batches = [list(reversed(self._fetch(None, self.initial_rows)))]
+            else:
+                batches = []
+                while True:
+                    rows = self._fetch(since.to_pydatetime(), self.page_size)
+                    batches.append(rows)
+                    if len(rows) < self.page_size:
+                        break
+                    newest = parse_timestamp(rows[-1].get("created_at"))
+                    if newest is None or newest <= since:
+                        break
+                    since = pd.Timestamp(newest)
+
+            rows = [row for batch in batches for row in batch]
+            self.synced_at = time.time()
+            if not rows:
+                return 0
+
+            incoming = _typed_history(rows, self.columns)
+            key = "id" if "id" in incoming else "created_at"
+            incoming = incoming[~incoming[key].isin(self.frame[key])].drop_duplicates(subset=key)
+            if incoming.empty:
+                return 0
+
+            merged = pd.concat([self.frame, incoming], ignore_index=True) if len(self.frame) else incoming
+            self.frame = merged.sort_values("created_at", kind="stable").tail(self.max_rows).reset_index(drop=True)
+            self.version += 1
+            log_event(logger, "IOT_HISTORY_SYNC", device=self.device_id, added=len(incoming), rows=len(self.frame))
+            return len(incoming)
+
+
+_histories = {}
+_histories_lock = threading.Lock()
+
+
+def get_sensor_history(device_id=None):
+    """Return the process-wide history for a device (shared by every session)."""
+    with _histories_lock:
+        if device_id not in _histories:
+            _histories[device_id] = SensorHistory(device_id)
+        return _histories[device_id]
+
+
+def choose_bucket_seconds(start, end, max_points=HISTORY_MAX_POINTS):
+    """Smallest width from ``BUCKET_WIDTHS`` that keeps ``[start, end)`` within ``max_points`` buckets."""
+    span = max((end - start).total_seconds(), 0)
+    for width in BUCKET_WIDTHS:
+        if span / width <= max_points:
+            return width
+    return int(-(-span // max_points))
+
+
+def _empty_buckets():
+    return pd.DataFrame({"bucket_start": pd.Series(dtype="datetime64[ns, UTC]"),
+                         "readings": pd.Series(dtype="int64"),
+                         **{col: pd.Series(dtype="float32") for col in BUCKET_VALUE_COLUMNS}})
+
+
+def _bucket_frame(frame):
+    """``bucket_start``, ``readings`` and every ``BUCKET_VALUE_COLUMNS`` column (NaN where unknown), typed."""
+    frame = frame.reindex(columns=["bucket_start", "readings", *BUCKET_VALUE_COLUMNS])
+    frame["bucket_start"] = pd.to_datetime(frame["bucket_start"], utc=True, format="ISO8601").astype("datetime64[ns, UTC]")
+    frame["readings"] = frame["readings"].astype("int64")
+    for col in BUCKET_VALUE_COLUMNS:
+        frame[col] = pd.to_numeric(frame[col], errors="coerce").astype("float32")
+    return frame
+
+
+class SupabaseHistoryStore:
+    """Bucketed history computed server-side by the ``sensor_history_buckets`` RPC.
+
+    Like :class:`SensorHistory`, only ``device_id``'s rows are aggregated when
+    ``IOT_DEVICE_COLUMN`` is set; that needs the function from
+    ``sensor_history_buckets_device.sql``.
+    """
+
+    def __init__(self, client=None, device_id=None):
+        self.client = client
+        self.device_id = device_id
+
+    def bucketed(self, start, end, bucket_seconds):
+        client = self.client or get_client()
+        if client is None:
+            return _empty_buckets()
+        params = {"start_ts": start.isoformat(), "end_ts": end.isoformat(), "bucket_seconds": int(bucket_seconds),
+                  "p_device": str(self.device_id) if DEVICE_COLUMN and self.device_id is not None else None}
+        rows = client.rpc(BUCKET_RPC, params).execute().data or []
+        if not rows:
+            return _empty_buckets()
+        return _bucket_frame(pd.DataFrame.from_records(rows))
+
+
+class LocalHistoryStore:
+    """Same interface and columns as :class:`SupabaseHistoryStore`, aggregated with pandas over a frame.
+
+    ``source`` is a DataFrame with a ``created_at`` column, or a callable
+    returning one (e.g. ``lambda: get_sensor_history(device_id).frame``).
+    Sensors the frame lacks come back as NaN columns.
+    """
+
+    def __init__(self, source):
+        self.source = source
+
+    def bucketed(self, start, end, bucket_seconds):
+        frame = self.source() if callable(self.source) else self.source
+        if frame is None or frame.empty:
+            return _empty_buckets()
+        created = pd.to_datetime(frame["created_at"], utc=True)
+        mask = (created >= pd.Timestamp(start)) & (created < pd.Timestamp(end))
+        if not mask.any():
+            return _empty_buckets()
+        values = [col for col in BUCKET_VALUE_COLUMNS if col in frame]
+        window = frame.loc[mask, values].astype("float32")
+        window["bucket_start"] = created[mask].dt.floor(f"{int(bucket_seconds)}s").astype("datetime64[ns, UTC]")
+        grouped = window.groupby("bucket_start", sort=True)
+        result = grouped[values].mean()
+        result.insert(0, "readings", grouped.size().astype("int64"))
+        return _bucket_frame(result.reset_index())
+
+
+def get_history_store(device_id=None):
+    """Supabase RPC when credentials exist, else the local synced history frame."""
+    if get_client() is not None:
+        return SupabaseHistoryStore(device_id=device_id)
+    return LocalHistoryStore(lambda: get_sensor_history(device_id).frame)
+
+
+def format_age(seconds):
+    """Human-readable age, e.g. '45s', '12 min', '3 h'."""
+    if seconds is None:
+        return "unknown"
+    if seconds < 90:
+        return f"{seconds:.0f}s"
+    if seconds < 5400:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+# Process-wide instance shared by every Streamlit session.
+latest_reading_cache = LatestReadingCache()
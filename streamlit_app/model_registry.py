@@ -0,0 +1,193 @@
+"""
+Serving models from the MLflow model registry
+=============================================
+With ``MODEL_REGISTRY_ALIAS`` set (e.g. ``champion``), the crop, irrigation
+and optimization models are loaded from the version of their registered
+model that carries that alias, instead of the loose files under
+``models/``. ``MLFLOW_TRACKING_URI`` selects the tracking server / file
+store (default: the repo's ``mlflow/mlruns``).
+
+Everything fetched from the registry goes through a local cache under
+``<AGRITECH_MODEL_CACHE>/registry`` that all processes share and that
+survives restarts:
+
+- ``aliases/<name>@<alias>.json``: the version the alias resolved to, reused
+  for ``MODEL_REGISTRY_TTL`` seconds (default 300) without asking the
+  registry, so startup doesn't scan the file store. If the registry can't be
+  reached, the last resolution keeps being used;
+- ``objects/<sha256>/``: downloaded artifact directories, named after the
+  digest of their content, so identical artifacts are stored once;
+- ``refs/<name>/<version>``: which object a model version is.
+
+A registered version never changes once created, so it is downloaded at
+most once per machine. Moving the alias to another version is picked up
+by the model watcher in ``model_store`` like any other new artifact.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REGISTRY_ALIAS = os.getenv("MODEL_REGISTRY_ALIAS") or None
+TRACKING_URI = os.getenv("MLFLOW_TRACKING_URI") or Path(REPO_ROOT, "mlflow", "mlruns").as_uri()
+RESOLVE_TTL = float(os.getenv("MODEL_REGISTRY_TTL", 300))
+MODEL_CACHE_DIR = os.getenv("AGRITECH_MODEL_CACHE") or os.path.join(tempfile.gettempdir(), "agritech-model-cache")
+CACHE_DIR = os.path.join(MODEL_CACHE_DIR, "registry")
+
+# model_store name -> registered model name, as registered by the training scripts.
+# The crop page sends the 8-column frame with soil_type_encoded, i.e. the soil type variant.
+REGISTERED_MODELS = {
+    'crop_model': "CropRecommendationModelWithSoilType",
+    'irrigation_model': "SmartIrrigationClassifierModel",
+    'optimization_model': "IrrigationOptimizationModel",
+}
+
+
+def serves_from_registry(status_key):
+    return REGISTRY_ALIAS is not None and status_key in REGISTERED_MODELS
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _lookup_alias(name, alias):
+    from mlflow import MlflowClient
+
+    version = MlflowClient(tracking_uri=TRACKING_URI, registry_uri=TRACKING_URI).get_model_version_by_alias(name, alias)
+    return {"version": str(version.version), "source": version.source}
+
+
+def resolve(name, alias, ttl=None, lookup=_lookup_alias, cache_dir=None):
+    """``{"version", "source"}`` of the registered version ``name@alias`` points to."""
+    path = os.path.join(cache_dir or CACHE_DIR, "aliases", f"{name}@{alias}.json")
+    cached = None
+    try:
+        with open(path, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        pass
+    ttl = RESOLVE_TTL if ttl is None else ttl
+    if cached is not None and time.time() - cached.get("resolved_at", 0) < ttl:
+        return cached
+
+    try:
+        resolved = dict(lookup(name, alias), resolved_at=time.time())
+    except Exception:
+        if cached is None:
+            raise
+        return cached  # registry unreachable: keep serving the last known version
+    _write_json(path, resolved)
+    return resolved
+
+
+def _tree_digest(root):
+    sha = hashlib.sha256()
+    for path in sorted(p for p in Path(root).rglob("*") if p.is_file()):
+        sha.update(path.relative_to(root).as_posix().encode() + b"\0")
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _download(name, version, source, dst_path):
+    import mlflow
+
+    try:
+        mlflow.artifacts.download_artifacts(artifact_uri=f"models:/{name}/{version}", dst_path=dst_path,
+                                            tracking_uri=TRACKING_URI)
+        return
+    except Exception:
+        local = _local_logged_model(source)
+        if local is None:
+            raise
+    # File store copied from another machine: its metadata still points at the original
+    # absolute paths, but the logged model is in this store under <experiment>/models/<model_id>
+    shutil.copytree(local, dst_path, dirs_exist_ok=True)
+
+
+def _local_logged_model(source):
+    if not TRACKING_URI.startswith("file:") or not (source or "").startswith("models:/m-"):
+        return None
+    from urllib.parse import unquote, urlparse
+
+    store = Path(unquote(urlparse(TRACKING_URI).path))
+    model_id = source[len("models:/"):]
+    matches = sorted(store.glob(f"*/models/{model_id}/artifacts"))
+    return str(matches[0]) if matches else None
+
+
+def fetch(name, version, source=None, download=_download, cache_dir=None):
+    """Local directory with the artifacts of ``name`` version ``version``, downloaded once per cache."""
+    cache_dir = cache_dir or CACHE_DIR
+    ref = os.path.join(cache_dir, "refs", name, str(version))
+    try:
+        with open(ref, encoding="utf-8") as f:
+            obj = os.path.join(cache_dir, "objects", f.read().strip())
+        if os.path.isdir(obj):
+            return obj
+    except OSError:
+        pass
+
+    os.makedirs(os.path.join(cache_dir, "objects"), exist_ok=True)
+    staging = tempfile.mkdtemp(prefix="download-", dir=os.path.join(cache_dir, "objects"))
+    try:
+        download(name, version, source, staging)
+        digest = _tree_digest(staging)
+        obj = os.path.join(cache_dir, "objects", digest)
+        try:
+            os.rename(staging, obj)
+        except OSError:
+            if not os.path.isdir(obj):
+                raise
+            # Another process stored the same content first
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(ref), exist_ok=True)
+    tmp = f"{ref}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(digest)
+    os.replace(tmp, ref)
+    return obj
+
+
+def _load_flavor(path):
+    import importlib
+
+    import yaml
+
+    with open(os.path.join(path, "MLmodel"), encoding="utf-8") as f:
+        flavors = yaml.safe_load(f).get("flavors", {})
+    # The native flavor (sklearn, catboost, ...) keeps predict_proba; the pyfunc wrapper doesn't
+    flavor = next((name for name in flavors if name != "python_function"), "pyfunc")
+    return importlib.import_module(f"mlflow.{flavor}").load_model(path)
+
+
+def registered_version(status_key):
+    """Version ``status_key``'s alias currently resolves to, or None when it isn't served from the registry."""
+    if not serves_from_registry(status_key):
+        return None
+    try:
+        return resolve(REGISTERED_MODELS[status_key], REGISTRY_ALIAS)["version"]
+    except Exception:
+        return None
+
+
+def load_registered(status_key):
+    """Load ``status_key`` from the registered version its alias points to."""
+    name = REGISTERED_MODELS[status_key]
+    resolved = resolve(name, REGISTRY_ALIAS)
+    return _load_flavor(fetch(name, resolved["version"], resolved.get("source")))
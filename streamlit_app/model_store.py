@@ -0,0 +1,554 @@
+"""
+Model loading for the Streamlit pages
+=====================================
+Every model is loaded lazily, the first time a page that needs it runs, and
+kept for the life of the process so all sessions and pages share one copy.
+Nothing is loaded at import time: the IoT page never imports TensorFlow or
+unpickles the CatBoost models.
+
+Loads run on a small thread pool. A page first calls :func:`start_loading`
+for everything it needs, so independent loads (unpickling, reading the .h5,
+the IoT fetch on the script thread) overlap and the page waits for the
+slowest one instead of the sum. Each wait is capped by ``MODEL_LOAD_TIMEOUT``
+seconds (default 120); a model that is not ready by then keeps loading in
+the background and the page reports it as still loading.
+
+After loading, each model runs one warm-up inference on synthetic inputs
+with the real feature shapes (the 8-column crop frame, the irrigation and
+optimization feature vectors, a 224x224 image), so the first farmer to
+click doesn't pay for lazy initialisation. Warm-ups are logged as
+``MODEL_WARMUP`` events.
+
+The two CatBoost models are read from their native ``.cbm`` export (see
+``models/irrigation_optimization/catboost_native.py``) when it is present,
+and from the joblib pickle otherwise. With ``MODEL_REGISTRY_ALIAS`` set, those three
+models come from the MLflow registry instead (``model_registry.py``). The crop forest is flattened into
+NumPy arrays for fast single-row scoring (``compiled_forest.py``) and, with
+``AGRITECH_MODEL_CACHE`` set, memory-mapped from that shared cache directory
+(``models/crop_recommendation/shared_model.py``).
+
+``MODEL_STATUS`` maps each model to True (loaded and warmed up), False
+(failed) or None (not requested yet, or still loading). The sidebar "Model Status" is drawn
+by :func:`model_status_view` and updated as each load finishes.
+
+Set ``MODEL_PRELOAD`` to a comma-separated list of models (or ``all``) to
+start loading them when the app starts instead of on first use.
+
+Deploying a retrained model doesn't need a restart: every
+``MODEL_RELOAD_INTERVAL`` seconds (default 30, 0 disables it) the files in
+``MODEL_FILES`` of the loaded models are checked, and a changed model is
+loaded and warmed up in the background and then swapped in atomically
+(:func:`check_for_updates`).
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import joblib
+import pandas as pd
+import streamlit as st
+
+from app_logging import get_logger, log_event, timed
+from model_registry import load_registered, registered_version, serves_from_registry
+
+# Two levels up from streamlit_app/model_store.py
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    # Pickled models may reference top-level packages (e.g. `models`) during unpickling.
+    sys.path.insert(0, REPO_ROOT)
+
+from models.crop_recommendation.compiled_forest import compile_if_possible
+from models.crop_recommendation.shared_model import load_shared
+from models.irrigation_optimization.catboost_native import load_native, native_path, schema_path
+
+MODEL_LOAD_TIMEOUT = float(os.getenv("MODEL_LOAD_TIMEOUT", 120))
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", 30))
+
+logger = get_logger("models")
+
+# Global status tracker for all models
+MODEL_STATUS = {
+    'crop_model': None,
+    'irrigation_model': None,
+    'optimization_model': None,
+    'soil_model': None
+}
+# Messages from the loader threads, shown by the page that requested the model
+MODEL_ERRORS = {}
+MODEL_NOTICES = {}
+
+DEFAULT_SOIL_TYPES = ['clay', 'loamy', 'sandy', 'black', 'red']
+
+# قائمة التسميات الصحيحة التي تدرب عليها النموذج (مستخلصة من إخراجك السابق)
+# هذا الترتيب يجب أن يطابق ترتيب الفئات في مجلدات التدريب: (0: Peat, 1: Sandy, 2: Silt)
+CORRECT_SOIL_LABELS = ["Peat Soil", "Sandy Soil", "Silt Soil"]
+
+MODELS_DIR = os.path.join(REPO_ROOT, "models")
+_CROP_DIR = os.path.join(MODELS_DIR, "crop_recommendation")
+_IRRIGATION_DIR = os.path.join(MODELS_DIR, "irrigation_optimization")
+_SOIL_DIR = os.path.join(MODELS_DIR, "soil_classification")
+
+
+def _catboost_files(pkl_path):
+    return [pkl_path, native_path(pkl_path), schema_path(pkl_path)]
+
+
+# Files each model is read from (the first one is its main artifact); a change to any of them reloads it
+MODEL_FILES = {
+    'crop_model': [os.path.join(_CROP_DIR, "crop_model.pkl")],
+    'irrigation_model': _catboost_files(os.path.join(_IRRIGATION_DIR, "catboost_classifier.pkl")),
+    'optimization_model': _catboost_files(os.path.join(_IRRIGATION_DIR, "catboost_irrigation_model.pkl")),
+    'soil_model': [os.path.join(_SOIL_DIR, "my_soil_model.h5"), os.path.join(_SOIL_DIR, "saved_model.pb")],
+    'soil_type_encoder': [os.path.join(_CROP_DIR, "soil_type_encoder.pkl")],
+}
+
+
+class _ReloadFailed(Exception):
+    pass
+
+
+# Set on the loader thread while it reloads a model that is already in use
+_reloading = threading.local()
+
+
+def _fail(status_key, message):
+    """Record why a model is unavailable; a failing reload is aborted instead and the loaded version stays."""
+    if getattr(_reloading, 'active', False):
+        raise _ReloadFailed(message)
+    MODEL_ERRORS[status_key] = message
+    MODEL_STATUS[status_key] = False
+
+
+def _load_pickle(status_key, model_path, label):
+    if os.path.exists(model_path):
+        try:
+            # Reported ready by _load_model once the warm-up inference has run
+            return joblib.load(model_path)
+        except Exception as e:
+            _fail(status_key, f"Error loading {label} model from {model_path}: {type(e).__name__}: {e}")
+            return None
+    else:
+        _fail(status_key, f"❌ {label.capitalize()} model file not found at: {model_path}")
+        return None
+
+
+def _load_registered(status_key):
+    """The registered version behind ``MODEL_REGISTRY_ALIAS``, or None to fall back to the local files."""
+    try:
+        with timed(logger, "MODEL_LOAD", model=status_key, source="registry", version=registered_version(status_key)):
+            return load_registered(status_key)
+    except Exception as e:
+        MODEL_NOTICES[status_key] = (f"ℹ Registry model unavailable ({type(e).__name__}: {e}); "
+                                     f"using the local model files")
+        return None
+
+
+def _load_catboost(status_key, model_path, label):
+    if serves_from_registry(status_key):
+        model = _load_registered(status_key)
+        if model is not None:
+            return model
+    # Prefer the native .cbm export next to the pickle; it loads without unpickling
+    # and scores single rows through CatBoost's C++ path
+    if os.path.exists(native_path(model_path)) and os.path.exists(schema_path(model_path)):
+        try:
+            with timed(logger, "MODEL_LOAD", model=status_key, format="cbm"):
+                return load_native(model_path)
+        except Exception:
+            pass  # logged as a failed MODEL_LOAD; the pickle is still there
+    return _load_pickle(status_key, model_path, label)
+
+
+def _load_crop_model():
+    model_path = MODEL_FILES['crop_model'][0]
+    if serves_from_registry('crop_model'):
+        model = _load_registered('crop_model')
+        if model is not None:
+            return compile_if_possible(model)
+    if os.getenv("AGRITECH_MODEL_CACHE") and os.path.exists(model_path):
+        # Memory-mapped from the shared cache, so worker processes share the model's arrays
+        try:
+            with timed(logger, "MODEL_LOAD", model='crop_model', format="mmap"):
+                return load_shared(model_path, convert=compile_if_possible)
+        except Exception:
+            pass  # logged as a failed MODEL_LOAD; fall back to a private copy
+    # Scored through the flattened forest: same outputs, without sklearn's per-call overhead
+    return compile_if_possible(_load_pickle('crop_model', model_path, "crop"))
+
+
+def _load_irrigation_model():
+    return _load_catboost('irrigation_model', MODEL_FILES['irrigation_model'][0], "irrigation")
+
+
+def _load_optimization_model():
+    return _load_catboost('optimization_model', MODEL_FILES['optimization_model'][0], "optimization")
+
+
+def _load_soil_model():
+    """Load TensorFlow soil type classification model (supports .h5 and SavedModel)"""
+    # Try loading .h5 file first (your model)
+    h5_path = MODEL_FILES['soil_model'][0]
+    savedmodel_path = _SOIL_DIR
+    errors = []
+
+    # Try .h5 model first
+    if os.path.exists(h5_path):
+        try:
+            import tensorflow as tf
+
+            # Use compile=False to avoid Keras 3 compatibility issues with custom layers
+            model = tf.keras.models.load_model(h5_path, compile=False)
+            return model, CORRECT_SOIL_LABELS
+        except Exception as e:
+            errors.append(f"Error loading H5 model from {h5_path}: {type(e).__name__}: {e}")
+
+    # Fallback to SavedModel
+    elif os.path.exists(savedmodel_path):
+        try:
+            from tensorflow.keras.layers import TFSMLayer
+            model = TFSMLayer(savedmodel_path, call_endpoint='serving_default')
+            MODEL_NOTICES['soil_model'] = f"ℹ Using SavedModel from: {savedmodel_path}"
+            return model, CORRECT_SOIL_LABELS
+        except Exception as e:
+            errors.append(f"Error loading SavedModel from {savedmodel_path}: {type(e).__name__}: {e}")
+
+    # No model found
+    errors.append(f"⚠ Soil model not found. Tried:\n- {h5_path}\n- {savedmodel_path}")
+    _fail('soil_model', "\n\n".join(errors))
+    return None, None
+
+
+def _load_soil_type_encoder():
+    """Soil type encoder for crop recommendation, or None (then DEFAULT_SOIL_TYPES are offered)."""
+    encoder_path = MODEL_FILES['soil_type_encoder'][0]
+    try:
+        if os.path.exists(encoder_path):
+            return joblib.load(encoder_path)
+    except Exception:
+        # Keep default soil types if encoder loading fails
+        pass
+    return None
+
+
+# Synthetic inputs with the exact shapes the pages use, so the first real
+# request doesn't pay for lazy initialisation, graph tracing or allocator growth.
+_WARMUP_READING = dict(soil_moisture=35.0, temperature=23.0, humidity=82.0, ph=6.91,
+                       n=101, p=33, k=33, rainfall=142.86)
+
+
+def _warm_up_crop_model(model):
+    # The 8-column frame the crop page builds
+    feature_names = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall', 'soil_type_encoded']
+    r = _WARMUP_READING
+    input_data = pd.DataFrame([[r['n'], r['p'], r['k'], r['temperature'], r['humidity'], r['ph'],
+                                r['rainfall'], 0]], columns=feature_names)
+    model.predict(input_data)
+    if hasattr(model, 'predict_proba'):
+        model.predict_proba(input_data)
+
+
+def _warm_up_irrigation_model(model):
+    from predictions import create_irrigation_features
+
+    features = create_irrigation_features(**_WARMUP_READING)
+    model.predict(features)
+    if hasattr(model, 'predict_proba'):
+        model.predict_proba(features)
+
+
+def _warm_up_optimization_model(model):
+    from predictions import create_optimization_features
+
+    model.predict(create_optimization_features(**_WARMUP_READING))
+
+
+def _warm_up_soil_model(loaded):
+    from PIL import Image
+
+    from predictions import predict_soil_type
+
+    # Goes through the page's preprocessing: resize to the model's input size, scale, predict
+    image = Image.new('RGB', (224, 224), (128, 96, 64))
+    error = predict_soil_type(image, *loaded)[2]
+    if error:
+        raise RuntimeError(error)
+
+
+# name -> (loader, label shown while waiting, value while unavailable, warm-up)
+_LOADERS = {
+    'crop_model': (_load_crop_model, "crop model", None, _warm_up_crop_model),
+    'irrigation_model': (_load_irrigation_model, "irrigation model", None, _warm_up_irrigation_model),
+    'optimization_model': (_load_optimization_model, "optimization model", None, _warm_up_optimization_model),
+    'soil_model': (_load_soil_model, "soil classifier", (None, None), _warm_up_soil_model),
+    'soil_type_encoder': (_load_soil_type_encoder, "soil type encoder", None, None),
+}
+
+_executor = ThreadPoolExecutor(max_workers=len(_LOADERS), thread_name_prefix="model-loader")
+_futures = {}
+_futures_lock = threading.Lock()
+# name -> artifact version the current model was loaded from / seen at the last poll
+_loaded_versions = {}
+_seen_versions = {}
+# name -> number of times a new version was swapped in; part of memoized predictions' keys
+_generations = {}
+_reloads = {}
+_watcher = None
+# Sidebar placeholder of the script run on this thread, redrawn while the page waits for loads
+_status_view = threading.local()
+
+
+def start_loading(*names):
+    """Submit the loaders for ``names`` (once per process) without waiting for them."""
+    with _futures_lock:
+        _start_watcher()
+        for name in names:
+            if name not in _futures:
+                _futures[name] = _executor.submit(_load_model, name)
+        return {name: _futures[name] for name in names}
+
+
+def _load_model(name):
+    """Load ``name`` and run its warm-up inference; it is only reported ready after both."""
+    loader, _, _, warm_up = _LOADERS[name]
+    # Taken before reading, so a file replaced during the load is picked up by the next poll
+    _loaded_versions[name] = _artifact_version(name)
+    result = loader()
+    if name not in MODEL_STATUS or MODEL_STATUS[name] is False:
+        return result
+    if warm_up is not None:
+        try:
+            with timed(logger, "MODEL_WARMUP", model=name):
+                warm_up(result)
+        except Exception as e:
+            # Still usable: the first real request just pays the initialisation cost
+            MODEL_NOTICES[name] = f"⚠ Warm-up inference failed for {name}: {type(e).__name__}: {e}"
+    MODEL_STATUS[name] = True
+    return result
+
+
+def _artifact_version(name):
+    version = []
+    for path in MODEL_FILES.get(name, ()):
+        try:
+            stat = os.stat(path)
+            version.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            version.append((path, None, None))
+    if serves_from_registry(name):
+        # Moving the alias to another registered version counts as a new artifact
+        version.append(("registry", registered_version(name)))
+    return tuple(version)
+
+
+def model_version(name):
+    """How many times a new version of ``name`` has been swapped in since the app started."""
+    return _generations.get(name, 0)
+
+
+def _reload_model(name):
+    """Load and warm up the new version of ``name`` next to the current one, then swap it in.
+
+    Pages that already fetched the old model keep using it until their run
+    finishes; it is freed once nothing references it. If the new version
+    fails to load or warm up, the old one stays until the files change again.
+    """
+    loader, _, _, warm_up = _LOADERS[name]
+    version = _artifact_version(name)
+    _reloading.active = True
+    try:
+        with timed(logger, "MODEL_RELOAD", model=name):
+            result = loader()
+            if result is None or (isinstance(result, tuple) and result[0] is None):
+                raise _ReloadFailed(f"No {name} could be loaded")
+            if warm_up is not None:
+                warm_up(result)
+    except Exception:
+        _loaded_versions[name] = version  # logged by timed(); not retried until the next change
+        return None
+    finally:
+        _reloading.active = False
+
+    swapped = Future()
+    swapped.set_result(result)
+    with _futures_lock:
+        _futures[name] = swapped
+        _loaded_versions[name] = version
+        _generations[name] = _generations.get(name, 0) + 1
+    MODEL_ERRORS.pop(name, None)
+    if name in MODEL_STATUS:
+        MODEL_STATUS[name] = True
+    return result
+
+
+def check_for_updates():
+    """Start background reloads for loaded models whose files changed; returns their names.
+
+    A change is only acted on once the files look the same on two polls in a
+    row, so a model that is still being copied into place isn't read half-written.
+    """
+    with _futures_lock:
+        loaded = [name for name, future in _futures.items() if future.done()]
+    started = []
+    for name in loaded:
+        version = _artifact_version(name)
+        settled = version == _seen_versions.get(name)
+        _seen_versions[name] = version
+        if not settled or version == _loaded_versions.get(name):
+            continue
+        pending = _reloads.get(name)
+        if pending is not None and not pending.done():
+            continue
+        _reloads[name] = _executor.submit(_reload_model, name)
+        started.append(name)
+    return started
+
+
+def _watch_models():
+    while True:
+        time.sleep(MODEL_RELOAD_INTERVAL)
+        try:
+            check_for_updates()
+        except Exception as e:
+            log_event(logger, "MODEL_WATCH", level=logging.ERROR, error=f"{type(e).__name__}: {e}")
+
+
+def _start_watcher():
+    global _watcher
+    if _watcher is None and MODEL_RELOAD_INTERVAL > 0:
+        _watcher = threading.Thread(target=_watch_models, name="model-watcher", daemon=True)
+        _watcher.start()
+
+
+def loading_models():
+    """Names of the models whose load was started but has not finished yet."""
+    with _futures_lock:
+        return [name for name, future in _futures.items() if not future.done()]
+
+
+def _draw_model_status(force=False):
+    placeholder = getattr(_status_view, 'placeholder', None)
+    if placeholder is None:
+        return
+    loading = loading_models()
+    snapshot = (tuple(MODEL_STATUS.items()), tuple(loading))
+    if not force and snapshot == getattr(_status_view, 'snapshot', None):
+        return
+    _status_view.snapshot = snapshot
+
+    with placeholder.container():
+        for model_name, status in MODEL_STATUS.items():
+            if status is None:
+                status_icon = "⏳" if model_name in loading else "⚪"
+            else:
+                status_icon = "✅" if status else "❌"
+            display_name = model_name.replace('_', ' ').title()
+            st.markdown(f"""
+            <div style="color: white; padding: 0.5rem 0; display: flex; align-items: center; gap: 0.5rem;">
+                <span style="font-size: 1.2rem;">{status_icon}</span>
+                <span style="font-size: 0.9rem;">{display_name}</span>
+            </div>
+            """, unsafe_allow_html=True)
+
+
+@contextmanager
+def model_status_view(placeholder):
+    """Draw "Model Status" into ``placeholder`` and keep it current while the page waits for models.
+
+    Loaded, failed, loading and not-yet-requested models show as ✅, ❌, ⏳ and ⚪.
+    """
+    _status_view.placeholder = placeholder
+    _draw_model_status(force=True)
+    try:
+        yield
+    finally:
+        _draw_model_status()
+        _status_view.placeholder = None
+
+
+def _get(name, timeout=None):
+    """Wait up to ``timeout`` seconds for a model; report its problems on the calling page."""
+    _, label, unavailable, _ = _LOADERS[name]
+    future = start_loading(name)[name]
+    deadline = time.monotonic() + (MODEL_LOAD_TIMEOUT if timeout is None else timeout)
+    try:
+        if future.done():
+            result = future.result()
+        else:
+            with st.spinner(f"Loading {label}..."):
+                while True:
+                    try:
+                        result = future.result(timeout=max(0.0, min(0.5, deadline - time.monotonic())))
+                        break
+                    except FutureTimeoutError:
+                        # Other loads may have finished meanwhile: show partial readiness
+                        _draw_model_status()
+                        if time.monotonic() >= deadline:
+                            raise
+    except FutureTimeoutError:
+        st.warning(f"⏳ The {label} is still loading; it will be used as soon as it is ready.")
+        return unavailable
+    except Exception as e:
+        st.error(f"Error loading {label}: {type(e).__name__}: {e}")
+        return unavailable
+    finally:
+        _draw_model_status()
+
+    if name in MODEL_ERRORS:
+        st.error(MODEL_ERRORS[name])
+    if name in MODEL_NOTICES:
+        st.info(MODEL_NOTICES[name])
+    return result
+
+
+def load_crop_model():
+    return _get('crop_model')
+
+
+def load_irrigation_model():
+    return _get('irrigation_model')
+
+
+def load_optimization_model():
+    return _get('optimization_model')
+
+
+def load_soil_model():
+    """``(model, labels)``, or ``(None, None)`` if the classifier is unavailable."""
+    return _get('soil_model')
+
+
+def load_soil_type_encoder():
+    return _get('soil_type_encoder')
+
+
+def available_soil_types():
+    encoder = load_soil_type_encoder()
+    return list(encoder.classes_) if encoder is not None else list(DEFAULT_SOIL_TYPES)
+
+
+def preload_from_env():
+    """Start loading the models listed in ``MODEL_PRELOAD`` (``all`` for every model)."""
+    requested = [name.strip() for name in os.getenv("MODEL_PRELOAD", "").split(",") if name.strip()]
+    if requested == ["all"]:
+        requested = list(_LOADERS)
+    start_loading(*[name for name in requested if name in _LOADERS])
+
+
+def check_system_status(required):
+    """Show the status of the models a page needs; True only if all of them loaded."""
+    pending = [model for model in required if MODEL_STATUS.get(model) is None]
+    failed_models = [model for model in required if MODEL_STATUS.get(model) is False]
+    if failed_models:
+        st.error(f"🚨 **System Status: FAILED** - Models not loaded: {', '.join(failed_models)}")
+        st.warning("⚠️ **Fail-Safe Mode**: All predictions will return 0/False due to missing models")
+        return False
+    if pending:
+        st.info(f"⏳ **System Status: LOADING** - Waiting for: {', '.join(pending)}")
+        return False
+    st.success("✅ **System Status: OPERATIONAL** - All models loaded successfully")
+    return True
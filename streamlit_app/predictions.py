@@ -0,0 +1,210 @@
+"""
+Prediction helpers shared by the Streamlit pages
+================================================
+Feature engineering for the irrigation/optimization CatBoost models, the
+soil image classifier's preprocessing and the dataset-based crop fallback.
+Only numpy is imported at module level; TensorFlow and PIL are imported
+where they are needed.
+"""
+
+import os
+
+import numpy as np
+
+# Two levels up from streamlit_app/predictions.py
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _soil_input_size(soil_model):
+    """``(height, width)`` the soil model expects; SavedModel layers don't say, so 224x224."""
+    shape = getattr(soil_model, 'input_shape', None)
+    if shape and len(shape) == 4 and shape[1] and shape[2]:
+        return int(shape[1]), int(shape[2])
+    return 224, 224
+
+
+# Soil classification function
+def predict_soil_type(image, soil_model, soil_labels):
+    """Predict soil type from uploaded image using TensorFlow model"""
+    if soil_model is None or soil_labels is None:
+        return None, None, "Model not loaded", None
+    
+    try:
+        # Enhanced preprocessing for better accuracy
+        # 1. Convert to RGB if needed
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        
+        # 2. Resize to model input size (224x224 unless the model was trained smaller)
+        from PIL import Image
+        height, width = _soil_input_size(soil_model)
+        img = image.resize((width, height), Image.Resampling.LANCZOS)
+        
+        # 3. Convert to array
+        img_array = np.array(img, dtype=np.float32)
+        
+        # 4. Normalize to [0, 1] range (standard for most models)
+        img_array = img_array / 255.0
+        
+        # 5. Add batch dimension
+        img_array = np.expand_dims(img_array, axis=0)
+        
+        # 6. Predict using the model
+        if hasattr(soil_model, 'predict'):
+            # H5 model - use standard predict
+            predictions = soil_model.predict(img_array, verbose=0)
+            all_probs = predictions[0]
+        else:
+            # TFSMLayer - returns dictionary
+            import tensorflow as tf
+            img_tensor = tf.convert_to_tensor(img_array, dtype=tf.float32)
+            output = soil_model(img_tensor)
+            
+            # Extract predictions from output dictionary
+            predictions = None
+            for key in output.keys():
+                predictions = output[key].numpy()
+                break
+            
+            if predictions is None:
+                return None, None, "Could not extract predictions from model output", None
+            
+            all_probs = predictions[0]
+        
+        # Apply softmax to normalize probabilities if they're not already normalized
+        if not np.isclose(np.sum(all_probs), 1.0, rtol=0.1):
+            exp_probs = np.exp(all_probs - np.max(all_probs))  # Numerical stability
+            all_probs = exp_probs / np.sum(exp_probs)
+        
+        # Get predicted class and confidence
+        predicted_class = np.argmax(all_probs)
+        confidence = float(all_probs[predicted_class])
+        
+        # --- هذا السطر يستخدم القائمة المصححة ---
+        soil_type = soil_labels[predicted_class]
+        
+        return soil_type, confidence, None, all_probs
+    except Exception as e:
+        return None, None, f"Prediction error: {e}", None
+
+# Feature engineering functions
+def create_irrigation_features(soil_moisture, temperature, humidity, ph, n, p, k, rainfall=0):
+    """Create all required features for irrigation model"""
+    import numpy as np
+    
+    # Basic features
+    soil_humidity = humidity * 0.8  # Approximate soil humidity
+    air_temperature = temperature
+    
+    # Derived features
+    relative_soil_saturation = min(soil_moisture / 100.0, 1.0)
+    temp_diff = abs(temperature - 25)  # Difference from optimal temp
+    evapotranspiration = max(0, (temperature - 10) * 0.1 + (100 - humidity) * 0.05)
+    rain_vs_soil = rainfall / max(soil_moisture, 1)
+    ph_encoded = 1 if ph > 7 else 0  # Alkaline vs acidic
+    
+    # NPK ratios
+    np_ratio = n / max(p, 1)
+    nk_ratio = n / max(k, 1)
+    npk_balance = (n + p + k) / 3
+    
+    # Additional derived features
+    crop_encoded = 1  # Default crop type
+    rain_3days = rainfall * 3  # Assume same rainfall for 3 days
+    moisture_temp_ratio = soil_moisture / max(temperature, 1)
+    evapo_ratio = evapotranspiration / max(rainfall, 0.1)
+    rain_effect = min(rainfall / 10, 1.0)
+    moisture_change_rate = 0.1  # Default change rate
+    temp_scaled = temperature / 40  # Scale temperature
+    wind_ratio = 0.5  # Default wind effect
+    
+    return np.array([[
+        soil_moisture, temperature, soil_humidity, relative_soil_saturation,
+        temp_diff, evapotranspiration, rain_vs_soil, rainfall, ph_encoded,
+        n, p, k, np_ratio, nk_ratio, crop_encoded, rain_3days,
+        moisture_temp_ratio, evapo_ratio, rain_effect, moisture_change_rate,
+        temp_scaled, npk_balance, wind_ratio
+    ]])
+
+def create_optimization_features(soil_moisture, temperature, humidity, ph, n, p, k, rainfall=0):
+    """Create all required features for optimization model"""
+    import numpy as np
+    
+    # Basic environmental features
+    soil_humidity = humidity * 0.8
+    air_temperature = temperature
+    wind_speed = 10  # Default wind speed
+    wind_gust = wind_speed * 1.5
+    pressure = 101.325  # Standard atmospheric pressure
+    
+    # Derived features
+    soil_moisture_diff = 0.1  # Default change
+    relative_soil_saturation = min(soil_moisture / 100.0, 1.0)
+    temp_diff = abs(temperature - 25)
+    wind_effect = wind_speed * 0.1
+    evapotranspiration = max(0, (temperature - 10) * 0.1 + (100 - humidity) * 0.05)
+    rain_3days = rainfall * 3
+    rain_vs_soil = rainfall / max(soil_moisture, 1)
+    
+    # NPK features
+    np_ratio = n / max(p, 1)
+    nk_ratio = n / max(k, 1)
+    npk_balance = (n + p + k) / 3
+    
+    # Encoded features
+    ph_encoded = 1 if ph > 7 else 0
+    crop_encoded = 1
+    
+    # Additional ratios
+    moisture_temp_ratio = soil_moisture / max(temperature, 1)
+    evapo_ratio = evapotranspiration / max(rainfall, 0.1)
+    rain_effect = min(rainfall / 10, 1.0)
+    moisture_change_rate = 0.1
+    temp_scaled = temperature / 40
+    wind_ratio = wind_speed / 50
+    
+    return np.array([[
+        soil_moisture, temperature, soil_humidity, air_temperature,
+        wind_speed, humidity, wind_gust, pressure, ph, rainfall,
+        n, p, k, soil_moisture_diff, relative_soil_saturation,
+        temp_diff, wind_effect, evapotranspiration, rain_3days,
+        rain_vs_soil, np_ratio, nk_ratio, ph_encoded, crop_encoded,
+        moisture_temp_ratio, evapo_ratio, rain_effect, moisture_change_rate,
+        temp_scaled, npk_balance, wind_ratio
+    ]])
+
+
+def recommend_from_dataset(N, P, K, temperature, humidity, ph, rainfall, k=5):
+    """Lightweight nearest-neighbour recommender that uses data/crop_data.csv.
+
+    Returns (label, confidence) where confidence is fraction of the k nearest neighbors
+    that agree with the predicted label.
+    """
+    import pandas as _pd
+    import numpy as _np
+    import os as _os
+
+    cache_name = '_crop_dataset_cache'
+    if cache_name not in globals():
+        data_path = _os.path.join(REPO_ROOT, 'data', 'crop_data.csv')
+        if not _os.path.exists(data_path):
+            raise FileNotFoundError(f"Dataset not found: {data_path}")
+        df = _pd.read_csv(data_path)
+        feats = df[['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']].values.astype(float)
+        labels = df['label'].astype(str).values
+        mean = feats.mean(axis=0)
+        std = feats.std(axis=0)
+        std[std == 0] = 1.0
+        globals()[cache_name] = {'feats': feats, 'labels': labels, 'mean': mean, 'std': std}
+
+    cache = globals()[cache_name]
+    feat = _np.array([N, P, K, temperature, humidity, ph, rainfall], dtype=float)
+    norm = (feat - cache['mean']) / cache['std']
+    feats_norm = (cache['feats'] - cache['mean']) / cache['std']
+    dists = _np.linalg.norm(feats_norm - norm, axis=1)
+    idx = _np.argsort(dists)[:k]
+    top_labels = cache['labels'][idx]
+    uniques, counts = _np.unique(top_labels, return_counts=True)
+    mode = uniques[counts.argmax()]
+    conf = float(counts.max()) / float(k)
+    return str(mode), conf
@@ -0,0 +1,258 @@
+"""
+Response cache for the Gemini assistant
+=======================================
+Farmers ask the same handful of questions with near-identical sensor
+context. Answers are cached under a normalized prompt plus the context
+values rounded into buckets, so "When should I irrigate rice?" at 31.2°C
+and "when should i irrigate rice" at 30.8°C hit the same entry.
+
+Optionally (``GEMINI_SEMANTIC_CACHE=1``), a miss on the exact key falls back
+to a similarity lookup among entries with the same context bucket, using
+local CPU text embeddings. By default these are hashed character n-gram
+vectors (no extra dependencies); if ``sentence-transformers`` is installed
+and ``GEMINI_CACHE_EMBEDDING_MODEL`` names a model, that is used instead.
+Embeddings score "fertilizer for maize" and "fertilizer for rice", or "50 kg"
+and "150 kg", almost as close as two phrasings of one question, so a similar
+entry is only served if it also has the same content words as the query
+(everything but ``STOPWORDS``; crop names, numbers and negations included),
+up to one-letter typos.
+
+Environment variables:
+    GEMINI_CACHE_TTL             Seconds an answer stays valid (default: 3600)
+    GEMINI_CACHE_MAX_ENTRIES     LRU capacity (default: 512)
+    GEMINI_SEMANTIC_CACHE        "1" to enable the similarity lookup
+    GEMINI_CACHE_SIMILARITY      Cosine threshold for a hit (default: 0.9)
+    GEMINI_CACHE_EMBEDDING_MODEL Optional sentence-transformers model name
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+# Width of the buckets context values are rounded into before keying.
+CONTEXT_BUCKETS = {
+    'N': 10, 'P': 10, 'K': 10,
+    'temperature': 2.0,
+    'humidity': 5.0,
+    'ph': 0.5,
+    'rainfall': 25.0,
+    'soil_moisture': 5.0,
+    'wind_speed': 5.0,
+    'pressure': 2.0,
+}
+
+# What the client returns when Gemini answered with no text; never cached, so a
+# transient empty answer isn't replayed for the whole TTL.
+NO_RESPONSE_TEXT = "No response returned from Gemini."
+
+# Words that don't change what is being asked; every other word, e.g. "not",
+# "when" or "after", has to match for a similar entry to be served.
+STOPWORDS = frozenset(
+    "a an the i me my we our us you your it its this that these those is are am be "
+    "do does did should can could would will shall to for of in on at with and please".split()
+)
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt):
+    """Lower-case, strip punctuation and collapse whitespace."""
+    text = unicodedata.normalize("NFKC", prompt or "").lower()
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def bucket_context(values, buckets=None):
+    """Round numeric context values into buckets; keep other values as-is."""
+    buckets = CONTEXT_BUCKETS if buckets is None else buckets
+    bucketed = []
+    for key in sorted(values or {}):
+        value = values[key]
+        width = buckets.get(key)
+        if width and isinstance(value, (int, float)):
+            value = int(np.floor(float(value) / width))
+        elif isinstance(value, str):
+            value = value.strip().lower()
+        bucketed.append((key, value))
+    return tuple(bucketed)
+
+
+def content_words(normalized):
+    """The words of a normalized prompt that are not ``STOPWORDS``."""
+    return frozenset(word for word in normalized.split() if word not in STOPWORDS)
+
+
+def _one_edit_apart(a, b):
+    """True if one insertion, deletion, substitution or swap of adjacent letters turns ``a`` into ``b``."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+    return a[i + 1:] == b[i + 1:] or (a[i:i + 2] == b[i:i + 2][::-1] and a[i + 2:] == b[i + 2:])
+
+
+def same_content(words, other):
+    """
+    True if each content word of either set is in the other, or is a typo of one there.
+
+    Only words of at least five letters without digits may differ by a typo,
+    so "maize"/"maise" match but "rice"/"ride", "increase"/"decrease" and
+    "50"/"150" don't.
+    """
+    def covered(word, candidates):
+        if len(word) < 5 or any(ch.isdigit() for ch in word):
+            return False
+        return any(len(c) >= 5 and _one_edit_apart(word, c) for c in candidates)
+
+    return (all(covered(word, other - words) for word in words - other)
+            and all(covered(word, words - other) for word in other - words))
+
+
+class HashingEmbedder:
+    """Dependency-free text embedding: hashed word + character n-gram counts.
+
+    Cheap enough to run on every query on CPU and good at catching
+    rephrasings, typos and word-order changes of the same question.
+    """
+
+    def __init__(self, dim=1024, ngram_range=(3, 5)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def _features(self, text):
+        words = text.split()
+        yield from (f"w:{word}" for word in words)
+        padded = f" {text} "
+        for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+            for i in range(len(padded) - n + 1):
+                yield padded[i:i + n]
+
+    def __call__(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            h = int.from_bytes(digest, "little")
+            vector[h % self.dim] += 1.0 if (h >> 63) == 0 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+def _sentence_transformer_embedder(model_name):
+    """Optional sentence-transformers backend (returns None if unavailable)."""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        return None
+    model = SentenceTransformer(model_name, device="cpu")
+
+    def embed(text):
+        return np.asarray(model.encode(text, normalize_embeddings=True), dtype=np.float32)
+    return embed
+
+
+class ResponseCache:
+    """Thread-safe TTL + LRU cache of assistant answers."""
+
+    def __init__(self, max_entries=512, ttl=3600.0, semantic=False,
+                 similarity_threshold=0.9, embedder=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.semantic = semantic
+        self.similarity_threshold = similarity_threshold
+        self.embedder = embedder or (HashingEmbedder() if semantic else None)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    @classmethod
+    def from_env(cls):
+        semantic = os.getenv("GEMINI_SEMANTIC_CACHE", "0").lower() in ("1", "true", "yes")
+        embedder = None
+        model_name = os.getenv("GEMINI_CACHE_EMBEDDING_MODEL")
+        if semantic and model_name:
+            embedder = _sentence_transformer_embedder(model_name)
+        return cls(
+            max_entries=int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", 512)),
+            ttl=float(os.getenv("GEMINI_CACHE_TTL", 3600)),
+            semantic=semantic,
+            similarity_threshold=float(os.getenv("GEMINI_CACHE_SIMILARITY", 0.9)),
+            embedder=embedder,
+        )
+
+    def _expired(self, entry, now):
+        return now - entry["stored_at"] > self.ttl
+
+    def get(self, prompt, context_values=None):
+        """Return ``(result, match)`` on a hit, where match is "exact" or "similar"; else None."""
+        normalized = normalize_prompt(prompt)
+        bucket = bucket_context(context_values)
+        key = (normalized, bucket)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry["result"], "exact"
+
+        if self.semantic and normalized:
+            query = self.embedder(normalized)
+            words = content_words(normalized)
+            with self._lock:
+                best_key, best_score = None, self.similarity_threshold
+                for entry_key, entry in self._entries.items():
+                    if entry_key[1] != bucket or entry["vector"] is None or self._expired(entry, now):
+                        continue
+                    score = float(np.dot(query, entry["vector"]))
+                    if score >= best_score and same_content(words, content_words(entry_key[0])):
+                        best_key, best_score = entry_key, score
+                if best_key is not None:
+                    self._entries.move_to_end(best_key)
+                    self.hits += 1
+                    return self._entries[best_key]["result"], "similar"
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, prompt, context_values, result):
+        normalized = normalize_prompt(prompt)
+        if not normalized:
+            return
+        if isinstance(result, dict) and result.get("text") in ("", NO_RESPONSE_TEXT):
+            return
+        key = (normalized, bucket_context(context_values))
+        vector = self.embedder(normalized) if self.semantic else None
+        with self._lock:
+            self._entries[key] = {"result": result, "vector": vector, "stored_at": time.time()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Process-wide instance shared by every Streamlit session.
+response_cache = ResponseCache.from_env()
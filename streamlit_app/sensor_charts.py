@@ -0,0 +1,154 @@
+"""
+Sensor charts for the IoT panel
+===============================
+All sensors are drawn into one figure of stacked, shared-x subplots using
+WebGL traces (``Scattergl``). Each series is downsampled server-side with
+Largest-Triangle-Three-Buckets (LTTB) to about one point per horizontal
+pixel, so the payload sent to the browser and its render time stay constant
+however long the history window grows.
+
+Built figures are cached by data version: reruns that did not add rows
+reuse the figure instead of downsampling and rebuilding it, and the IoT
+panel hands it straight to ``st.plotly_chart`` (the plotly.js bundled with
+Streamlit, the app's theme and the container width).
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+# Roughly the plot width in pixels at the dashboard's wide layout.
+DEFAULT_MAX_POINTS = 800
+SUBPLOT_HEIGHT = 190
+FIGURE_CACHE_SIZE = 8
+
+# (column, title, axis label, colour, filled)
+SENSOR_SERIES = [
+    ("temperature", "🌡️ Temperature", "°C", "#FF6B6B", False),
+    ("humidity", "💧 Humidity", "%", "#4ECDC4", False),
+    ("soil_moisture", "🌱 Soil Moisture", "%", "#95E1D3", False),
+    ("water_level", "💦 Water Level", "Level", "#3742FA", False),
+    ("wind_speed", "🌬️ Wind Speed", "km/h", "#FFA502", False),
+    ("rainfall", "🌧️ Rainfall", "mm", "#5F27CD", True),
+]
+
+
+def lttb(x, y, threshold):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps.
+
+    ``x`` must be increasing. The first and last points are always kept and
+    one point is picked from each of ``threshold - 2`` equal-count buckets:
+    the one forming the largest triangle with the previously kept point and
+    the average of the next bucket.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_start = end if i + 2 < len(edges) else n - 1
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        bx, by = x[start:end], y[start:end]
+        areas = np.abs((x[a] - avg_x) * (by - y[a]) - (x[a] - bx) * (avg_y - y[a]))
+        a = start + int(np.argmax(areas))
+        kept[i + 1] = a
+    return kept
+
+
+def downsample(times, values, max_points):
+    """Drop missing values and LTTB-downsample one series; returns ``(times, values)``."""
+    values = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+    times = pd.DatetimeIndex(pd.to_datetime(times, utc=True))
+    valid = ~np.isnan(values)
+    times, values = times[valid], values[valid]
+    if len(values) <= max_points:
+        return times, values
+    idx = lttb(times.asi8, values, max_points)
+    return times[idx], values[idx]
+
+
+def build_sensor_figure(df, max_points=DEFAULT_MAX_POINTS):
+    """One shared-x figure with a WebGL subplot per sensor present in ``df``."""
+    series = [s for s in SENSOR_SERIES if s[0] in df.columns and df[s[0]].notna().any()]
+    if not series:
+        return None
+
+    df = df.sort_values("created_at")
+    fig = make_subplots(rows=len(series), cols=1, shared_xaxes=True, vertical_spacing=0.04,
+                        subplot_titles=[title for _, title, _, _, _ in series])
+    for row, (column, title, unit, color, filled) in enumerate(series, start=1):
+        times, values = downsample(df["created_at"], df[column], max_points)
+        fig.add_trace(
+            go.Scattergl(
+                x=times, y=values, name=title, mode="lines",
+                line=dict(color=color, width=2, shape="hv" if filled else "linear"),
+                fill="tozeroy" if filled else None,
+                hovertemplate=f"%{{y:.2f}} {unit}<extra>{title}</extra>",
+            ),
+            row=row, col=1,
+        )
+        fig.update_yaxes(title_text=unit, row=row, col=1)
+
+    fig.update_layout(
+        height=SUBPLOT_HEIGHT * len(series),
+        hovermode="x unified",
+        showlegend=False,
+        margin=dict(l=40, r=20, t=40, b=30),
+    )
+    return fig
+
+
+class _FigureCache:
+    """Small LRU of built figures keyed by ``(version, max_points)``."""
+
+    def __init__(self, size=FIGURE_CACHE_SIZE):
+        self.size = size
+        self._lock = threading.Lock()
+        self._figures = OrderedDict()
+
+    def get_or_build(self, df, version, max_points):
+        key = (version, max_points)
+        with self._lock:
+            if key in self._figures:
+                self._figures.move_to_end(key)
+                return self._figures[key]
+        fig = build_sensor_figure(df, max_points)
+        with self._lock:
+            self._figures[key] = fig
+            while len(self._figures) > self.size:
+                self._figures.popitem(last=False)
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+
+_figure_cache = _FigureCache()
+
+
+def data_version(df):
+    """Cheap fingerprint for frames without an explicit version counter."""
+    if df.empty:
+        return ("empty",)
+    created = df["created_at"]
+    return (len(df), str(created.iloc[0]), str(created.iloc[-1]))
+
+
+def sensor_figure(df, version=None, max_points=DEFAULT_MAX_POINTS):
+    """Cached :func:`build_sensor_figure`; pass a version that changes whenever rows change."""
+    return _figure_cache.get_or_build(df, data_version(df) if version is None else version, max_points)
@@ -0,0 +1,67 @@
+import json
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+import app_logging
+from app_logging import SamplingFilter, configure_logging, log_event, request_context, shutdown_logging, timed
+
+
+def _read_records(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_json_lines_carry_request_id_and_timing(tmp_path):
+    log_path = tmp_path / "app.jsonl"
+    shutdown_logging()
+    configure_logging(log_path=str(log_path), sample_rates={})
+    logger = logging.getLogger("agritech.test")
+    try:
+        with request_context("req-1"):
+            log_event(logger, "CROP_INPUTS", inputs={"N": 90})
+            with timed(logger, "CROP_OUTPUT") as result:
+                result["pred"] = "rice"
+        log_event(logger, "OUTSIDE")
+    finally:
+        shutdown_logging()
+
+    records = _read_records(log_path)
+    assert [r["event"] for r in records] == ["CROP_INPUTS", "CROP_OUTPUT", "OUTSIDE"]
+    assert records[0]["request_id"] == "req-1"
+    assert records[0]["inputs"] == {"N": 90}
+    assert records[1]["pred"] == "rice"
+    assert records[1]["duration_ms"] >= 0
+    assert records[2]["request_id"] is None
+
+
+def test_size_based_rotation(tmp_path):
+    log_path = tmp_path / "rotating.jsonl"
+    shutdown_logging()
+    configure_logging(log_path=str(log_path), max_bytes=2048, backup_count=2, sample_rates={})
+    logger = logging.getLogger("agritech.test")
+    try:
+        for i in range(200):
+            log_event(logger, "MQTT_MESSAGE", seq=i, data="x" * 50)
+    finally:
+        shutdown_logging()
+
+    files = sorted(os.listdir(tmp_path))
+    assert files == ["rotating.jsonl", "rotating.jsonl.1", "rotating.jsonl.2"]
+    assert all(os.path.getsize(tmp_path / name) <= 2048 for name in files)
+
+
+def test_sampling_drops_info_but_keeps_errors(monkeypatch):
+    sampler = SamplingFilter({"MQTT_MESSAGE": 0.0})
+    info = logging.makeLogRecord({"levelno": logging.INFO, "event": "MQTT_MESSAGE"})
+    error = logging.makeLogRecord({"levelno": logging.ERROR, "event": "MQTT_MESSAGE"})
+    other = logging.makeLogRecord({"levelno": logging.INFO, "event": "CROP_INPUTS"})
+    assert not sampler.filter(info)
+    assert sampler.filter(error)
+    assert sampler.filter(other)
+
+
+def test_parse_sample_rates():
+    assert app_logging._parse_sample_rates("MQTT_MESSAGE=0.1, bad, X=2") == {"MQTT_MESSAGE": 0.1, "X": 1.0}
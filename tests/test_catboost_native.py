@@ -0,0 +1,62 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'models', 'irrigation_optimization'))
+
+catboost = pytest.importorskip("catboost")
+pd = pytest.importorskip("pandas")
+
+import catboost_native
+
+FEATURES = ['soil_moisture', 'temperature', 'humidity', 'ph', 'n', 'p', 'k']
+
+
+def _data(seed=0, rows=200):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.random((rows, len(FEATURES))) * 100, columns=FEATURES)
+    return X, X['soil_moisture'] < 40
+
+
+def test_native_classifier_matches_pickled_model(tmp_path):
+    import joblib
+
+    X, y = _data()
+    model = catboost.CatBoostClassifier(iterations=30, depth=4, verbose=False, random_seed=0, allow_writing_files=False).fit(X, y)
+    pkl = tmp_path / "catboost_classifier.pkl"
+    joblib.dump(model, pkl)
+
+    cbm = catboost_native.convert(str(pkl))
+    assert cbm.endswith("catboost_classifier.cbm")
+    assert os.path.exists(catboost_native.schema_path(cbm))
+
+    native = catboost_native.load_native(str(pkl))
+    assert native.schema["feature_names"] == FEATURES
+    assert native.schema["class_names"] == [False, True]
+
+    rows = X.to_numpy()[:20]
+    assert list(native.predict(rows)) == list(model.predict(rows))
+    np.testing.assert_allclose(native.predict_proba(rows), model.predict_proba(rows), rtol=1e-6)
+    # one feature vector, as built by create_irrigation_features
+    assert native.predict(rows[0]) == model.predict(rows[:1])
+    # DataFrames are reordered to the schema
+    assert list(native.predict(X[FEATURES[::-1]].head(5))) == list(model.predict(X.head(5)))
+
+
+def test_native_regressor_and_schema_mismatch(tmp_path):
+    X, y = _data(1)
+    model = catboost.CatBoostRegressor(iterations=30, depth=4, verbose=False, random_seed=0, allow_writing_files=False).fit(X, X['temperature'])
+    cbm = catboost_native.export_native(model, str(tmp_path / "catboost_irrigation_model.pkl"))
+
+    native = catboost_native.load_native(cbm)
+    np.testing.assert_allclose(native.predict(X.to_numpy()[:5]), model.predict(X.head(5)), rtol=1e-6)
+    with pytest.raises(ValueError):
+        native.predict(np.zeros((1, 3)))
+
+    import json
+    with open(catboost_native.schema_path(cbm), "w") as f:
+        json.dump({"model_type": "regressor", "feature_names": FEATURES[::-1]}, f)
+    with pytest.raises(ValueError):
+        catboost_native.load_native(cbm)
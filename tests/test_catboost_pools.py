@@ -0,0 +1,65 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'models', 'irrigation_optimization'))
+
+catboost = pytest.importorskip("catboost")
+pd = pytest.importorskip("pandas")
+
+import catboost_pools
+
+FEATURES = ['soil_moisture', 'temperature', 'humidity', 'ph', 'n', 'p', 'k']
+FIT = dict(iterations=30, depth=4, verbose=False, random_seed=0, allow_writing_files=False)
+
+
+def _data(seed=0, rows=300):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.random((rows, len(FEATURES))) * 100, columns=FEATURES)
+    return X, X['soil_moisture'] + rng.normal(0, 10, rows) < 40
+
+
+def test_model_from_quantized_pool_matches_dataframe_fit(tmp_path):
+    X, y = _data()
+    X_eval, y_eval = _data(seed=1, rows=100)
+    train, evaluation = catboost_pools.quantized_pools(X, y, X_eval, y_eval, border_count=32, cache_dir=str(tmp_path))
+    assert train.is_quantized() and evaluation.is_quantized()
+    assert train.get_feature_names() == FEATURES
+
+    expected = catboost.CatBoostClassifier(border_count=32, **FIT).fit(X, y)
+    model = catboost.CatBoostClassifier(class_names=[False, True], **FIT).fit(train)
+    assert list(model.classes_) == [False, True]
+    np.testing.assert_array_equal(model.predict_proba(X_eval), expected.predict_proba(X_eval))
+    assert list(model.predict(X_eval)) == list(expected.predict(X_eval))
+
+    # The eval pool is binned with the training borders, so it works as an eval_set
+    regressor = catboost.CatBoostRegressor(**FIT).fit(train, eval_set=evaluation, use_best_model=True)
+    assert regressor.get_best_iteration() is not None
+
+
+def test_quantized_pools_are_built_once_per_data(tmp_path, monkeypatch):
+    X, y = _data()
+    catboost_pools.quantized_pools(X, y, border_count=32, cache_dir=str(tmp_path))
+
+    def build(*args):
+        raise AssertionError("pool rebuilt")
+
+    monkeypatch.setattr(catboost_pools, "_build", build)
+    train, evaluation = catboost_pools.quantized_pools(X.copy(), y.copy(), border_count=32, cache_dir=str(tmp_path))
+    assert train.num_row() == len(X) and evaluation is None
+    # Different data or settings get their own pools
+    with pytest.raises(AssertionError, match="rebuilt"):
+        catboost_pools.quantized_pools(X, y, border_count=64, cache_dir=str(tmp_path))
+    with pytest.raises(AssertionError, match="rebuilt"):
+        catboost_pools.quantized_pools(X.iloc[1:], y.iloc[1:], border_count=32, cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_training_params_come_from_the_environment(monkeypatch):
+    monkeypatch.setattr(catboost_pools, "TRAINING_THREADS", 2)
+    monkeypatch.setattr(catboost_pools, "TRAINING_RAM_LIMIT", None)
+    assert catboost_pools.training_params() == {"thread_count": 2}
+    monkeypatch.setattr(catboost_pools, "TRAINING_RAM_LIMIT", "2gb")
+    assert catboost_pools.training_params() == {"thread_count": 2, "used_ram_limit": "2gb"}
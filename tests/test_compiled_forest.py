@@ -0,0 +1,89 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'models', 'crop_recommendation'))
+
+pd = pytest.importorskip("pandas")
+ensemble = pytest.importorskip("sklearn.ensemble")
+
+from compiled_forest import CHUNK_ROWS, compile_forest, compile_if_possible
+
+FEATURES = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall', 'soil_type_encoded']
+CROPS = np.array(['rice', 'maize', 'chickpea', 'banana', 'mango', 'cotton'])
+
+
+def _data(seed=0, rows=600):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.uniform(0, 1, (rows, len(FEATURES))) * [140, 145, 205, 44, 100, 10, 300, 4],
+                     columns=FEATURES)
+    X['soil_type_encoded'] = X['soil_type_encoded'].round()
+    y = CROPS[(X['N'] // 25 + X['rainfall'] // 100).astype(int) % len(CROPS)]
+    return X, y
+
+
+@pytest.mark.parametrize("forest", [ensemble.RandomForestClassifier, ensemble.ExtraTreesClassifier])
+def test_compiled_forest_matches_sklearn(forest):
+    X, y = _data()
+    model = forest(n_estimators=25, random_state=42).fit(X, y)
+    compiled = compile_forest(model)
+
+    # Batches (including chunked ones), single DataFrame rows and plain arrays all score identically
+    X_test, _ = _data(seed=1, rows=CHUNK_ROWS + 37)
+    np.testing.assert_array_equal(compiled.predict_proba(X_test), model.predict_proba(X_test))
+    np.testing.assert_array_equal(compiled.predict(X_test), model.predict(X_test))
+    np.testing.assert_array_equal(compiled.apply(X_test) - compiled.roots, model.apply(X_test))
+    for i in range(5):
+        row = X_test.iloc[[i]]
+        np.testing.assert_array_equal(compiled.predict_proba(row), model.predict_proba(row))
+        np.testing.assert_array_equal(compiled.predict_proba(row.to_numpy()[0]), model.predict_proba(row))
+    assert compiled.predict(X_test.iloc[[0]])[0] == model.predict(X_test.iloc[[0]])[0]
+
+    # Columns are matched by name, as the app's DataFrame may come in any order
+    np.testing.assert_array_equal(compiled.predict_proba(X_test[FEATURES[::-1]]), model.predict_proba(X_test))
+    with pytest.raises(ValueError, match="expects 8"):
+        compiled.predict_proba(np.zeros((1, 7)))
+
+
+@pytest.mark.parametrize("forest", [ensemble.RandomForestClassifier, ensemble.ExtraTreesClassifier])
+@pytest.mark.parametrize("train_missing", [False, True])
+def test_compiled_forest_routes_missing_values_like_sklearn(forest, train_missing):
+    X, y = _data()
+    rng = np.random.default_rng(3)
+    if train_missing:
+        X = X.mask(rng.uniform(size=X.shape) < 0.1)
+    model = forest(n_estimators=25, random_state=42).fit(X, y)
+    compiled = compile_forest(model)
+    assert compiled.missing_left is not None
+
+    # NaN follows each node's missing_go_to_left, in batches and single rows
+    X_test, _ = _data(seed=1, rows=200)
+    X_test = X_test.mask(rng.uniform(size=X_test.shape) < 0.2)
+    np.testing.assert_array_equal(compiled.predict_proba(X_test), model.predict_proba(X_test))
+    np.testing.assert_array_equal(compiled.apply(X_test) - compiled.roots, model.apply(X_test))
+    for i in range(5):
+        row = X_test.iloc[[i]]
+        np.testing.assert_array_equal(compiled.predict_proba(row), model.predict_proba(row))
+
+
+def test_compiled_forest_is_memory_mappable(tmp_path):
+    joblib = pytest.importorskip("joblib")
+    X, y = _data()
+    model = ensemble.RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    path = tmp_path / "crop_model.joblib"
+    joblib.dump(compile_forest(model), path, compress=0)
+
+    loaded = joblib.load(path, mmap_mode="r")
+    assert isinstance(loaded.value, np.memmap) and isinstance(loaded.children, np.memmap)
+    np.testing.assert_array_equal(loaded.predict_proba(X), model.predict_proba(X))
+
+
+def test_compile_if_possible_leaves_other_models_alone():
+    X, y = _data()
+    regressor = ensemble.RandomForestRegressor(n_estimators=3, random_state=0).fit(X, X['N'])
+    assert compile_if_possible(regressor) is regressor
+    assert compile_if_possible(None) is None
+    with pytest.raises(TypeError):
+        compile_forest(regressor)
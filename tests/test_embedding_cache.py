@@ -0,0 +1,97 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'models', 'soil_classification'))
+
+tf = pytest.importorskip("tensorflow")
+Image = pytest.importorskip("PIL.Image")
+
+from tensorflow import keras
+
+import embedding_cache
+from soil_dataset import decode_image
+
+
+def _images(tmp_path, count=5):
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"{i}.jpg"
+        Image.fromarray(rng.integers(0, 255, (40, 48, 3), dtype=np.uint8)).save(path)
+        paths.append(str(path))
+    return paths
+
+
+def _encoder(shift=0):
+    conv = keras.layers.Conv2D(6, 3, kernel_initializer=keras.initializers.GlorotUniform(seed=0))
+    encoder = embedding_cache.pooled_encoder(keras.Sequential([keras.layers.Input(shape=(32, 32, 3)), conv]))
+    encoder.set_weights([w + shift for w in encoder.get_weights()])
+    return encoder
+
+
+def _augmentation(seed):
+    return keras.Sequential([keras.layers.RandomRotation(0.1, seed=seed), keras.layers.RandomFlip(seed=seed)])
+
+
+def _images_tensor(paths):
+    return tf.stack([decode_image(path, (32, 32)) for path in paths])
+
+
+def test_embeddings_are_computed_per_image_and_seed(tmp_path):
+    paths = _images(tmp_path)
+    encoder = _encoder()
+    embeddings = embedding_cache.cached_embeddings(encoder, paths, _augmentation, variants=3,
+                                                   cache_dir=str(tmp_path / "c"))
+    assert isinstance(embeddings, np.memmap) and embeddings.shape == (3, 5, 6) and embeddings.dtype == np.float32
+    # Variant v is the images run through the augmentation seeded with 42 + v
+    augmented = _augmentation(42 + 2)(_images_tensor(paths), training=True)
+    np.testing.assert_allclose(embeddings[2], encoder.predict_on_batch(augmented), rtol=1e-5, atol=1e-6)
+    assert not np.allclose(embeddings[0], embeddings[1])
+
+    plain = embedding_cache.cached_embeddings(encoder, paths, cache_dir=str(tmp_path / "c"))
+    assert plain.shape == (1, 5, 6)
+    np.testing.assert_allclose(plain[0], encoder.predict_on_batch(_images_tensor(paths)), rtol=1e-5, atol=1e-6)
+
+
+def test_embeddings_are_reused_until_inputs_change(tmp_path, monkeypatch):
+    paths = _images(tmp_path)
+    encoder = _encoder()
+    first = embedding_cache.cached_embeddings(encoder, paths, _augmentation, variants=2, cache_dir=str(tmp_path / "c"))
+
+    def compute(*args, **kwargs):
+        raise AssertionError("recomputed")
+
+    monkeypatch.setattr(embedding_cache, "compute_embeddings", compute)
+    again = embedding_cache.cached_embeddings(encoder, paths, _augmentation, variants=2, cache_dir=str(tmp_path / "c"))
+    np.testing.assert_array_equal(again, first)
+
+    # A changed image, other augmentation settings or other weights need new embeddings
+    stat = os.stat(paths[0])
+    os.utime(paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    with pytest.raises(AssertionError, match="recomputed"):
+        embedding_cache.cached_embeddings(encoder, paths, _augmentation, variants=2, cache_dir=str(tmp_path / "c"))
+    with pytest.raises(AssertionError, match="recomputed"):
+        embedding_cache.cached_embeddings(encoder, paths, lambda seed: keras.layers.RandomFlip(seed=seed),
+                                          variants=2, cache_dir=str(tmp_path / "c"))
+    with pytest.raises(AssertionError, match="recomputed"):
+        embedding_cache.cached_embeddings(_encoder(shift=1), paths, _augmentation, variants=2,
+                                          cache_dir=str(tmp_path / "c"))
+
+
+def test_embedding_sequence_serves_one_variant_per_epoch():
+    embeddings = np.arange(3 * 10 * 2, dtype=np.float32).reshape(3, 10, 2)
+    labels = np.array([0, 1, 2, 0, 1, 2, 0, 1, 2, 0])
+    sequence = embedding_cache.EmbeddingSequence(embeddings, labels, batch_size=4, num_classes=3)
+    assert len(sequence) == 3
+
+    for epoch in range(4):
+        x = np.concatenate([sequence[i][0] for i in range(len(sequence))])
+        y = np.concatenate([sequence[i][1] for i in range(len(sequence))])
+        rows = (x[:, 0] - embeddings[epoch % 3, 0, 0]).astype(int) // 2
+        np.testing.assert_array_equal(x, embeddings[epoch % 3, rows])
+        np.testing.assert_array_equal(y.argmax(axis=1), labels[rows])
+        assert sorted(rows) == list(range(10))
+        sequence.on_epoch_end()
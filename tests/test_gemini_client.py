@@ -0,0 +1,203 @@
+import datetime
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+pytest.importorskip("streamlit")
+pytest.importorskip("google.auth")
+
+import gemini_client
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, payload=None):
+        self.status_code = status_code
+        self.ok = 200 <= status_code < 300
+        self._payload = payload or {}
+        self.text = str(self._payload)
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Records calls and answers from a per-model status table."""
+
+    def __init__(self, statuses, models=None):
+        self.statuses = statuses
+        self.models = models or []
+        self.posts = []
+        self.gets = 0
+
+    def post(self, url, **kwargs):
+        model = url.split("/models/")[1].split(":")[0]
+        self.posts.append(model)
+        status = self.statuses.get(model, 404)
+        payload = {"candidates": [{"content": {"parts": [{"text": f"answer from {model}"}]}}]}
+        return FakeResponse(status, payload if status == 200 else {"error": {"message": "not found"}})
+
+    def get(self, url, **kwargs):
+        self.gets += 1
+        return FakeResponse(200, {"models": [
+            {"name": f"models/{name}", "supportedGenerationMethods": ["generateContent"]} for name in self.models
+        ]})
+
+
+@pytest.fixture
+def fake_session(monkeypatch):
+    def install(statuses, models=None):
+        session = FakeSession(statuses, models)
+        monkeypatch.setattr(gemini_client, "_session", session)
+        monkeypatch.setattr(gemini_client, "resolve_auth", lambda: (None, "test-key"))
+        gemini_client._model_list_cache.clear()
+        gemini_client._sticky.clear()
+        gemini_client.circuit_breaker.reset()
+        return session
+    return install
+
+
+def test_model_list_is_cached_between_calls(fake_session, monkeypatch):
+    monkeypatch.setenv("GEMINI_MODEL", "gemini-missing")
+    session = fake_session({"gemini-2.5-flash": 200}, models=["gemini-2.5-flash"])
+
+    first = gemini_client.call_gemini_chat("when should I irrigate rice?")
+    second = gemini_client.call_gemini_chat("what fertilizer for maize?")
+
+    assert first["model_used"] == second["model_used"] == "gemini-2.5-flash"
+    assert session.gets == 1
+
+
+def test_token_cache_refreshes_only_near_expiry(monkeypatch):
+    refreshes = []
+
+    class FakeCredentials:
+        token = None
+        expiry = None
+
+        def refresh(self, request):
+            refreshes.append(request)
+            self.token = f"token-{len(refreshes)}"
+            now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+            self.expiry = now + datetime.timedelta(hours=1)
+
+    creds = FakeCredentials()
+    monkeypatch.setattr(
+        gemini_client.service_account.Credentials, "from_service_account_file",
+        classmethod(lambda cls, path, scopes=None: creds)
+    )
+    cache = gemini_client._TokenCache()
+
+    assert cache.get_token("sa.json") == "token-1"
+    assert cache.get_token("sa.json") == "token-1"
+    assert len(refreshes) == 1
+
+    creds.expiry = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) + datetime.timedelta(minutes=1)
+    assert cache.get_token("sa.json") == "token-2"
+
+
+class FakeStreamResponse(FakeResponse):
+    def __init__(self, status_code, lines):
+        super().__init__(status_code)
+        self.lines = lines
+
+    def iter_lines(self, decode_unicode=False):
+        yield from self.lines
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def test_stream_renders_chunks_and_records_latency(fake_session, monkeypatch):
+    monkeypatch.setenv("GEMINI_MODEL", "gemini-2.5-flash")
+    session = fake_session({"gemini-2.5-flash": 200})
+    chunks = ['data: {"candidates": [{"content": {"parts": [{"text": "Irrigate "}]}}]}', "",
+              'data: {"candidates": [{"content": {"parts": [{"text": "at dawn."}]}}]}']
+    session.post = lambda url, **kwargs: FakeStreamResponse(200, chunks)
+
+    stream = gemini_client.GeminiStream("when should I irrigate rice?")
+    assert stream.wait(5)
+    assert stream.error is None
+    assert stream.text == "Irrigate at dawn."
+    assert stream.model_used == "gemini-2.5-flash"
+    assert 0 <= stream.time_to_first_token <= stream.total_latency
+
+
+def test_stream_falls_back_to_blocking_call_on_404(fake_session, monkeypatch):
+    monkeypatch.setenv("GEMINI_MODEL", "gemini-missing")
+    session = fake_session({"gemini-2.5-flash": 200}, models=["gemini-2.5-flash"])
+    blocking_post = session.post
+
+    def post(url, **kwargs):
+        if kwargs.get("stream"):
+            return FakeStreamResponse(404, [])
+        return blocking_post(url, **kwargs)
+
+    session.post = post
+    stream = gemini_client.GeminiStream("what fertilizer for maize?")
+    assert stream.wait(5)
+    assert stream.text == "answer from gemini-2.5-flash"
+    assert stream.model_used == "gemini-2.5-flash"
+
+
+def test_working_model_is_remembered(fake_session, monkeypatch):
+    monkeypatch.setenv("GEMINI_MODEL", "gemini-missing")
+    session = fake_session({"gemini-1.5-flash": 200}, models=["gemini-2.5-flash", "gemini-1.5-flash"])
+    monkeypatch.setattr(gemini_client, "HEDGE_DELAY", 0.01)
+
+    first = gemini_client.call_gemini_chat("when should I irrigate rice?")
+    session.posts.clear()
+    second = gemini_client.call_gemini_chat("when should I irrigate rice?")
+
+    assert first["model_used"] == "gemini-1.5-flash"
+    assert second["model_used"] == "gemini-1.5-flash"
+    assert second["notice"] is None
+    assert session.posts == ["gemini-1.5-flash"]
+
+
+def test_hedged_fallback_does_not_wait_for_slow_candidate(fake_session, monkeypatch):
+    import threading
+    import time
+
+    monkeypatch.setenv("GEMINI_MODEL", "gemini-missing")
+    session = fake_session({"gemini-2.5-flash": 200, "gemini-1.5-flash": 200},
+                           models=["gemini-2.5-flash", "gemini-1.5-flash"])
+    monkeypatch.setattr(gemini_client, "HEDGE_DELAY", 0.05)
+    release = threading.Event()
+    fast_post = session.post
+
+    def post(url, **kwargs):
+        if "gemini-2.5-flash" in url:
+            release.wait(5)  # a hung request
+        return fast_post(url, **kwargs)
+
+    session.post = post
+    start = time.perf_counter()
+    result = gemini_client.call_gemini_chat("what fertilizer for maize?")
+    elapsed = time.perf_counter() - start
+    release.set()
+
+    assert result["model_used"] == "gemini-1.5-flash"
+    assert elapsed < 2
+
+
+def test_circuit_breaker_skips_failing_model(fake_session, monkeypatch):
+    monkeypatch.setenv("GEMINI_MODEL", "gemini-flaky")
+    session = fake_session({"gemini-flaky": 503, "gemini-2.5-flash": 200}, models=["gemini-2.5-flash"])
+    monkeypatch.setattr(gemini_client.circuit_breaker, "threshold", 2)
+
+    for _ in range(2):
+        gemini_client._sticky.clear()
+        gemini_client.call_gemini_chat("when should I irrigate rice?")
+    assert not gemini_client.circuit_breaker.allow("gemini-flaky")
+
+    gemini_client._sticky.clear()
+    session.posts.clear()
+    result = gemini_client.call_gemini_chat("when should I irrigate rice?")
+    assert result["model_used"] == "gemini-2.5-flash"
+    assert "gemini-flaky" not in session.posts
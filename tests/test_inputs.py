@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+pytest.importorskip("streamlit")
+
+from streamlit.testing.v1 import AppTest
+
+
+def _memo_app():
+    import streamlit as st
+
+    from inputs import memoized_prediction
+
+    calls = st.session_state.setdefault('calls', [])
+    for model, model_inputs in (('crop_model', st.session_state.get('crop_inputs', (1, 2))),
+                                ('irrigation_model', st.session_state.get('irrigation_inputs', (3,)))):
+        st.session_state[model] = memoized_prediction(
+            model, model_inputs, lambda: calls.append(model) or sum(model_inputs)
+        )
+
+
+def test_prediction_is_recomputed_only_for_changed_inputs():
+    at = AppTest.from_function(_memo_app).run()
+    assert at.session_state['calls'] == ['crop_model', 'irrigation_model']
+
+    at.run()
+    assert at.session_state['calls'] == ['crop_model', 'irrigation_model']
+
+    at.session_state['crop_inputs'] = (1, 5)
+    at.run()
+    assert at.session_state['calls'] == ['crop_model', 'irrigation_model', 'crop_model']
+    assert at.session_state['crop_model'] == 6
+    assert at.session_state['irrigation_model'] == 3
@@ -0,0 +1,197 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+pytest.importorskip("streamlit")
+
+import iot_data
+from iot_data import LatestReadingCache
+
+ROW = {'created_at': '2025-06-01T08:00:00+00:00', 'temperature': 27.5, 'humidity': '61',
+       'soil_moisture': 0.42, 'wind_speed': None}
+
+
+def test_reading_is_served_from_cache_within_ttl():
+    calls = []
+
+    def fetch_row():
+        calls.append(1)
+        return ROW
+
+    cache = LatestReadingCache(fetch_row, ttl=60, refresh_interval=0)
+    first = cache.get()
+    second = cache.get()
+
+    assert len(calls) == 1
+    assert first is second
+    assert first['humidity'] == 61.0
+    assert first['soil_moisture'] == pytest.approx(42.0)
+    assert first['wind_speed'] is None
+    assert cache.reading_time.year == 2025
+
+
+def test_failed_refresh_keeps_last_reading_and_reports_it(monkeypatch):
+    rows = [ROW]
+
+    def fetch_row():
+        if not rows:
+            raise ConnectionError("supabase unreachable")
+        return rows.pop()
+
+    cache = LatestReadingCache(fetch_row, ttl=0, refresh_interval=0)
+    assert cache.get()['temperature'] == 27.5
+    assert cache.get()['temperature'] == 27.5
+
+    status = cache.status()
+    assert status["error"] == "supabase unreachable"
+    assert status["stale"]  # the fixture row is far older than IOT_STALE_AFTER
+
+
+def test_background_refresher_keeps_cache_warm():
+    refreshed = threading.Event()
+    calls = []
+
+    def fetch_row():
+        calls.append(1)
+        if len(calls) >= 3:
+            refreshed.set()
+        return dict(ROW, temperature=20 + len(calls))
+
+    cache = LatestReadingCache(fetch_row, ttl=60, refresh_interval=0.01)
+    cache.get()
+    try:
+        assert refreshed.wait(5)
+        assert cache.reading['temperature'] >= 23
+    finally:
+        cache.stop()
+
+
+def test_format_age():
+    assert iot_data.format_age(None) == "unknown"
+    assert iot_data.format_age(42) == "42s"
+    assert iot_data.format_age(600) == "10 min"
+    assert iot_data.format_age(3 * 3600) == "3.0 h"
+
+
+class FakeTable:
+    """In-memory stand-in for the Supabase query the history sync issues."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def fetch(self, columns, since=None, limit=1000):
+        self.queries.append((tuple(columns), since, limit))
+        if since is None:
+            rows = sorted(self.rows, key=lambda r: r['created_at'], reverse=True)
+        else:
+            rows = [r for r in sorted(self.rows, key=lambda r: r['created_at'])
+                    if iot_data.parse_timestamp(r['created_at']) >= since]
+        return [{c: r.get(c) for c in columns} for r in rows[:limit]]
+
+
+def _rows(start, count):
+    return [{'id': f'00000000-0000-0000-0000-{i:012d}', 'created_at': f'2025-06-01T08:{i:02d}:00+00:00', 'temperature': 20 + i,
+             'humidity': 60, 'soil_moisture': 35, 'water_level': 50, 'wind_speed': 8,
+             'rainfall': 0, 'servo_angle': 90}
+            for i in range(start, start + count)]
+
+
+def test_history_sync_fetches_only_new_rows():
+    table = FakeTable(_rows(0, 10))
+    history = iot_data.SensorHistory(fetch_rows=table.fetch, initial_rows=5, page_size=4)
+
+    assert history.sync() == 5
+    assert list(history.frame['temperature']) == [25, 26, 27, 28, 29]
+    assert 'servo_angle' not in history.frame
+    assert str(history.frame['temperature'].dtype) == 'float32'
+    assert str(history.frame['created_at'].dtype) == 'datetime64[ns, UTC]'
+
+    assert history.sync() == 0
+    version = history.version
+
+    table.rows += _rows(10, 6)
+    assert history.sync() == 6
+    assert list(history.frame['temperature'])[-6:] == list(range(30, 36))
+    assert history.version == version + 1
+    # every delta query started at the high-water mark, never from scratch
+    assert all(since is not None for _, since, _ in table.queries[1:])
+
+
+def test_history_is_bounded():
+    table = FakeTable(_rows(0, 3))
+    history = iot_data.SensorHistory(fetch_rows=table.fetch, max_rows=4)
+    history.sync()
+    table.rows += _rows(3, 5)
+    history.sync()
+
+    assert list(history.frame['temperature']) == [24, 25, 26, 27]
+
+
+def test_bucket_width_caps_points():
+    from datetime import datetime, timedelta, timezone
+
+    start = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    assert iot_data.choose_bucket_seconds(start, start + timedelta(minutes=8), max_points=500) == 60
+    assert iot_data.choose_bucket_seconds(start, start + timedelta(days=7), max_points=500) == 1800
+    assert iot_data.choose_bucket_seconds(start, start + timedelta(days=120), max_points=500) == 6 * 3600
+    for days in (1, 30, 365, 3650):
+        width = iot_data.choose_bucket_seconds(start, start + timedelta(days=days), max_points=500)
+        assert days * 86400 / width <= 500
+
+
+def test_local_and_supabase_stores_share_an_interface(monkeypatch):
+    from datetime import datetime, timezone
+
+    import pandas as pd
+
+    frame = pd.DataFrame({
+        'created_at': pd.date_range('2025-06-01', periods=120, freq='min', tz='UTC'),
+        'temperature': [20.0] * 60 + [30.0] * 60,
+        'humidity': 60.0,
+    })
+    start = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    end = datetime(2025, 6, 1, 2, tzinfo=timezone.utc)
+    local = iot_data.LocalHistoryStore(frame).bucketed(start, end, 3600)
+
+    assert list(local['readings']) == [60, 60]
+    assert list(local['temperature']) == [20.0, 30.0]
+
+    class FakeRpc:
+        def __init__(self, data):
+            self.data = data
+
+        def execute(self):
+            return self
+
+    class FakeClient:
+        def __init__(self):
+            self.params = None
+
+        def rpc(self, name, params):
+            assert name == "sensor_history_buckets"
+            assert params['bucket_seconds'] == 3600
+            self.params = params
+            return FakeRpc([
+                {'bucket_start': '2025-06-01T00:00:00+00:00', 'readings': 60, 'temperature': 20.0, 'humidity': 60.0},
+                {'bucket_start': '2025-06-01T01:00:00+00:00', 'readings': 60, 'temperature': 30.0, 'humidity': 60.0},
+            ])
+
+    client = FakeClient()
+    remote = iot_data.SupabaseHistoryStore(client).bucketed(start, end, 3600)
+    # Same columns either way; sensors without data are NaN
+    assert list(remote.columns) == ['bucket_start', 'readings', *iot_data.BUCKET_VALUE_COLUMNS]
+    assert remote['rainfall'].isna().all()
+    pd.testing.assert_frame_equal(remote, local)
+    assert client.params['p_device'] is None
+
+    # With a device column configured, the RPC filters by the store's device
+    monkeypatch.setattr(iot_data, "DEVICE_COLUMN", "device_id")
+    iot_data.SupabaseHistoryStore(client, device_id="esp32-1").bucketed(start, end, 3600)
+    assert client.params['p_device'] == "esp32-1"
+    assert list(iot_data.SupabaseHistoryStore(client).bucketed(start, end, 3600).columns) == list(local.columns)
+    assert client.params['p_device'] is None
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+import model_registry
+
+
+def test_alias_resolution_is_cached_and_survives_registry_outages(tmp_path):
+    calls = []
+
+    def lookup(name, alias):
+        calls.append((name, alias))
+        if len(calls) > 2:
+            raise ConnectionError("registry down")
+        return {"version": str(len(calls)), "source": "models:/m-abc"}
+
+    resolve = lambda ttl: model_registry.resolve("CropModel", "champion", ttl=ttl, lookup=lookup,
+                                                 cache_dir=str(tmp_path))
+    assert resolve(300)["version"] == "1"
+    # Fresh entries come from the cache file, also for other processes and after restarts
+    assert resolve(300)["version"] == "1"
+    assert calls == [("CropModel", "champion")]
+
+    assert resolve(0)["version"] == "2"
+    assert resolve(0)["version"] == "2"  # lookup fails: last resolution is kept
+    assert len(calls) == 3
+
+
+def test_artifacts_are_downloaded_once_into_a_content_addressed_cache(tmp_path):
+    downloads = []
+
+    def download(name, version, source, dst_path):
+        downloads.append((name, version))
+        with open(os.path.join(dst_path, "MLmodel"), "w") as f:
+            f.write("flavors: {}\n")
+
+    first = model_registry.fetch("CropModel", "1", download=download, cache_dir=str(tmp_path))
+    assert model_registry.fetch("CropModel", "1", download=download, cache_dir=str(tmp_path)) == first
+    assert downloads == [("CropModel", "1")]
+    assert os.path.basename(first) == model_registry._tree_digest(first)
+
+    # Another version with the same content shares the stored object
+    assert model_registry.fetch("CropModel", "2", download=download, cache_dir=str(tmp_path)) == first
+    assert os.listdir(tmp_path / "objects") == [os.path.basename(first)]
+
+
+def test_copied_file_store_finds_logged_models_by_id():
+    store = os.path.join(model_registry.REPO_ROOT, "mlflow", "mlruns")
+    if not model_registry.TRACKING_URI.startswith("file:") or not os.path.isdir(store):
+        pytest.skip("no local MLflow file store")
+    local = model_registry._local_logged_model("models:/m-1610772826194446a6d16648a1b08afc")
+    assert local is not None and os.path.isfile(os.path.join(local, "MLmodel"))
+    assert model_registry._local_logged_model("models:/m-missing") is None
@@ -0,0 +1,161 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+pytest.importorskip("streamlit")
+
+import model_store
+
+
+@pytest.fixture
+def fake_loaders(monkeypatch):
+    release = threading.Event()
+
+    def slow(value, delay):
+        def load():
+            time.sleep(delay)
+            return value
+        return load
+
+    def blocked():
+        release.wait(5)
+        return "late"
+
+    monkeypatch.setattr(model_store, "_LOADERS", {
+        'a': (slow("A", 0.3), "model a", None, None),
+        'b': (slow("B", 0.3), "model b", None, None),
+        'c': (slow("C", 0.3), "model c", None, None),
+        'stuck': (blocked, "stuck model", (None, None), None),
+    })
+    monkeypatch.setattr(model_store, "_futures", {})
+    monkeypatch.setattr(model_store, "MODEL_STATUS", {})
+    yield release
+    release.set()
+
+
+def test_loads_run_concurrently(fake_loaders):
+    started = time.monotonic()
+    model_store.start_loading('a', 'b', 'c')
+    assert [model_store._get(name) for name in ('a', 'b', 'c')] == ["A", "B", "C"]
+    assert time.monotonic() - started < 0.8  # ~0.3s for the slowest, not 0.9s for the sum
+    assert model_store.loading_models() == []
+
+
+def test_timed_out_load_keeps_running_in_background(fake_loaders):
+    assert model_store._get('stuck', timeout=0.1) == (None, None)
+    assert model_store.loading_models() == ['stuck']
+
+    fake_loaders.set()
+    assert model_store._get('stuck') == "late"
+    assert model_store.loading_models() == []
+
+
+def test_model_is_ready_only_after_warm_up(monkeypatch):
+    warm_up_started, finish_warm_up = threading.Event(), threading.Event()
+    warmed = []
+
+    def warm_up(model):
+        warm_up_started.set()
+        finish_warm_up.wait(5)
+        warmed.append(model)
+
+    monkeypatch.setattr(model_store, "_LOADERS", {'m': (lambda: "model", "model m", None, warm_up)})
+    monkeypatch.setattr(model_store, "_futures", {})
+    monkeypatch.setattr(model_store, "MODEL_STATUS", {'m': None})
+
+    model_store.start_loading('m')
+    assert warm_up_started.wait(5)
+    assert model_store.MODEL_STATUS['m'] is None
+    assert model_store.loading_models() == ['m']
+
+    finish_warm_up.set()
+    assert model_store._get('m') == "model"
+    assert warmed == ["model"]
+    assert model_store.MODEL_STATUS['m'] is True
+
+
+def test_warm_up_inputs_match_the_page_features():
+    pytest.importorskip("pandas")
+
+    calls = []
+
+    class Recorder:
+        def predict(self, x):
+            calls.append(('predict', getattr(x, 'shape', None)))
+
+        def predict_proba(self, x):
+            calls.append(('predict_proba', getattr(x, 'shape', None)))
+
+    model_store._warm_up_crop_model(Recorder())
+    model_store._warm_up_irrigation_model(Recorder())
+    model_store._warm_up_optimization_model(Recorder())
+
+    assert calls[0] == ('predict', (1, 8))
+    assert calls[1] == ('predict_proba', (1, 8))
+    assert calls[2][0] == 'predict' and calls[2][1][0] == 1
+    assert calls[4][0] == 'predict' and calls[4][1][0] == 1
+
+
+def test_soil_warm_up_uses_a_224_image():
+    pytest.importorskip("PIL")
+    import numpy as np
+
+    shapes = []
+
+    class FakeClassifier:
+        def predict(self, x, verbose=0):
+            shapes.append(x.shape)
+            return np.array([[0.2, 0.5, 0.3]])
+
+    model_store._warm_up_soil_model((FakeClassifier(), model_store.CORRECT_SOIL_LABELS))
+    assert shapes == [(1, 224, 224, 3)]
+
+
+def test_changed_model_file_is_reloaded_and_swapped_in(tmp_path, monkeypatch):
+    artifact = tmp_path / "model.txt"
+    artifact.write_text("v1")
+    warmed = []
+
+    def load():
+        content = artifact.read_text()
+        if content == "broken":
+            model_store._fail('m', "unreadable model")
+            return None
+        return content
+
+    monkeypatch.setattr(model_store, "_LOADERS", {'m': (load, "model m", None, warmed.append)})
+    monkeypatch.setattr(model_store, "MODEL_FILES", {'m': [str(artifact)]})
+    for name in ("_futures", "_loaded_versions", "_seen_versions", "_generations", "_reloads"):
+        monkeypatch.setattr(model_store, name, {})
+    monkeypatch.setattr(model_store, "MODEL_STATUS", {'m': None})
+
+    def poll_until_reloaded():
+        # The first poll only notices the change; the reload starts once the file stopped changing
+        assert model_store.check_for_updates() == []
+        assert model_store.check_for_updates() == ['m']
+        model_store._reloads['m'].result(timeout=5)
+
+    in_flight = model_store._get('m')
+    assert in_flight == "v1" and model_store.model_version('m') == 0
+    assert model_store.check_for_updates() == []
+
+    artifact.write_text("v2.0")
+    poll_until_reloaded()
+    assert model_store._get('m') == "v2.0"
+    assert in_flight == "v1"
+    assert warmed == ["v1", "v2.0"]
+    assert model_store.model_version('m') == 1
+    assert model_store.check_for_updates() == []
+
+    # A bad deploy keeps the working model loaded and reported ready
+    artifact.write_text("broken")
+    poll_until_reloaded()
+    assert model_store._get('m') == "v2.0"
+    assert model_store.MODEL_STATUS['m'] is True
+    assert 'm' not in model_store.MODEL_ERRORS
+    assert model_store.check_for_updates() == []
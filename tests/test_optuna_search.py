@@ -0,0 +1,54 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'models', 'irrigation_optimization'))
+
+pytest.importorskip("catboost")
+optuna = pytest.importorskip("optuna")
+pd = pytest.importorskip("pandas")
+
+import optuna_search
+from catboost_pools import cache_pools
+
+FEATURES = ['soil_moisture', 'temperature', 'humidity', 'ph', 'n', 'p', 'k']
+
+
+def _pool_dir(cache_dir, rows=400):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.random((rows, len(FEATURES))) * 100, columns=FEATURES)
+    y = X['soil_moisture'] + rng.normal(0, 10, rows) < 40
+    split = rows * 3 // 4
+    return cache_pools(X[:split], y[:split], X[split:], y[split:], border_count=32, cache_dir=str(cache_dir))
+
+
+def test_search_runs_on_workers_and_resumes_by_name(tmp_path):
+    pool_dir = _pool_dir(tmp_path / "pools")
+    storage = str(tmp_path / "journal.log")
+
+    study = optuna_search.search(pool_dir, "irrigation", storage, n_trials=3, workers=2)
+    assert optuna_search.finished_trials(study) >= 3
+    first = {t.number for t in study.trials}
+    assert 0 < study.best_value <= 1
+    assert study.best_trial.user_attrs["best_iteration"] < study.best_params["iterations"]
+
+    # Same name and storage: earlier trials are kept and only the missing ones run
+    resumed = optuna_search.search(pool_dir, "irrigation", storage, n_trials=len(first) + 1, workers=1)
+    assert {t.number for t in resumed.trials} == first | {len(first)}
+
+
+class _AlwaysPrune(optuna.pruners.BasePruner):
+    def prune(self, study, trial):
+        return True
+
+
+def test_trials_behind_the_others_are_pruned(tmp_path):
+    pool_dir = _pool_dir(tmp_path / "pools")
+    study = optuna.create_study(direction="maximize", pruner=_AlwaysPrune())
+    study.optimize(lambda trial: optuna_search.objective(trial, pool_dir), n_trials=1)
+
+    trial = study.trials[0]
+    assert trial.state == optuna.trial.TrialState.PRUNED
+    assert list(trial.intermediate_values) == [optuna_search.REPORT_EVERY]
@@ -0,0 +1,103 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+from response_cache import NO_RESPONSE_TEXT, ResponseCache, bucket_context, normalize_prompt
+
+CONTEXT = {'N': 101, 'P': 33, 'K': 33, 'temperature': 31.2, 'humidity': 82.0, 'ph': 6.9,
+           'rainfall': 142.9, 'soil_moisture': 35.0, 'soil_type': 'Clay'}
+
+
+def test_normalized_prompt_and_bucketed_context_hit():
+    cache = ResponseCache()
+    cache.put("When should I irrigate rice?", CONTEXT, {"text": "At dawn."})
+
+    nearby = dict(CONTEXT, temperature=30.4, humidity=83.0, soil_type='clay')
+    assert cache.get("when should i irrigate   RICE", nearby) == ({"text": "At dawn."}, "exact")
+
+    different = dict(CONTEXT, temperature=38.0)
+    assert cache.get("When should I irrigate rice?", different) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_similarity_lookup_matches_rephrased_question():
+    cache = ResponseCache(semantic=True)
+    cache.put("what fertilizer should I use for maize", CONTEXT, {"text": "Urea split doses."})
+
+    result = cache.get("What fertilizer should I use for my maize?", CONTEXT)
+    assert result == ({"text": "Urea split doses."}, "similar")
+    assert cache.get("how deep should I plant potatoes", CONTEXT) is None
+
+
+def test_similarity_lookup_rejects_different_crop_or_negation():
+    # Both pairs score about 0.85-0.87 and have different content words
+    cache = ResponseCache(semantic=True)
+    assert cache.similarity_threshold == 0.9
+    cache.put("what fertilizer should I use for maize", CONTEXT, {"text": "Urea split doses."})
+    cache.put("should I irrigate the field today", CONTEXT, {"text": "Yes."})
+
+    assert cache.get("what fertilizer should I use for rice", CONTEXT) is None
+    assert cache.get("should I not irrigate the field today", CONTEXT) is None
+
+
+def test_similarity_lookup_rejects_near_misses_at_the_default_threshold():
+    # "50 kg" vs "150 kg" and "need" vs "need daily" score above 0.9; the content words differ
+    cache = ResponseCache(semantic=True)
+    cache.put("should i apply 50 kg of urea per hectare", CONTEXT, {"text": "Yes."})
+    cache.put("how much water does my maize field need", CONTEXT, {"text": "25 mm a week."})
+    cache.put("is it too hot to spray pesticide on my tomatoes today", CONTEXT, {"text": "Wait for the evening."})
+    cache.put("should i irrigate my rice before the rain", CONTEXT, {"text": "No."})
+    cache.put("how do i increase nitrogen in my soil", CONTEXT, {"text": "Add urea."})
+
+    for prompt in ["should i apply 150 kg of urea per hectare",
+                   "how much water does my maize field need daily",
+                   "is it too hot to spray pesticide on my potatoes today",
+                   "should i irrigate my rice after the rain",
+                   "how do i decrease nitrogen in my soil",
+                   "shouldn't I irrigate my rice before the rain"]:
+        assert cache.get(prompt, CONTEXT) is None, prompt
+    assert cache.get("Should I irrigate my rice before the rain?", CONTEXT) == ({"text": "No."}, "exact")
+
+
+def test_similar_hit_needs_the_same_content_words_whatever_the_score():
+    cache = ResponseCache(semantic=True, embedder=lambda text: np.ones(4, dtype=np.float32) / 2)
+    cache.put("what fertilizer should I use for maize", CONTEXT, {"text": "Urea split doses."})
+
+    assert cache.get("what fertilizer should I use for rice", CONTEXT) is None
+    assert cache.get("what fertilizer should I not use for maize", CONTEXT) is None
+    assert cache.get("what fertilizer for 2 maize", CONTEXT) is None
+    # Stopwords, word order and one-letter typos in longer words don't matter
+    for prompt in ["for my maize, what fertiliser should we use?", "what fertilizer to use for maise"]:
+        assert cache.get(prompt, CONTEXT) == ({"text": "Urea split doses."}, "similar"), prompt
+
+
+def test_fallback_answer_is_not_cached():
+    cache = ResponseCache()
+    cache.put("When should I irrigate rice?", CONTEXT, {"text": NO_RESPONSE_TEXT, "model_used": "gemini"})
+    cache.put("When should I irrigate maize?", CONTEXT, {"text": "", "model_used": "gemini"})
+    assert len(cache) == 0
+
+
+def test_ttl_and_lru_bounds(monkeypatch):
+    import response_cache
+
+    clock = [1000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: clock[0])
+    cache = ResponseCache(max_entries=2, ttl=60)
+    cache.put("a", CONTEXT, 1)
+    cache.put("b", CONTEXT, 2)
+    cache.get("a", CONTEXT)
+    cache.put("c", CONTEXT, 3)  # evicts "b", the least recently used
+    assert cache.get("b", CONTEXT) is None
+    assert cache.get("a", CONTEXT) == (1, "exact")
+
+    clock[0] += 61
+    assert cache.get("a", CONTEXT) is None
+
+
+def test_helpers():
+    assert normalize_prompt("  What's the BEST   way?! ") == "what s the best way"
+    assert bucket_context({'temperature': 31.9, 'soil_type': ' Clay '}) == (('soil_type', 'clay'), ('temperature', 15))
@@ -0,0 +1,101 @@
+import math
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+pytest.importorskip("plotly")
+
+import sensor_charts
+
+
+def reference_lttb(points, threshold):
+    """Textbook LTTB (Steinarsson, 2013) on a list of (x, y) tuples."""
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    every = (n - 2) / (threshold - 2)
+    kept, a = [0], 0
+    for i in range(threshold - 2):
+        start, end = math.floor(i * every) + 1, math.floor((i + 1) * every) + 1
+        next_start = end
+        next_end = min(math.floor((i + 2) * every) + 1, n)
+        if i == threshold - 3:
+            next_start, next_end = n - 1, n
+        avg_x = sum(p[0] for p in points[next_start:next_end]) / (next_end - next_start)
+        avg_y = sum(p[1] for p in points[next_start:next_end]) / (next_end - next_start)
+        best, best_area = start, -1
+        for j in range(start, end):
+            area = abs((points[a][0] - avg_x) * (points[j][1] - points[a][1])
+                       - (points[a][0] - points[j][0]) * (avg_y - points[a][1]))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return kept
+
+
+def test_lttb_matches_reference_and_keeps_extremes():
+    rng = np.random.default_rng(0)
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 40) + rng.normal(0, 0.1, 1000)
+    y[500] = 10.0
+
+    idx = sensor_charts.lttb(x, y, 100)
+
+    assert len(idx) == 100
+    assert idx[0] == 0 and idx[-1] == 999
+    assert 500 in idx
+    assert list(idx) == reference_lttb(list(zip(x, y)), 100)
+
+
+def test_figure_is_one_webgl_subplot_per_sensor_with_bounded_points():
+    n = 20_000
+    df = pd.DataFrame({
+        'created_at': pd.date_range('2025-06-01', periods=n, freq='30s', tz='UTC'),
+        'temperature': np.linspace(20, 30, n),
+        'humidity': 60.0,
+        'rainfall': np.nan,
+    })
+    fig = sensor_charts.build_sensor_figure(df, max_points=500)
+
+    assert [trace.type for trace in fig.data] == ['scattergl', 'scattergl']
+    assert all(len(trace.x) <= 500 for trace in fig.data)
+    assert fig.layout.xaxis.matches == 'x2' or fig.layout.xaxis2.matches == 'x'  # shared x
+
+
+def test_figure_is_cached_by_version():
+    df = pd.DataFrame({'created_at': pd.date_range('2025-06-01', periods=10, freq='min', tz='UTC'),
+                       'temperature': np.arange(10.0)})
+    sensor_charts._figure_cache.clear()
+
+    first = sensor_charts.sensor_figure(df, version=1)
+    assert sensor_charts.sensor_figure(df, version=1) is first
+    assert sensor_charts.sensor_figure(df, version=2) is not first
+
+
+def test_cached_figure_is_not_rebuilt(monkeypatch):
+    df = pd.DataFrame({'created_at': pd.date_range('2025-06-01', periods=10, freq='min', tz='UTC'),
+                       'temperature': np.arange(10.0), 'humidity': 50.0})
+    sensor_charts._figure_cache.clear()
+    calls = []
+    downsample = sensor_charts.downsample
+
+    def counting_downsample(*args):
+        calls.append(args)
+        return downsample(*args)
+
+    monkeypatch.setattr(sensor_charts, "downsample", counting_downsample)
+
+    fig = sensor_charts.sensor_figure(df, version=1)
+    assert len(calls) == 2
+    assert fig.layout.height == 2 * sensor_charts.SUBPLOT_HEIGHT
+    assert sensor_charts.sensor_figure(df, version=1, max_points=sensor_charts.DEFAULT_MAX_POINTS) is fig
+    assert len(calls) == 2
+    sensor_charts.sensor_figure(df, version=2)
+    assert len(calls) == 4
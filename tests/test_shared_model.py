@@ -0,0 +1,33 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'models', 'crop_recommendation'))
+
+joblib = pytest.importorskip("joblib")
+
+import shared_model
+
+
+def test_shared_copy_is_memory_mapped_and_content_addressed(tmp_path):
+    pkl = tmp_path / "crop_model.pkl"
+    cache = tmp_path / "cache"
+    model = {"weights": np.arange(10_000, dtype=np.float64), "labels": ["rice", "maize"]}
+    joblib.dump(model, pkl, compress=3)
+
+    first = shared_model.prepare_shared(str(pkl), str(cache))
+    assert shared_model.prepare_shared(str(pkl), str(cache)) == first
+
+    loaded = shared_model.load_shared(str(pkl), str(cache))
+    assert isinstance(loaded["weights"], np.memmap)
+    assert not loaded["weights"].flags.writeable
+    np.testing.assert_array_equal(loaded["weights"], model["weights"])
+    assert loaded["labels"] == model["labels"]
+
+    # A retrained model gets its own file and the old version is dropped from the cache
+    joblib.dump({"weights": np.ones(5)}, pkl, compress=3)
+    second = shared_model.prepare_shared(str(pkl), str(cache))
+    assert second != first
+    assert sorted(os.listdir(cache)) == [os.path.basename(second)]
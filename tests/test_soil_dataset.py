@@ -0,0 +1,88 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'models', 'soil_classification'))
+
+tf = pytest.importorskip("tensorflow")
+Image = pytest.importorskip("PIL.Image")
+
+import soil_dataset
+
+
+def _save(path, value):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.fromarray(np.full((30, 40, 3), value, dtype=np.uint8)).save(path)
+
+
+def _folder(tmp_path):
+    # 5 "Clay" images, 4 "Sandy" images of which 2 are in a nested folder
+    for i in range(5):
+        _save(str(tmp_path / "Clay" / f"{i}.png"), 10 * i)
+    for i in range(2):
+        _save(str(tmp_path / "Sandy" / f"{i}.png"), 100 + i)
+        _save(str(tmp_path / "Sandy" / "augmented" / f"{i}.png"), 200 + i)
+    (tmp_path / "Sandy" / "notes.txt").write_text("not an image")
+    return str(tmp_path)
+
+
+def test_list_images_splits_each_class_like_flow_from_directory(tmp_path):
+    class_names, (train_paths, train_labels), (val_paths, val_labels) = \
+        soil_dataset.list_images(_folder(tmp_path), validation_split=0.4)
+    assert class_names == ["Clay", "Sandy"]
+
+    def names(paths):
+        return [os.path.relpath(p, tmp_path).replace(os.sep, "/") for p in paths]
+
+    assert names(val_paths) == ["Clay/0.png", "Clay/1.png", "Sandy/0.png"]
+    assert names(train_paths) == ["Clay/2.png", "Clay/3.png", "Clay/4.png",
+                                  "Sandy/1.png", "Sandy/augmented/0.png", "Sandy/augmented/1.png"]
+    assert val_labels.tolist() == [0, 0, 1] and train_labels.tolist() == [0, 0, 0, 1, 1, 1]
+    assert train_labels.dtype == np.int32
+
+
+def test_make_dataset_yields_scaled_images_and_one_hot_labels(tmp_path):
+    _, (paths, labels), _ = soil_dataset.list_images(_folder(tmp_path), validation_split=0)
+    batches = list(soil_dataset.make_dataset(paths, labels, 2, batch_size=4, image_size=(16, 16)))
+    assert [len(x) for x, _ in batches] == [4, 4, 1]
+
+    images = np.concatenate([x.numpy() for x, _ in batches])
+    one_hot = np.concatenate([y.numpy() for _, y in batches])
+    assert images.shape == (9, 16, 16, 3) and images.dtype == np.float32
+    # Flat-colour images keep their colour, scaled to [0, 1], in file order
+    np.testing.assert_allclose(images[:, 0, 0, 0], [0, 10, 20, 30, 40, 100, 101, 200, 201] / np.float32(255),
+                               atol=1e-3)
+    np.testing.assert_array_equal(one_hot, np.eye(2)[labels])
+
+
+def test_make_dataset_decodes_each_file_once(tmp_path):
+    _, (paths, labels), _ = soil_dataset.list_images(_folder(tmp_path), validation_split=0)
+    dataset = soil_dataset.make_dataset(paths, labels, 2, batch_size=4, image_size=(16, 16), shuffle=True)
+    first = sorted(x[0, 0, 0] for batch, _ in dataset for x in batch.numpy())
+
+    for path in paths:
+        os.remove(path)
+    # The second epoch comes from the cache, reshuffled
+    second = sorted(x[0, 0, 0] for batch, _ in dataset for x in batch.numpy())
+    np.testing.assert_array_equal(first, second)
+
+
+def test_augmentation_runs_in_graph_and_differs_per_epoch(tmp_path):
+    paths, labels = [], []
+    for i in range(4):
+        path = str(tmp_path / f"{i}.png")
+        Image.fromarray(np.random.default_rng(i).integers(0, 255, (32, 32, 3), dtype=np.uint8)).save(path)
+        paths.append(path)
+        labels.append(i % 2)
+    plain = soil_dataset.make_dataset(paths, labels, 2, batch_size=4, image_size=(32, 32))
+    augmented = soil_dataset.make_dataset(paths, labels, 2, batch_size=4, image_size=(32, 32),
+                                          augment=soil_dataset.augmentation(seed=0))
+
+    original = next(iter(plain))[0].numpy()
+    first, second = (next(iter(augmented)) for _ in range(2))
+    assert first[0].shape == original.shape
+    assert not np.allclose(first[0], original) and not np.allclose(first[0], second[0])
+    assert first[0].numpy().min() >= 0 and first[0].numpy().max() <= 1
+    np.testing.assert_array_equal(first[1], next(iter(plain))[1])
@@ -0,0 +1,53 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'models', 'soil_classification'))
+
+import sweep_soil_model
+
+
+def _row(resolution, alpha, accuracy, latency, size):
+    return {"resolution": resolution, "alpha": alpha, "val_accuracy": accuracy, "val_loss": 0.5,
+            "latency_ms": latency, "size_mb": size, "params": int(size * 250_000)}
+
+
+ROWS = [
+    _row(96, 0.35, 0.80, 5.0, 2.0),
+    _row(224, 0.35, 0.90, 12.0, 2.0),
+    _row(128, 0.5, 0.85, 14.0, 3.0),    # slower, bigger and less accurate than 224/0.35
+    _row(224, 1.0, 0.95, 40.0, 9.0),
+    _row(160, 1.0, 0.95, 45.0, 9.0),    # same accuracy and size as 224/1.0, but slower
+]
+
+
+def test_pareto_frontier_drops_dominated_variants():
+    frontier = sweep_soil_model.pareto_frontier(ROWS)
+    assert [(row["resolution"], row["alpha"]) for row in frontier] == [(96, 0.35), (224, 0.35), (224, 1.0)]
+    assert sweep_soil_model.pareto_frontier([ROWS[0]]) == [ROWS[0]]
+
+
+def test_smallest_variant_meeting_the_accuracy_bar():
+    assert sweep_soil_model.smallest_meeting(ROWS, 0.9) is ROWS[1]
+    assert sweep_soil_model.smallest_meeting(ROWS, 0.95) is ROWS[3]
+    assert sweep_soil_model.smallest_meeting(ROWS, 0.99) is None
+
+
+def test_report_lists_variants_frontier_and_recommendation():
+    rows = [dict(row, pareto=row in sweep_soil_model.pareto_frontier(ROWS)) for row in ROWS]
+    report = sweep_soil_model.format_report(rows, 0.9)
+    all_variants, frontier = report.split("## Pareto frontier")
+    assert all_variants.count("| 224 | 0.35 |") == 1 and "| 128 | 0.5 |" in all_variants
+    assert "| 128 | 0.5 |" not in frontier and "| 160 | 1.0 |" not in frontier
+    assert "SOIL_IMG_SIZE=224 SOIL_ALPHA=0.35 python" in report
+    assert "None of the variants" in sweep_soil_model.format_report(rows, 0.99)
+
+
+def test_variant_matches_training_architecture_and_latency_is_measured():
+    pytest.importorskip("tensorflow")
+    model, base_model, head = sweep_soil_model.build_variant(96, 0.35, 3, weights=None)
+    assert model.input_shape == (None, 96, 96, 3) and model.output_shape == (None, 3)
+    assert head.input_shape == (None, base_model.output_shape[-1])
+    assert not base_model.trainable
+    assert 0 < sweep_soil_model.cpu_latency_ms(model, runs=3, warmup=1) < 10_000